@@ -16,9 +16,7 @@ from src.infrastructure import (
     get_compute_environment_ids_terraform,
 )
 from src.integrations import create_github_resources, create_github_credential
-from src.integrations.workspace_participants_command import (
-    create_individual_member_commands,
-)
+from src.integrations.workspace_participants_command import create_team_sync_command
 
 
 def main():
@@ -87,10 +85,10 @@ def main():
 
     # Step 9: Add nf-core team members as workspace participants with role precedence
     # Core team → OWNER role, Maintainers → MAINTAIN role
-    # Individual member tracking provides granular status per team member
+    # One reconciler diffs the teams against the workspace and adds missing members
 
-    # Create team data setup and individual member tracking commands
-    setup_cmd, member_commands = create_individual_member_commands(
+    # Create team data setup and team sync commands
+    setup_cmd, sync_cmd = create_team_sync_command(
         workspace_id=int(config["tower_workspace_id"]),
         token=config["tower_access_token"],
         github_token=config["github_token"],
@@ -108,6 +106,16 @@ def main():
     #     maintainer_emails=maintainer_emails
     # )
 
+    # Option C: Dynamic provider that reads and diffs the live participants,
+    # so previews show exactly which members would change (one list call).
+    # Uncomment to use this approach instead:
+    # participants = WorkspaceParticipants(
+    #     "workspace-participants",
+    #     workspace_id=int(config["tower_workspace_id"]),
+    #     token=config["tower_access_token"],
+    #     participants=load_team_participants(),
+    # )
+
     # Exports - All within proper Pulumi program context
     pulumi.export(
         "megatests_bucket",
@@ -184,23 +192,18 @@ def main():
     }
     pulumi.export("towerforge_iam", towerforge_resources)
 
-    # Export workspace participants management information with individual member tracking
+    # Export workspace participants management information with per-member sync status
     pulumi.export(
         "workspace_participants",
         {
             "setup_command_id": setup_cmd.id,
             "setup_status": setup_cmd.stdout,
-            "individual_member_commands": {
-                username: {
-                    "command_id": cmd.id,
-                    "status": cmd.stdout,  # Contains STATUS lines from script
-                    "github_username": username,
-                }
-                for username, cmd in member_commands.items()
+            "team_sync": {
+                "command_id": sync_cmd.id,
+                "status": sync_cmd.stdout,  # One STATUS line per team member
             },
-            "total_tracked_members": len(member_commands),
             "workspace_id": config["tower_workspace_id"],
-            "note": "Automated team data setup with individual member sync commands and privacy protection",
+            "note": "Automated team data setup with a single team sync reconciler and privacy protection",
             "privacy": "Email data generated at runtime, never committed to git",
             "todo": "Replace with seqera_workspace_participant resources when available",
         },
@@ -16,9 +16,22 @@ The API endpoints exist in the provider SDK but are not exposed as Terraform res
 import json
 import os
 import sys
+import threading
 import time
 import requests
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Set
+
+from seqera_pagination import SeqeraApiError, iter_workspace_participants
+from seqera_rate_limit import (
+    RETRYABLE_STATUSES,
+    TokenBucket,
+    backoff_delay,
+    retry_after_seconds,
+)
+
+DEFAULT_ADD_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 5
 
 
 class SeqeraWorkspaceManager:
@@ -29,8 +42,18 @@ class SeqeraWorkspaceManager:
         token: str,
         org_id: int = 252464779077610,
         workspace_id: int = 59994744926013,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
     ):
-        """Initialize the workspace manager."""
+        """Initialize the workspace manager.
+
+        Args:
+            token: Seqera Platform access token
+            org_id: Organization ID (default: nf-core)
+            workspace_id: Workspace ID (default: AWSMegatests)
+            rate_limiter: Token bucket shared by all add requests
+            max_attempts: Attempts per add request on 429 and 5xx responses
+        """
         self.token = token
         self.org_id = org_id  # nf-core
         self.workspace_id = workspace_id  # AWSMegatests
@@ -39,24 +62,70 @@ class SeqeraWorkspaceManager:
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-
-    def get_current_participants(self) -> List[Dict[str, Any]]:
-        """Get current workspace participants."""
-        url = f"{self.api_url}/orgs/{self.org_id}/workspaces/{self.workspace_id}/participants"
-
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.max_attempts = max_attempts
+        # Participants cache, loaded on first use, and its email/username index
+        self._participants: Optional[List[Dict[str, Any]]] = None
+        self._participant_index: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = threading.RLock()
+        # Emails the API rejected with 404 (no Seqera account)
+        self.not_found: Set[str] = set()
+
+    def get_current_participants(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Get current workspace participants.
+
+        The list is fetched (all pages) once and cached; later calls return
+        the cache, which add_participant keeps up to date. Pass
+        ``refresh=True`` or call invalidate_participants() to fetch it again.
+        """
+        with self._cache_lock:
+            if refresh:
+                self.invalidate_participants()
+            if self._participants is None:
+                participants = self._fetch_participants()
+                if participants is None:
+                    return []
+                self._participants = participants
+                for participant in participants:
+                    self._index_participant(participant)
+            return self._participants
+
+    @property
+    def participants_loaded(self) -> bool:
+        """Whether the participant list was fetched successfully."""
+        return self._participants is not None
+
+    def _fetch_participants(self) -> Optional[List[Dict[str, Any]]]:
+        """Fetch every page of workspace participants, or None on failure."""
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("participants", [])
-            else:
-                print(f"✗ Failed to get participants. Status: {response.status_code}")
-                return []
-
+            return list(
+                iter_workspace_participants(
+                    self.token, self.org_id, self.workspace_id, api_url=self.api_url
+                )
+            )
+        except SeqeraApiError as e:
+            print(f"✗ Failed to get participants. Status: {e.status_code}")
         except requests.exceptions.RequestException as e:
             print(f"✗ Network error getting participants: {e}")
-            return []
+        return None
+
+    def _index_participant(self, participant: Dict[str, Any]):
+        """Index a cached participant by email and user name."""
+        for key in (participant.get("email"), participant.get("userName")):
+            if key:
+                self._participant_index[key.lower()] = participant
+
+    def find_participant(self, email_or_username: str) -> Optional[Dict[str, Any]]:
+        """Look up a participant by email or user name in the cached list."""
+        with self._cache_lock:
+            self.get_current_participants()
+            return self._participant_index.get(email_or_username.lower())
+
+    def invalidate_participants(self):
+        """Drop the cached participants so the next lookup fetches them again."""
+        with self._cache_lock:
+            self._participants = None
+            self._participant_index = {}
 
     def add_participant(self, email: str, role: str = "MAINTAIN") -> bool:
         """Add a single participant to the workspace."""
@@ -69,14 +138,19 @@ class SeqeraWorkspaceManager:
         }
 
         try:
-            response = requests.put(url, headers=self.headers, json=payload, timeout=30)
+            response = self._put_with_retries(url, payload)
 
             if response.status_code in [200, 201, 204]:
                 print(f"  ✓ Added {email} with role {role}")
+                self._record_added(email, response)
                 return True
             elif response.status_code == 409:
                 print(f"  ~ {email} already exists (checking role...)")
                 return self._check_and_update_role(email, role)
+            elif response.status_code == 404:
+                print(f"  ✗ {email} has no Seqera Platform account")
+                self.not_found.add(email.lower())
+                return False
             else:
                 error_msg = f"Status {response.status_code}"
                 try:
@@ -92,51 +166,105 @@ class SeqeraWorkspaceManager:
             print(f"  ✗ Network error adding {email}: {e}")
             return False
 
+    def _record_added(self, email: str, response: requests.Response):
+        """Add a new participant to the cache, if it is loaded."""
+        try:
+            participant = response.json().get("participant") or {}
+        except ValueError:
+            participant = {}
+        participant.setdefault("email", email)
+        with self._cache_lock:
+            if self._participants is None:
+                return
+            self._participants.append(participant)
+            self._index_participant(participant)
+
     def _check_and_update_role(self, email: str, desired_role: str) -> bool:
         """Check if existing participant has the correct role."""
-        participants = self.get_current_participants()
-
-        for participant in participants:
-            if participant.get("email", "").lower() == email.lower():
-                current_role = participant.get("wspRole", "").lower()
-                if current_role == desired_role.lower():
-                    print(f"    ✓ Already has correct role: {current_role}")
-                    return True
-                else:
-                    print(
-                        f"    ! Has role {current_role}, desired {desired_role.lower()}"
-                    )
-                    # Note: Role update would require additional API call if supported
-                    return True  # Consider this successful for now
-
-        print(f"    ? Could not find {email} in participants list")
-        return False
+        participant = self.find_participant(email)
+        if participant is None:
+            # Added since the cache was loaded
+            self.invalidate_participants()
+            participant = self.find_participant(email)
+
+        if participant is None:
+            print(f"    ? Could not find {email} in participants list")
+            return False
+
+        current_role = participant.get("wspRole", "").lower()
+        if current_role == desired_role.lower():
+            print(f"    ✓ Already has correct role: {current_role}")
+        else:
+            print(f"    ! Has role {current_role}, desired {desired_role.lower()}")
+            # Note: Role update would require additional API call if supported
+        return True  # Consider this successful for now
+
+    def _put_with_retries(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """PUT through the rate limiter, retrying 429/5xx responses and network errors.
+
+        429 responses pause the shared rate limiter for their Retry-After, so
+        every worker backs off; other retries use jittered exponential backoff.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = requests.put(
+                    url, headers=self.headers, json=payload, timeout=30
+                )
+            except requests.exceptions.RequestException:
+                if attempt == self.max_attempts:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if (
+                response.status_code not in RETRYABLE_STATUSES
+                or attempt == self.max_attempts
+            ):
+                return response
+
+            print(
+                f"  … {payload['userNameOrEmail']}: HTTP {response.status_code}, retrying"
+            )
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            if response.status_code == 429 and retry_after is not None:
+                # Jitter spreads the workers' retries after the pause
+                self.rate_limiter.pause(retry_after)
+                time.sleep(retry_after + backoff_delay(1, base=0.1))
+            else:
+                time.sleep(backoff_delay(attempt))
+        return response
 
     def add_maintainers_batch(
-        self, maintainers_data: List[Dict[str, str]], delay: float = 1.0
+        self,
+        maintainers_data: List[Dict[str, str]],
+        max_workers: int = DEFAULT_ADD_WORKERS,
     ) -> Dict[str, bool]:
-        """Add multiple maintainers with a delay between requests."""
-        results = {}
+        """Add multiple maintainers concurrently, as fast as the rate limiter allows."""
+        results: Dict[str, bool] = {}
 
         print(f"Adding {len(maintainers_data)} maintainers to workspace...")
         print(f"Organization: nf-core (ID: {self.org_id})")
         print(f"Workspace: AWSMegatests (ID: {self.workspace_id})")
+        print(
+            f"Concurrency: {max_workers} workers, "
+            f"{self.rate_limiter.rate:g} requests/s (burst {self.rate_limiter.capacity})"
+        )
         print()
 
-        for i, maintainer in enumerate(maintainers_data, 1):
+        def add(numbered):
+            i, maintainer = numbered
             email = maintainer["name"]  # 'name' field contains the email
-            role = maintainer["role"]
             github_username = maintainer.get("github_username", "unknown")
-
             print(f"{i:2d}/{len(maintainers_data)}: {email} ({github_username})")
+            return email, self.add_participant(email, maintainer["role"])
 
-            success = self.add_participant(email, role)
-            results[email] = success
-
-            # Add delay between requests to be nice to the API
-            if i < len(maintainers_data) and delay > 0:
-                time.sleep(delay)
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for email, success in executor.map(add, enumerate(maintainers_data, 1)):
+                results[email] = success
 
+        print(f"Finished {len(results)} requests in {time.time() - start:.1f}s")
         return results
 
 
@@ -238,7 +366,7 @@ def main():
 
     # Add maintainers
     data_to_add = to_add if "to_add" in locals() else maintainers_data
-    results = manager.add_maintainers_batch(data_to_add, delay=1.0)
+    results = manager.add_maintainers_batch(data_to_add)
 
     # Summary
     print()
@@ -255,8 +383,9 @@ def main():
             if not success:
                 print(f"  - {email}")
 
+    # The cached participants include the ones added above
     print(
-        f"\nTotal workspace participants after operation: {len(current_participants) + successful}"
+        f"\nTotal workspace participants after operation: {len(manager.get_current_participants())}"
     )
 
 
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Asyncio tagging engine with adaptive (AIMD) concurrency control.
+
+S3 scales request capacity per prefix and answers with 503 SlowDown when a
+client pushes too hard. Instead of a fixed worker count, the engine grows the
+number of in-flight requests additively while calls succeed and halves it
+when S3 throttles, with an additional cap per work/<xx>/ shard.
+
+The engine is independent of how a key is tagged: it drives a blocking
+``tag_fn(obj) -> message`` callable on a thread pool, so the same boto3 code
+path is used as in the threaded tagger.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Error codes S3 uses to signal request-rate throttling
+THROTTLING_ERROR_CODES = {
+    "SlowDown",
+    "ServiceUnavailable",
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "503",
+}
+
+
+def is_throttling_error(error: ClientError) -> bool:
+    """Check whether a ClientError is S3 asking the client to slow down."""
+    code = error.response.get("Error", {}).get("Code", "")
+    status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in THROTTLING_ERROR_CODES or status == 503
+
+
+def shard_of(key: str) -> str:
+    """Return the work/<xx>/ shard a key belongs to."""
+    parts = key.split("/", 2)
+    return "/".join(parts[:2]) + "/" if len(parts) > 2 else ""
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    Every successful call raises the limit by ``increase / limit`` (so roughly
+    ``increase`` per round trip of the whole window); a throttled call
+    multiplies it by ``decrease``. Decreases are spaced at least ``cooldown``
+    seconds apart so one burst of SlowDown responses counts as a single
+    congestion event.
+    """
+
+    def __init__(
+        self,
+        initial: int = 16,
+        minimum: int = 1,
+        maximum: int = 256,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.throttle_events = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait until a request slot is available under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        """Return a request slot."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_success(self):
+        """Grow the limit after a successful request."""
+        async with self._condition:
+            previous = int(self.limit)
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            if int(self.limit) > previous:
+                self._condition.notify_all()
+
+    async def on_throttle(self):
+        """Shrink the limit after S3 throttled a request."""
+        async with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.throttle_events += 1
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            logger.info(
+                f"S3 throttling detected, concurrency reduced to {self.limit:.0f}"
+            )
+
+
+def _next_batch(iterator: Iterator[Dict], size: int) -> List[Dict]:
+    return list(islice(iterator, size))
+
+
+async def tag_objects_async(
+    tag_fn: Callable[[Dict], str],
+    log_objects: Iterable[Dict],
+    limiter: Optional[AIMDLimiter] = None,
+    per_shard_limit: int = 64,
+    max_attempts: int = 8,
+    on_result: Optional[Callable[[str, bool, str], None]] = None,
+    listing_batch_size: int = 1000,
+) -> Dict[str, int]:
+    """Tag objects concurrently under an adaptive concurrency limit.
+
+    Args:
+        tag_fn: Blocking callable tagging one listed object and returning a
+            status message; raises ClientError on failure
+        log_objects: Iterable of object dictionaries to tag; consumed lazily
+            in batches off the event loop
+        limiter: Concurrency limiter (default: AIMDLimiter())
+        per_shard_limit: Maximum in-flight requests per work/<xx>/ shard
+        max_attempts: Attempts per key before a throttled call counts as an error
+        on_result: Optional callback ``(key, success, message)`` invoked once
+            per key
+        listing_batch_size: Number of objects pulled from log_objects at a time
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    limiter = limiter or AIMDLimiter()
+    stats = {
+        "processed": 0,
+        "tagged": 0,
+        "already_tagged": 0,
+        "errors": 0,
+        "throttled": 0,
+    }
+    loop = asyncio.get_running_loop()
+    shard_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(per_shard_limit)
+    )
+    start_time = time.time()
+
+    async def tag_one(obj: Dict):
+        key = obj["Key"]
+        message = ""
+        success = False
+        try:
+            async with shard_semaphores[shard_of(key)]:
+                for attempt in range(1, max_attempts + 1):
+                    try:
+                        message = await loop.run_in_executor(executor, tag_fn, obj)
+                        success = True
+                        await limiter.on_success()
+                        break
+                    except ClientError as e:
+                        message = f"Error: {e}"
+                        if not is_throttling_error(e) or attempt == max_attempts:
+                            break
+                        stats["throttled"] += 1
+                        await limiter.on_throttle()
+                        # Full jitter exponential backoff, capped at 20s
+                        await asyncio.sleep(
+                            random.uniform(0, min(20.0, 0.1 * 2**attempt))
+                        )
+                    except Exception as e:
+                        message = f"Exception: {e}"
+                        break
+        finally:
+            await limiter.release()
+
+        stats["processed"] += 1
+        if success:
+            if "Already tagged" in message:
+                stats["already_tagged"] += 1
+            else:
+                stats["tagged"] += 1
+        else:
+            stats["errors"] += 1
+            logger.error(f"Failed to tag {key}: {message}")
+        if on_result is not None:
+            on_result(key, success, message)
+        if stats["processed"] % 1000 == 0:
+            elapsed = time.time() - start_time
+            logger.info(
+                f"Processed {stats['processed']} files "
+                f"({stats['processed'] / elapsed:.1f} files/s, "
+                f"concurrency {limiter.limit:.0f}, throttled {stats['throttled']})"
+            )
+
+    logger.info(
+        f"Tagging with adaptive concurrency (start {limiter.limit:.0f}, "
+        f"max {limiter.maximum}, per shard {per_shard_limit})..."
+    )
+
+    executor = ThreadPoolExecutor(
+        max_workers=limiter.maximum, thread_name_prefix="async-tagger"
+    )
+    iterator = iter(log_objects)
+    tasks = set()
+    try:
+        while True:
+            batch = await loop.run_in_executor(
+                None, _next_batch, iterator, listing_batch_size
+            )
+            if not batch:
+                break
+            for obj in batch:
+                await limiter.acquire()
+                task = asyncio.create_task(tag_one(obj))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return stats
+
+
+def run_async_tagging(
+    tag_fn: Callable[[Dict], str],
+    log_objects: Iterable[Dict],
+    initial_concurrency: int = 16,
+    max_concurrency: int = 256,
+    per_shard_limit: int = 64,
+    on_result: Optional[Callable[[str, bool, str], None]] = None,
+) -> Dict[str, int]:
+    """Synchronous entry point for tag_objects_async().
+
+    Args:
+        tag_fn: Blocking callable tagging one listed object and returning a
+            status message
+        log_objects: Iterable of object dictionaries to tag
+        initial_concurrency: Starting number of in-flight requests
+        max_concurrency: Upper bound for the adaptive limit
+        per_shard_limit: Maximum in-flight requests per work/<xx>/ shard
+        on_result: Optional callback ``(key, success, message)``
+
+    Returns:
+        Dictionary with processing statistics
+    """
+
+    async def run():
+        limiter = AIMDLimiter(initial=initial_concurrency, maximum=max_concurrency)
+        return await tag_objects_async(
+            tag_fn,
+            log_objects,
+            limiter=limiter,
+            per_shard_limit=per_shard_limit,
+            on_result=on_result,
+        )
+
+    return asyncio.run(run())
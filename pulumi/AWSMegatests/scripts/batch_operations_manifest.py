@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+S3 Batch Operations manifest generator for bulk tagging.
+
+Instead of issuing one PutObjectTagging call per object from a single
+machine, the tagger can write CSV manifests (bucket,key) together with
+matching ``aws s3control create-job`` job specifications. S3 Batch
+Operations then applies the tags server-side.
+
+Note that the S3PutObjectTagging operation replaces an object's entire tag
+set, so every object in the manifest ends up with exactly the tags in the
+job specification.
+"""
+
+import csv
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = "S3BatchOperations_CSV_20180820"
+REPORT_FORMAT = "Report_CSV_20180820"
+
+# Keys per manifest file. Batch Operations accepts much larger manifests, but
+# smaller jobs are quicker to validate, retry and monitor individually.
+DEFAULT_MAX_KEYS_PER_MANIFEST = 1_000_000
+
+
+def _md5_of(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_job_specification(
+    manifest_object_arn: str,
+    manifest_etag: str,
+    tags: Dict[str, str],
+    role_arn: str,
+    report_bucket_arn: str,
+    report_prefix: str,
+    account_id: Optional[str] = None,
+    description: str = "Tag Nextflow log files",
+    priority: int = 10,
+) -> Dict:
+    """Build a create-job request for an S3PutObjectTagging job.
+
+    Args:
+        manifest_object_arn: ARN of the uploaded manifest CSV
+        manifest_etag: ETag of the uploaded manifest (its MD5 for single-part uploads)
+        tags: Tag set to apply to every object in the manifest
+        role_arn: IAM role Batch Operations assumes to tag objects
+        report_bucket_arn: ARN of the bucket receiving the completion report
+        report_prefix: Key prefix for the completion report
+        account_id: AWS account ID owning the job, if known
+        description: Job description shown in the console
+        priority: Job priority
+
+    Returns:
+        Dictionary suitable for ``aws s3control create-job --cli-input-json``
+    """
+    spec = {
+        "ConfirmationRequired": True,
+        "Operation": {
+            "S3PutObjectTagging": {
+                "TagSet": [{"Key": k, "Value": v} for k, v in tags.items()]
+            }
+        },
+        "Manifest": {
+            "Spec": {"Format": MANIFEST_FORMAT, "Fields": ["Bucket", "Key"]},
+            "Location": {"ObjectArn": manifest_object_arn, "ETag": manifest_etag},
+        },
+        "Report": {
+            "Bucket": report_bucket_arn,
+            "Format": REPORT_FORMAT,
+            "Enabled": True,
+            "Prefix": report_prefix,
+            "ReportScope": "FailedTasksOnly",
+        },
+        "Priority": priority,
+        "RoleArn": role_arn,
+        "Description": description,
+    }
+    if account_id:
+        spec = {"AccountId": account_id, **spec}
+    return spec
+
+
+def write_batch_manifests(
+    objects: Iterable[Dict],
+    bucket_name: str,
+    output_dir: str,
+    tags: Dict[str, str],
+    role_arn: str,
+    manifest_bucket: str,
+    manifest_prefix: str = "batch-operations/tag-log-files",
+    account_id: Optional[str] = None,
+    max_keys_per_manifest: int = DEFAULT_MAX_KEYS_PER_MANIFEST,
+) -> List[Dict]:
+    """Write sharded manifests and job specifications for the given objects.
+
+    Files are written as ``manifest-NNNNN.csv`` and ``job-NNNNN.json`` in
+    ``output_dir``. Each job specification points at
+    ``s3://<manifest_bucket>/<manifest_prefix>/manifest-NNNNN.csv``, so the
+    manifests must be uploaded there unchanged before creating the jobs.
+
+    Args:
+        objects: Iterable of object dictionaries (only "Key" is used)
+        bucket_name: Bucket containing the objects
+        output_dir: Local directory for manifests and job specifications
+        tags: Tag set the jobs apply
+        role_arn: IAM role Batch Operations assumes
+        manifest_bucket: Bucket the manifests will be uploaded to (also
+            receives the completion reports)
+        manifest_prefix: Key prefix for the uploaded manifests
+        account_id: AWS account ID owning the jobs, if known
+        max_keys_per_manifest: Maximum keys per manifest file
+
+    Returns:
+        List of dictionaries describing each shard (paths, key count, ETag)
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_prefix = manifest_prefix.strip("/")
+    shards: List[Dict] = []
+
+    def close_shard(handle, path: Path, keys: int):
+        handle.close()
+        etag = _md5_of(path)
+        index = len(shards)
+        object_key = f"{manifest_prefix}/{path.name}"
+        job_spec = build_job_specification(
+            manifest_object_arn=f"arn:aws:s3:::{manifest_bucket}/{object_key}",
+            manifest_etag=etag,
+            tags=tags,
+            role_arn=role_arn,
+            report_bucket_arn=f"arn:aws:s3:::{manifest_bucket}",
+            report_prefix=f"{manifest_prefix}/reports/{index:05d}",
+            account_id=account_id,
+            description=f"Tag Nextflow log files in {bucket_name} ({index + 1})",
+        )
+        job_path = output / f"job-{index:05d}.json"
+        job_path.write_text(json.dumps(job_spec, indent=2) + "\n")
+        shards.append(
+            {
+                "manifest": str(path),
+                "job": str(job_path),
+                "keys": keys,
+                "etag": etag,
+                "object_key": object_key,
+            }
+        )
+        logger.info(f"Wrote {path.name} with {keys} keys")
+
+    handle: Optional[TextIO] = None
+    writer: Any = None
+    path = output / "manifest-00000.csv"
+    keys_in_shard = 0
+    for obj in objects:
+        if handle is None:
+            path = output / f"manifest-{len(shards):05d}.csv"
+            handle = open(path, "w", newline="")
+            writer = csv.writer(handle, lineterminator="\n")
+            keys_in_shard = 0
+
+        # Batch Operations expects URL-encoded keys in CSV manifests
+        writer.writerow([bucket_name, quote(obj["Key"], safe="/")])
+        keys_in_shard += 1
+
+        if keys_in_shard >= max_keys_per_manifest:
+            close_shard(handle, path, keys_in_shard)
+            handle = None
+
+    if handle is not None:
+        close_shard(handle, path, keys_in_shard)
+
+    return shards
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for log file key classification.
+
+Compares the original per-pattern loop (one regex search per pattern via
+any()) with the combined single-pass classifier used by
+tag_existing_log_files.py, on a synthetic Nextflow work/ listing.
+
+Usage:
+    python benchmark_classifier.py [--tasks 200000] [--repeat 5]
+"""
+
+import argparse
+import re
+import timeit
+from typing import Dict, List
+
+from tag_existing_log_files import LOG_FILE_PATTERNS, filter_log_objects
+
+# Typical contents of a Nextflow task directory
+TASK_FILES = [
+    ".command.begin",
+    ".command.err",
+    ".command.log",
+    ".command.out",
+    ".command.run",
+    ".command.sh",
+    ".command.trace",
+    ".exitcode",
+    "sample_R1.fastq.gz",
+    "sample_R2.fastq.gz",
+    "sample.sorted.bam",
+    "sample.sorted.bam.bai",
+]
+
+LEGACY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in LOG_FILE_PATTERNS]
+
+
+def legacy_filter_log_objects(objects: List[Dict]) -> List[Dict]:
+    """Classify keys the way the tagger originally did."""
+    return [
+        obj
+        for obj in objects
+        if any(p.search(obj["Key"].split("/")[-1]) for p in LEGACY_PATTERNS)
+    ]
+
+
+def make_listing(tasks: int) -> List[Dict]:
+    """Build a synthetic listing of ``tasks`` work directories."""
+    return [
+        {"Key": f"work/{i % 256:02x}/{i:030x}/{name}"}
+        for i in range(tasks)
+        for name in TASK_FILES
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark key classification")
+    parser.add_argument(
+        "--tasks", type=int, default=200000, help="Task directories (default: 200000)"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timing repetitions (default: 5)"
+    )
+    args = parser.parse_args()
+
+    objects = make_listing(args.tasks)
+    # Classify one listing page (1000 keys) per call, as the tagger does
+    pages = [objects[i : i + 1000] for i in range(0, len(objects), 1000)]
+
+    legacy = [o for page in pages for o in legacy_filter_log_objects(page)]
+    combined = [o for page in pages for o in filter_log_objects(page)]
+    if legacy != combined:
+        raise SystemExit("Classifiers disagree - benchmark aborted")
+
+    results = {}
+    for name, classify in (
+        ("per-pattern loop", legacy_filter_log_objects),
+        ("combined regex", filter_log_objects),
+    ):
+        best = min(
+            timeit.repeat(
+                lambda: [classify(page) for page in pages],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        results[name] = best
+        print(
+            f"{name:<18} {best:8.3f}s  {len(objects) / best / 1e6:6.2f} M keys/s "
+            f"({len(combined)} of {len(objects)} keys are log files)"
+        )
+
+    speedup = results["per-pattern loop"] / results["combined regex"]
+    print(f"Speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark S3 request throughput of the client configurations.
+
+Sends GetObjectTagging requests (the tagger's most frequent call) from a
+growing number of threads and reports requests/sec for:
+
+- default: one boto3 client with botocore's defaults (10 pooled connections),
+  as process_log_files_batch() used to share
+- shared: one S3ClientFactory client with a pool sized to the threads
+- per-thread: one S3ClientFactory client per thread
+
+Client creation is included in the timing, as it is part of the cost of
+per-thread clients. Small objects are written under --prefix first if fewer
+than --objects exist there. Point --endpoint-url at a moto server to compare
+the configurations without touching a real bucket.
+
+Usage:
+    python benchmark_s3_clients.py --bucket test-bucket \\
+        --endpoint-url http://localhost:5000 [--workers 1,8,32,64] [--requests 2000]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import boto3
+
+from s3_clients import S3ClientFactory
+
+
+def seed_objects(s3_client, bucket: str, prefix: str, count: int) -> List[str]:
+    """Return ``count`` keys under ``prefix``, writing any that are missing."""
+    keys = [f"{prefix}{i:06d}/.command.log" for i in range(count)]
+    paginator = s3_client.get_paginator("list_objects_v2")
+    existing = {
+        obj["Key"]
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+        for obj in page.get("Contents", [])
+    }
+    missing = [key for key in keys if key not in existing]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                lambda key: s3_client.put_object(Bucket=bucket, Key=key, Body=b"log"),
+                missing,
+            )
+        )
+    if missing:
+        print(f"Wrote {len(missing)} objects under s3://{bucket}/{prefix}")
+    return keys
+
+
+def run(
+    make_client: Callable, bucket: str, keys: List[str], workers: int, requests: int
+):
+    """Time ``requests`` GetObjectTagging calls from ``workers`` threads."""
+    start = time.perf_counter()
+    s3_client = make_client()
+
+    def get_tags(i: int):
+        s3_client.get_object_tagging(Bucket=bucket, Key=keys[i % len(keys)])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(get_tags, range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark S3 client configurations")
+    parser.add_argument("--bucket", required=True, help="Bucket to send requests to")
+    parser.add_argument("--endpoint-url", help="Custom S3 endpoint, e.g. a moto server")
+    parser.add_argument(
+        "--prefix",
+        default="benchmark/s3-clients/",
+        help="Prefix of the objects read (default: benchmark/s3-clients/)",
+    )
+    parser.add_argument(
+        "--objects", type=int, default=200, help="Objects to read (default: 200)"
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=2000,
+        help="Requests per configuration and thread count (default: 2000)",
+    )
+    parser.add_argument(
+        "--workers",
+        default="1,8,32,64",
+        help="Comma-separated thread counts (default: 1,8,32,64)",
+    )
+    args = parser.parse_args()
+    try:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    except ValueError:
+        parser.error("--workers must be a comma-separated list of integers")
+    if min(worker_counts) < 1 or args.objects < 1:
+        parser.error("--workers and --objects must be positive")
+
+    keys = seed_objects(
+        boto3.client("s3", endpoint_url=args.endpoint_url),
+        args.bucket,
+        args.prefix,
+        args.objects,
+    )
+
+    configurations = {
+        "default": lambda workers: (
+            lambda: boto3.session.Session().client("s3", endpoint_url=args.endpoint_url)
+        ),
+        "shared": lambda workers: S3ClientFactory(workers, args.endpoint_url).client,
+        "per-thread": lambda workers: (
+            S3ClientFactory(workers, args.endpoint_url, per_thread=True).client
+        ),
+    }
+
+    print(f"{'workers':>7}  " + "  ".join(f"{name:>12}" for name in configurations))
+    for workers in worker_counts:
+        rates = []
+        for make_client in configurations.values():
+            elapsed = run(
+                make_client(workers), args.bucket, keys, workers, args.requests
+            )
+            rates.append(args.requests / elapsed)
+        print(f"{workers:>7}  " + "  ".join(f"{rate:>8.0f} r/s" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the tagger against a local moto S3 server.
+
+Starts ``moto_server`` on a free port (or uses --endpoint-url), seeds one
+bucket per configuration with a synthetic Nextflow work/ tree and runs
+tag_existing_log_files.py on it in a child process, so listing,
+classification and tagging are measured together. Each configuration is a
+set of tagger options; by default the thread pool, streaming, sharded
+listing and async engines are compared.
+
+For every configuration the harness reports wall time, listed objects/sec,
+peak RSS of the tagger process and S3 request counts by operation (read
+from the tagger's --metrics-file). Results are written as JSON; pass an
+earlier results file with --baseline to print the change in throughput,
+so regressions show up between versions.
+
+moto answers every request from one Python process, so absolute numbers
+are far below S3's; compare configurations and versions on the same
+machine only.
+
+Requires moto (pip install "moto[server]").
+
+Usage:
+    python benchmark_tagging.py [--tasks 2000] [--files-per-task 8]
+        [--log-ratio 0.5] [--output results.json] [--baseline old.json]
+    python benchmark_tagging.py --configuration "fusion=--stream --fusion-tags"
+"""
+
+import argparse
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from s3_clients import S3ClientFactory
+
+RESULTS_VERSION = 1
+
+TAGGER = Path(__file__).parent / "tag_existing_log_files.py"
+
+# Tagger options of the compared configurations
+DEFAULT_CONFIGURATIONS = {
+    "batch": ["--max-workers", "32"],
+    "stream": ["--stream", "--max-workers", "32"],
+    "stream-sharded": ["--stream", "--shard-listing", "--max-workers", "32"],
+    "async-sharded": ["--async", "--shard-listing"],
+}
+
+# Files of a Nextflow task directory matched by the log file patterns
+LOG_FILE_NAMES = [
+    ".command.log",
+    ".command.err",
+    ".command.out",
+    ".exitcode",
+    ".command.sh",
+    ".command.run",
+    ".command.begin",
+]
+
+REQUEST_COUNT_METRIC = "tagger_s3_request_duration_seconds_count"
+
+
+def task_file_names(files_per_task: int, log_ratio: float) -> List[str]:
+    """Names of the files in each synthetic task directory.
+
+    ``log_ratio`` of them (rounded, at most one of each log file name) are
+    log files; the rest are task outputs.
+    """
+    logs = min(round(files_per_task * log_ratio), len(LOG_FILE_NAMES))
+    outputs = [f"output_{i}.bam" for i in range(files_per_task - logs)]
+    return LOG_FILE_NAMES[:logs] + outputs
+
+
+def synthetic_keys(tasks: int, names: List[str]) -> List[str]:
+    """Keys of a work/ tree with ``tasks`` task directories."""
+    return [
+        f"work/{i % 256:02x}/{i:030x}/{name}" for i in range(tasks) for name in names
+    ]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_moto_server(timeout: float = 30.0) -> Tuple[subprocess.Popen, str]:
+    """Start moto_server on a free local port and wait until it answers."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    endpoint_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("moto server exited; is moto[server] installed?")
+        try:
+            urllib.request.urlopen(endpoint_url, timeout=1).close()
+            return process, endpoint_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"moto server did not start within {timeout:.0f}s")
+
+
+def seed_bucket(s3_client, bucket: str, keys: List[str], workers: int):
+    """Create ``bucket`` and write a small object for every key."""
+    s3_client.create_bucket(Bucket=bucket)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(
+            executor.map(
+                lambda key: s3_client.put_object(Bucket=bucket, Key=key, Body=b"x"),
+                keys,
+            )
+        )
+
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """Map OpenMetrics sample names (with labels) to their values."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def request_counts(samples: Dict[str, float]) -> Dict[str, int]:
+    """S3 request counts by operation from parsed tagger metrics."""
+    prefix = REQUEST_COUNT_METRIC + '{operation="'
+    return {
+        name[len(prefix) : -2]: int(value)
+        for name, value in sorted(samples.items())
+        if name.startswith(prefix)
+    }
+
+
+def run_tagger(
+    endpoint_url: str, bucket: str, options: List[str], work_dir: Path
+) -> Dict:
+    """Run the tagger in a child process and measure it.
+
+    Returns:
+        Wall time, peak RSS, exit code and the parsed metrics of the run
+    """
+    metrics_path = work_dir / "metrics.prom"
+    command = [
+        sys.executable,
+        str(TAGGER),
+        "--bucket",
+        bucket,
+        "--endpoint-url",
+        endpoint_url,
+        "--metrics-file",
+        str(metrics_path),
+        *options,
+    ]
+    with open(work_dir / "tagger.out", "wb") as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command, cwd=work_dir, stdout=output, stderr=subprocess.STDOUT
+        )
+        # wait4 reports the resource usage of this child alone
+        _, status, rusage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    samples = parse_metrics(metrics_path.read_text()) if metrics_path.exists() else {}
+    return {
+        "seconds": seconds,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": rusage.ru_maxrss / 1024,
+        "exit_code": process.returncode,
+        "samples": samples,
+    }
+
+
+def benchmark_configuration(
+    name: str,
+    options: List[str],
+    endpoint_url: str,
+    keys: List[str],
+    seed_workers: int,
+) -> Dict:
+    """Seed a fresh bucket and measure one tagger configuration on it."""
+    bucket = f"benchmark-{uuid.uuid4().hex[:12]}"
+    factory = S3ClientFactory(seed_workers, endpoint_url)
+    seed_bucket(factory.client(), bucket, keys, seed_workers)
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-tagging-") as tmp:
+        run = run_tagger(endpoint_url, bucket, options, Path(tmp))
+        if run["exit_code"] != 0:
+            output = (Path(tmp) / "tagger.out").read_text().splitlines()
+            print("\n".join(output[-20:]), file=sys.stderr)
+
+    samples = run["samples"]
+    listed = int(samples.get("tagger_objects_listed_total", 0))
+    requests = request_counts(samples)
+    return {
+        "name": name,
+        "options": options,
+        "exit_code": run["exit_code"],
+        "seconds": round(run["seconds"], 3),
+        "objects_listed": listed,
+        "objects_classified": int(samples.get("tagger_objects_classified_total", 0)),
+        "objects_tagged": int(
+            samples.get('tagger_objects_processed_total{result="tagged"}', 0)
+        ),
+        "objects_per_second": round(listed / run["seconds"], 1),
+        "peak_rss_mb": round(run["peak_rss_mb"], 1),
+        "requests": requests,
+        "requests_total": sum(requests.values()),
+        "requests_throttled": int(
+            sum(
+                value
+                for sample, value in samples.items()
+                if sample.startswith("tagger_s3_requests_throttled_total")
+            )
+        ),
+    }
+
+
+def compare_results(baseline: Dict, current: Dict) -> List[Tuple[str, float, float]]:
+    """Pair objects/sec of configurations present in both result sets.
+
+    Returns:
+        ``(name, baseline rate, current rate)`` tuples
+    """
+    previous = {r["name"]: r["objects_per_second"] for r in baseline["results"]}
+    return [
+        (r["name"], previous[r["name"]], r["objects_per_second"])
+        for r in current["results"]
+        if r["name"] in previous
+    ]
+
+
+def parse_configuration(value: str) -> Tuple[str, List[str]]:
+    """Parse a ``NAME=TAGGER OPTIONS`` argument."""
+    name, sep, options = value.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=OPTIONS, got {value!r}")
+    return name, shlex.split(options)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the log file tagger against a local moto server"
+    )
+    parser.add_argument(
+        "--tasks",
+        type=int,
+        default=2000,
+        help="Task directories in the synthetic work/ tree (default: 2000)",
+    )
+    parser.add_argument(
+        "--files-per-task",
+        type=int,
+        default=8,
+        help="Files in each task directory (default: 8)",
+    )
+    parser.add_argument(
+        "--log-ratio",
+        type=float,
+        default=0.5,
+        help="Fraction of each task's files that are log files (default: 0.5)",
+    )
+    parser.add_argument(
+        "--configuration",
+        action="append",
+        type=parse_configuration,
+        metavar="NAME=OPTIONS",
+        help="Tagger options to benchmark under NAME; repeat for several "
+        f"(default: {', '.join(DEFAULT_CONFIGURATIONS)})",
+    )
+    parser.add_argument(
+        "--endpoint-url",
+        help="Use this running S3 endpoint instead of starting a moto server",
+    )
+    parser.add_argument(
+        "--seed-workers",
+        type=int,
+        default=32,
+        help="Threads writing the synthetic objects (default: 32)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark_tagging.json",
+        help="JSON results file (default: benchmark_tagging.json)",
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH", help="Earlier results file to compare with"
+    )
+    args = parser.parse_args()
+
+    if args.tasks < 1 or args.files_per_task < 1:
+        parser.error("--tasks and --files-per-task must be positive")
+    if not 0 <= args.log_ratio <= 1:
+        parser.error("--log-ratio must be between 0 and 1")
+    baseline: Optional[Dict] = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            parser.error(f"Cannot read {args.baseline}: {e}")
+    configurations = dict(args.configuration or DEFAULT_CONFIGURATIONS.items())
+
+    # The tagger and the seeding clients only talk to the local endpoint
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    names = task_file_names(args.files_per_task, args.log_ratio)
+    keys = synthetic_keys(args.tasks, names)
+    log_objects = args.tasks * sum(name in LOG_FILE_NAMES for name in names)
+    print(f"Synthetic tree: {len(keys)} objects, {log_objects} log files")
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if endpoint_url is None:
+        server, endpoint_url = start_moto_server()
+    try:
+        results = []
+        for name, options in configurations.items():
+            result = benchmark_configuration(
+                name, options, endpoint_url, keys, args.seed_workers
+            )
+            results.append(result)
+            status = "" if result["exit_code"] == 0 else "  FAILED"
+            print(
+                f"{name:<16} {result['seconds']:7.2f}s "
+                f"{result['objects_per_second']:8.0f} obj/s "
+                f"{result['peak_rss_mb']:7.1f} MiB "
+                f"{result['requests_total']:7d} requests{status}"
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "tree": {
+            "tasks": args.tasks,
+            "files_per_task": args.files_per_task,
+            "log_ratio": args.log_ratio,
+            "objects": len(keys),
+            "log_objects": log_objects,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        if baseline.get("tree") != report["tree"]:
+            print("Note: the baseline used a different synthetic tree")
+        for name, before, after in compare_results(baseline, report):
+            change = (after - before) / before * 100 if before else float("inf")
+            print(f"{name:<16} {before:8.0f} -> {after:8.0f} obj/s ({change:+.1f}%)")
+
+    if any(result["exit_code"] != 0 for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
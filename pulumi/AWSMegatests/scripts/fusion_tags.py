@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Parser and matcher for the Fusion file system ``fusion.tags`` setting.
+
+Fusion tags the files it writes according to a list of rules such as::
+
+    [.command.*|.exitcode|.fusion.*](nextflow.io/metadata=true),[*](nextflow.io/temporary=true)
+
+Each rule is a ``|``-separated list of glob patterns in square brackets
+followed by ``key=value`` tags in parentheses. Patterns match the file name
+and the first matching rule wins. Compiling the rules into one regular
+expression lets the tagger classify keys exactly as live runs do, in a
+single pass per key.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, cast
+
+# nextflow-base.config holds the fusion.tags used by all compute environments
+DEFAULT_CONFIG_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "seqerakit"
+    / "configs"
+    / "nextflow-base.config"
+)
+
+RULE_PATTERN = re.compile(r"\[(?P<globs>[^\]]*)\]\((?P<tags>[^)]*)\)")
+CONFIG_TAGS_PATTERN = re.compile(
+    r"""(?:fusion\s*\.\s*tags|\btags)\s*=\s*(?P<quote>['"])(?P<spec>.*?)(?P=quote)"""
+)
+
+
+# Tag class label of objects no rule matched
+UNTAGGED = "untagged"
+
+
+class FusionTagsError(ValueError):
+    """Raised when a fusion.tags specification cannot be parsed."""
+
+
+class FusionTagRule(NamedTuple):
+    """A single ``[globs](tags)`` rule."""
+
+    globs: Tuple[str, ...]
+    tags: Dict[str, str]
+
+
+def glob_to_regex(glob: str) -> str:
+    """Translate a Fusion glob (``*`` and ``?`` wildcards) to a regex fragment."""
+    return "".join(
+        ".*" if char == "*" else "." if char == "?" else re.escape(char)
+        for char in glob
+    )
+
+
+def parse_fusion_tags(spec: str) -> List[FusionTagRule]:
+    """Parse a fusion.tags specification into ordered rules.
+
+    Args:
+        spec: Specification string, e.g. ``[*.log](a=b),[*](c=d)``
+
+    Returns:
+        Rules in evaluation order
+
+    Raises:
+        FusionTagsError: If the specification is malformed
+    """
+    rules = []
+    position = 0
+    spec = spec.strip()
+    while position < len(spec):
+        match = RULE_PATTERN.match(spec, position)
+        if not match:
+            raise FusionTagsError(
+                f"Invalid fusion.tags rule at position {position}: {spec[position:]!r}"
+            )
+
+        globs = tuple(g.strip() for g in match.group("globs").split("|") if g.strip())
+        if not globs:
+            raise FusionTagsError(f"Rule without patterns: {match.group(0)!r}")
+
+        tags = {}
+        for pair in match.group("tags").split(","):
+            key, sep, value = pair.partition("=")
+            if not sep or not key.strip():
+                raise FusionTagsError(f"Invalid tag {pair!r} in {match.group(0)!r}")
+            tags[key.strip()] = value.strip()
+
+        rules.append(FusionTagRule(globs, tags))
+        position = match.end()
+        if position < len(spec):
+            if spec[position] != ",":
+                raise FusionTagsError(
+                    f"Expected ',' between rules at position {position}"
+                )
+            position += 1
+
+    if not rules:
+        raise FusionTagsError("Empty fusion.tags specification")
+    return rules
+
+
+def strip_line_comment(line: str) -> str:
+    """Remove a ``//`` comment from a config line.
+
+    Only ``//`` outside quoted strings that starts the line or follows
+    whitespace begins a comment, so values such as ``'s3://bucket'`` stay
+    intact.
+    """
+    quote = None
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if quote is not None:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif line.startswith("//", index) and (index == 0 or line[index - 1].isspace()):
+            return line[:index]
+        index += 1
+    return line
+
+
+def load_fusion_tags_spec(config_path: Optional[str] = None) -> str:
+    """Read the fusion.tags specification from a Nextflow config file.
+
+    Args:
+        config_path: Path to the config (default: nextflow-base.config)
+
+    Returns:
+        The raw specification string
+
+    Raises:
+        FusionTagsError: If the config has no fusion tags setting
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    text = path.read_text()
+    # Drop // comments so commented-out settings are ignored
+    text = "\n".join(strip_line_comment(line) for line in text.splitlines())
+
+    in_fusion_block = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if re.match(r"fusion\s*\{", stripped):
+            in_fusion_block = True
+        match = CONFIG_TAGS_PATTERN.search(stripped)
+        if match and (in_fusion_block or stripped.startswith("fusion")):
+            return match.group("spec")
+        if in_fusion_block and "}" in stripped:
+            in_fusion_block = False
+
+    raise FusionTagsError(f"No fusion.tags setting found in {path}")
+
+
+def tag_class_label(tags: Dict[str, str]) -> str:
+    """Short label for a tag set, e.g. ``metadata`` for nextflow.io/metadata."""
+    return ",".join(key.rsplit("/", 1)[-1] for key in tags) or UNTAGGED
+
+
+class FusionTagMatcher:
+    """Classify object keys with compiled fusion.tags rules."""
+
+    def __init__(self, rules: List[FusionTagRule]):
+        self.rules = rules
+        # One named group per rule; regex alternation is tried left to right,
+        # so the first matching group is the first matching rule
+        alternatives = []
+        for index, rule in enumerate(rules):
+            globs = "|".join(glob_to_regex(glob) for glob in rule.globs)
+            alternatives.append(f"(?P<rule{index}>{globs})")
+        self.regex = re.compile("(?:" + "|".join(alternatives) + r")\Z", re.DOTALL)
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "FusionTagMatcher":
+        """Build a matcher from a specification string."""
+        return cls(parse_fusion_tags(spec))
+
+    @classmethod
+    def from_config(cls, config_path: Optional[str] = None) -> "FusionTagMatcher":
+        """Build a matcher from the fusion.tags in a Nextflow config file."""
+        return cls.from_spec(load_fusion_tags_spec(config_path))
+
+    @property
+    def tag_keys(self) -> Set[str]:
+        """All tag keys managed by the rules."""
+        return {key for rule in self.rules for key in rule.tags}
+
+    def tags_for(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the tags Fusion would give an object, or None if no rule matches."""
+        match = self.regex.match(key.rpartition("/")[2])
+        if match is None:
+            return None
+        # Every alternative is a rule<N> group, so a match always names one
+        return self.rules[int(cast(str, match.lastgroup)[4:])].tags
+
+    def classify(self, objects: List[Dict]) -> List[Dict]:
+        """Annotate listing objects with their target tags in one pass.
+
+        Args:
+            objects: Object dictionaries, e.g. the "Contents" of a listing page
+
+        Returns:
+            Copies of the matching objects with a "Tags" entry added
+        """
+        match = self.regex.match
+        rules = self.rules
+        classified = []
+        for obj in objects:
+            m = match(obj["Key"].rpartition("/")[2])
+            if m is not None:
+                rule = rules[int(cast(str, m.lastgroup)[4:])]
+                classified.append({**obj, "Tags": rule.tags})
+        return classified
@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Offline simulator for the bucket's S3 lifecycle rules.
+
+Loads an S3 Inventory snapshot and evaluates lifecycle rules against every
+object the way S3 does: prefix, tag and object size filters, actions due at
+the first midnight UTC after the object's age reaches the rule's days,
+expiration winning over transitions and the coldest due transition winning
+over warmer ones. Objects below 128 KiB are not transitioned unless the
+rule filters on object size, matching S3's default minimum transition size.
+
+The rules default to S3_LIFECYCLE_RULES in src/utils/constants.py, i.e. the
+rules create_s3_lifecycle_configuration() deploys. A candidate rule set can
+be given as JSON in the shape returned by
+``aws s3api get-bucket-lifecycle-configuration`` and compared with them
+before it is deployed.
+
+Inventory reports carry no object tags, so tags are inferred from the
+fusion.tags rules in nextflow-base.config for keys under the work
+directory, which is where Fusion writes tagged files.
+
+Per-object state is held in NumPy columns (about 20 bytes per object) and
+daily bytes per storage class are projected with day-bucket difference
+arrays, so a projection over tens of millions of objects takes seconds.
+The projection covers the snapshot only: objects written after it,
+non-current versions and incomplete multipart uploads are not simulated.
+
+Usage:
+    python lifecycle_simulator.py --inventory-manifest inventory/manifest.json
+    python lifecycle_simulator.py --inventory-manifest inventory/manifest.json \\
+        --compare candidate-rules.json --horizon 365 --csv daily.csv
+
+Requirements:
+    - numpy (pip install numpy)
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import logging
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, cast
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("The lifecycle simulator requires numpy (pip install numpy)")
+
+from fusion_tags import FusionTagMatcher, FusionTagsError
+from prune_work_directories import (
+    GB,
+    MINIMUM_STORAGE_DAYS,
+    STORAGE_PRICE_PER_GB_MONTH,
+    format_bytes,
+)
+from s3_inventory import InventoryError, iter_inventory_objects, load_inventory_manifest
+
+logger = logging.getLogger(__name__)
+
+CONSTANTS_PATH = Path(__file__).parent.parent / "src" / "utils" / "constants.py"
+
+# Storage classes from warmest to coldest. Lifecycle transitions only move
+# objects to a colder class.
+STORAGE_CLASSES = (
+    "STANDARD",
+    "INTELLIGENT_TIERING",
+    "STANDARD_IA",
+    "ONEZONE_IA",
+    "GLACIER_IR",
+    "GLACIER",
+    "DEEP_ARCHIVE",
+)
+CLASS_INDEX = {name: index for index, name in enumerate(STORAGE_CLASSES)}
+
+# us-east-1 lifecycle transition request prices in USD, by target class
+TRANSITION_PRICE_PER_1000 = {
+    "INTELLIGENT_TIERING": 0.01,
+    "STANDARD_IA": 0.01,
+    "ONEZONE_IA": 0.01,
+    "GLACIER_IR": 0.02,
+    "GLACIER": 0.03,
+    "DEEP_ARCHIVE": 0.05,
+}
+
+# Objects smaller than this are not transitioned unless a rule filters on size
+MIN_TRANSITION_SIZE = 128 * 1024
+
+# Billing adjustments: minimum billable object size, and per-object index
+# overhead for the archive classes
+MIN_BILLABLE_SIZE = {
+    "STANDARD_IA": 128 * 1024,
+    "ONEZONE_IA": 128 * 1024,
+    "GLACIER_IR": 128 * 1024,
+}
+ARCHIVE_OVERHEAD_BYTES = {"GLACIER": 40 * 1024, "DEEP_ARCHIVE": 40 * 1024}
+
+SECONDS_PER_DAY = 86400
+NEVER = np.iinfo(np.int32).max
+
+UNTAGGED = 0
+
+
+class LifecycleRuleError(ValueError):
+    """Raised when a lifecycle rule cannot be simulated."""
+
+
+def load_deployed_rules() -> List[Dict]:
+    """Return S3_LIFECYCLE_RULES from src/utils/constants.py.
+
+    The module is loaded by path because importing the src package pulls in
+    Pulumi and the Seqera provider.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "_megatests_constants", CONSTANTS_PATH
+    )
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load lifecycle rules from {CONSTANTS_PATH}")
+    constants = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(constants)
+    return constants.S3_LIFECYCLE_RULES
+
+
+def load_rules_file(path: str) -> List[Dict]:
+    """Load lifecycle rules from JSON, either ``{"Rules": [...]}`` or a list."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise LifecycleRuleError(f"Cannot read lifecycle rules {path}: {e}")
+    rules = data.get("Rules") if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise LifecycleRuleError(f"{path} does not contain a list of rules")
+    return rules
+
+
+def _day_number(value: date) -> int:
+    """Days since the epoch of a date (or of a datetime's UTC date)."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date()
+    return (value - date(1970, 1, 1)).days
+
+
+def _parse_date(value) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return _day_number(value)
+
+
+@dataclass
+class LifecycleAction:
+    """A transition or expiration due a number of days after creation, or on a date."""
+
+    storage_class: Optional[str]
+    days: Optional[int] = None
+    # Epoch day number, for actions with a Date
+    day: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, action: Dict, storage_class: Optional[str] = None):
+        if "Days" in action:
+            return cls(storage_class, days=int(action["Days"]))
+        if "Date" in action:
+            return cls(storage_class, day=_parse_date(action["Date"]))
+        raise LifecycleRuleError(f"Lifecycle action needs Days or Date: {action}")
+
+
+@dataclass
+class LifecycleRule:
+    """An enabled lifecycle rule reduced to what affects current objects."""
+
+    rule_id: str
+    prefix: str = ""
+    tags: Dict[str, str] = field(default_factory=dict)
+    size_greater_than: Optional[int] = None
+    size_less_than: Optional[int] = None
+    transitions: List[LifecycleAction] = field(default_factory=list)
+    expiration: Optional[LifecycleAction] = None
+
+    @classmethod
+    def from_api(cls, rule: Dict) -> "LifecycleRule":
+        """Build a rule from its S3 API representation."""
+        rule_filter = rule.get("Filter") or {}
+        conditions = rule_filter.get("And", rule_filter)
+        tags = {tag["Key"]: tag["Value"] for tag in conditions.get("Tags", [])}
+        if "Tag" in conditions:
+            tags[conditions["Tag"]["Key"]] = conditions["Tag"]["Value"]
+
+        transitions = []
+        for transition in rule.get("Transitions", []):
+            storage_class = transition.get("StorageClass")
+            if storage_class not in CLASS_INDEX:
+                raise LifecycleRuleError(
+                    f"Rule {rule.get('ID')}: unknown storage class {storage_class}"
+                )
+            transitions.append(LifecycleAction.from_api(transition, storage_class))
+
+        expiration = None
+        # ExpiredObjectDeleteMarker-only expirations do not affect current objects
+        if rule.get("Expiration") and set(rule["Expiration"]) & {"Days", "Date"}:
+            expiration = LifecycleAction.from_api(rule["Expiration"])
+
+        return cls(
+            rule_id=rule.get("ID", ""),
+            prefix=conditions.get("Prefix", rule.get("Prefix", "")),
+            tags=tags,
+            size_greater_than=conditions.get("ObjectSizeGreaterThan"),
+            size_less_than=conditions.get("ObjectSizeLessThan"),
+            transitions=transitions,
+            expiration=expiration,
+        )
+
+    @property
+    def filters_on_size(self) -> bool:
+        return self.size_greater_than is not None or self.size_less_than is not None
+
+
+def parse_rules(rules: Iterable[Dict]) -> List[LifecycleRule]:
+    """Parse the enabled rules of a lifecycle configuration.
+
+    Rules without transitions or expirations (e.g. aborting incomplete
+    multipart uploads) do not affect current objects and are skipped.
+    """
+    parsed = [
+        LifecycleRule.from_api(rule)
+        for rule in rules
+        if rule.get("Status") == "Enabled"
+    ]
+    return [rule for rule in parsed if rule.transitions or rule.expiration]
+
+
+class InventorySnapshot:
+    """Columnar per-object state of an inventory snapshot.
+
+    Keys are not kept. Each object is reduced to its size, the day its
+    lifecycle clock starts relative to the simulation start, its storage
+    class, its (inferred) tag set and a bitmask of the rule prefixes it
+    falls under.
+    """
+
+    def __init__(
+        self,
+        objects: Iterable[Dict],
+        start_day: int,
+        prefixes: Sequence[str],
+        matcher: Optional[FusionTagMatcher] = None,
+        tagged_prefix: str = "work/",
+    ):
+        """Load objects into columns.
+
+        Args:
+            objects: Inventory objects (Key, Size, LastModified, StorageClass)
+            start_day: Epoch day number of the first simulated day
+            prefixes: Rule prefixes to evaluate (at most 32)
+            matcher: fusion.tags rules used to infer object tags
+            tagged_prefix: Only keys under this prefix get inferred tags
+        """
+        self.prefixes = sorted(set(prefixes))
+        if len(self.prefixes) > 32:
+            raise LifecycleRuleError("At most 32 distinct rule prefixes are supported")
+        prefix_bits = [(prefix, 1 << bit) for bit, prefix in enumerate(self.prefixes)]
+
+        # Tag set 0 is "no tags"; set i is the tags of fusion.tags rule i - 1
+        self.tag_sets: List[Dict[str, str]] = [{}]
+        if matcher is not None:
+            self.tag_sets += [rule.tags for rule in matcher.rules]
+
+        sizes = array("q")
+        clock = array("q")
+        classes = array("b")
+        tag_ids = array("b")
+        bits = array("Q")
+        start_seconds = start_day * SECONDS_PER_DAY
+        for obj in objects:
+            key = obj["Key"]
+            sizes.append(obj.get("Size") or 0)
+
+            # Lifecycle days count from creation, rounded up to midnight UTC
+            modified = obj.get("LastModified")
+            seconds = modified.timestamp() if modified else start_seconds
+            clock.append(-int(-seconds // SECONDS_PER_DAY) - start_day)
+
+            classes.append(CLASS_INDEX.get(obj.get("StorageClass") or "STANDARD", 0))
+
+            tag_id = UNTAGGED
+            if matcher is not None and key.startswith(tagged_prefix):
+                match = matcher.regex.match(key.rpartition("/")[2])
+                if match is not None:
+                    tag_id = int(cast(str, match.lastgroup)[4:]) + 1
+            tag_ids.append(tag_id)
+
+            mask = 0
+            for prefix, bit in prefix_bits:
+                if key.startswith(prefix):
+                    mask |= bit
+            bits.append(mask)
+
+        self.sizes = np.frombuffer(sizes, dtype=np.int64)
+        self.clock = np.frombuffer(clock, dtype=np.int64).astype(np.int32)
+        self.classes = np.frombuffer(classes, dtype=np.int8)
+        self.tag_ids = np.frombuffer(tag_ids, dtype=np.int8)
+        self.prefix_bits = np.frombuffer(bits, dtype=np.uint64).astype(np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def rule_mask(self, rule: LifecycleRule, rows: slice) -> np.ndarray:
+        """Boolean mask of the objects in ``rows`` a rule's filter selects."""
+        sizes = self.sizes[rows]
+        mask = np.ones(len(sizes), dtype=bool)
+        if rule.prefix:
+            bit = np.uint32(1 << self.prefixes.index(rule.prefix))
+            mask &= (self.prefix_bits[rows] & bit) != 0
+        if rule.tags:
+            matching_sets = [
+                tag_id
+                for tag_id, tags in enumerate(self.tag_sets)
+                if all(tags.get(k) == v for k, v in rule.tags.items())
+            ]
+            mask &= np.isin(self.tag_ids[rows], matching_sets)
+        if rule.size_greater_than is not None:
+            mask &= sizes > rule.size_greater_than
+        if rule.size_less_than is not None:
+            mask &= sizes < rule.size_less_than
+        return mask
+
+    def due_day(
+        self, action: LifecycleAction, start_day: int, rows: slice
+    ) -> np.ndarray:
+        """Simulation day on which an action is due for the objects in ``rows``.
+
+        Actions already overdue are applied on day 0.
+        """
+        clock = self.clock[rows]
+        if action.days is not None:
+            due = clock + action.days
+        else:
+            # from_api() sets either days or day
+            assert action.day is not None
+            due = np.full(len(clock), action.day - start_day, dtype=np.int32)
+        return np.maximum(due, 0)
+
+
+class _Projection:
+    """Running totals of a simulation, accumulated chunk by chunk."""
+
+    def __init__(self, horizon: int):
+        self.horizon = horizon
+        self.byte_steps = np.zeros((len(STORAGE_CLASSES), horizon + 1))
+        self.object_steps = np.zeros((len(STORAGE_CLASSES), horizon + 1), np.int64)
+        self.storage_cost = np.zeros(len(STORAGE_CLASSES))
+        self.transitions = np.zeros(len(STORAGE_CLASSES), np.int64)
+        self.rule_matches: Dict[str, int] = {}
+        self.expired_objects = 0
+        self.expired_bytes = 0
+        self.early_deletion_cost = 0.0
+
+
+def _simulate_chunk(
+    snapshot: InventorySnapshot,
+    rows: slice,
+    rules: Sequence[LifecycleRule],
+    start_day: int,
+    projection: _Projection,
+):
+    horizon = projection.horizon
+    sizes = snapshot.sizes[rows]
+    classes = snapshot.classes[rows]
+    count = len(sizes)
+    n_classes = len(STORAGE_CLASSES)
+    expire = np.full(count, NEVER, dtype=np.int32)
+    transition_day = np.full((n_classes, count), NEVER, dtype=np.int32)
+
+    for rule in rules:
+        mask = snapshot.rule_mask(rule, rows)
+        projection.rule_matches[rule.rule_id] = projection.rule_matches.get(
+            rule.rule_id, 0
+        ) + int(mask.sum())
+        if rule.expiration is not None:
+            due = snapshot.due_day(rule.expiration, start_day, rows)
+            np.minimum(expire, np.where(mask, due, NEVER), out=expire)
+        if rule.transitions and not rule.filters_on_size:
+            mask &= sizes >= MIN_TRANSITION_SIZE
+        for transition in rule.transitions:
+            # Transitions always name their target class
+            row = transition_day[CLASS_INDEX[cast(str, transition.storage_class)]]
+            due = snapshot.due_day(transition, start_day, rows)
+            np.minimum(row, np.where(mask, due, NEVER), out=row)
+
+    # Objects never move to a warmer class
+    class_rows = np.arange(n_classes, dtype=np.int8)[:, None]
+    current = class_rows == classes[None, :]
+    transition_day[class_rows <= classes[None, :]] = NEVER
+
+    # An object holds class k from the day it transitions to k (day 0 for its
+    # current class) until it expires or a transition to a colder class is due
+    colder_due = np.full((n_classes, count), NEVER, dtype=np.int32)
+    colder_due[:-1] = np.minimum.accumulate(transition_day[::-1], axis=0)[::-1][1:]
+    start = np.where(current, 0, transition_day)
+    end = np.minimum(colder_due, expire[None, :])
+    held = start < end
+
+    expiring = expire < horizon
+    projection.expired_objects += int(expiring.sum())
+    projection.expired_bytes += int(sizes[expiring].sum())
+
+    for k, storage_class in enumerate(STORAGE_CLASSES):
+        selected = held[k]
+        if not selected.any():
+            continue
+        first = np.minimum(start[k][selected], horizon)
+        last = np.minimum(end[k][selected], horizon)
+        class_sizes = sizes[selected]
+
+        projection.byte_steps[k] += np.bincount(first, class_sizes, horizon + 1)
+        projection.byte_steps[k] -= np.bincount(last, class_sizes, horizon + 1)
+        projection.object_steps[k] += np.bincount(first, minlength=horizon + 1)
+        projection.object_steps[k] -= np.bincount(last, minlength=horizon + 1)
+
+        billed = np.maximum(class_sizes, MIN_BILLABLE_SIZE.get(storage_class, 0))
+        billed += ARCHIVE_OVERHEAD_BYTES.get(storage_class, 0)
+        price = STORAGE_PRICE_PER_GB_MONTH.get(storage_class, 0.0)
+        billed_days = (last - first).astype(np.float64)
+        projection.storage_cost[k] += float(billed @ billed_days) / GB * price / 30
+
+        moved = selected & ~current[k] & (start[k] < horizon)
+        projection.transitions[k] += int(moved.sum())
+
+        minimum_days = MINIMUM_STORAGE_DAYS.get(storage_class)
+        if minimum_days:
+            # Objects expiring from this class before its minimum duration;
+            # for the current class the time before day 0 counts from creation
+            deleted = selected & expiring & (end[k] == expire)
+            entered = np.where(
+                current[k], np.minimum(snapshot.clock[rows], 0), start[k]
+            )
+            remaining = minimum_days - (expire.astype(np.int64) - entered)
+            charged = deleted & (remaining > 0)
+            projection.early_deletion_cost += (
+                float(sizes[charged] @ remaining[charged]) / GB * price / 30
+            )
+
+
+def simulate(
+    snapshot: InventorySnapshot,
+    rules: Sequence[LifecycleRule],
+    start_day: int,
+    horizon: int,
+    chunk_size: int = 1_000_000,
+) -> Dict:
+    """Project storage and lifecycle costs of a snapshot under a rule set.
+
+    Objects are processed in chunks so that the per-class working arrays
+    stay bounded on very large inventories.
+
+    Args:
+        snapshot: Loaded inventory columns
+        rules: Enabled lifecycle rules
+        start_day: Epoch day number of the first simulated day
+        horizon: Number of days to simulate
+        chunk_size: Objects simulated at a time
+
+    Returns:
+        Dictionary with daily bytes and objects per storage class, request,
+        storage and early deletion costs, and objects matched per rule
+    """
+    projection = _Projection(horizon)
+    projection.rule_matches = {rule.rule_id: 0 for rule in rules}
+    for offset in range(0, len(snapshot), chunk_size):
+        _simulate_chunk(
+            snapshot, slice(offset, offset + chunk_size), rules, start_day, projection
+        )
+
+    held = np.asarray(projection.object_steps.any(axis=1))
+    classes = [c for k, c in enumerate(STORAGE_CLASSES) if held[k]]
+    daily_bytes = np.rint(np.cumsum(projection.byte_steps[:, :horizon], axis=1))
+    daily_objects = np.cumsum(projection.object_steps[:, :horizon], axis=1)
+    transitions = {
+        c: int(projection.transitions[CLASS_INDEX[c]])
+        for c in classes
+        if projection.transitions[CLASS_INDEX[c]]
+    }
+    transition_cost = sum(
+        requests / 1000 * TRANSITION_PRICE_PER_1000[storage_class]
+        for storage_class, requests in transitions.items()
+    )
+    storage_cost = {c: float(projection.storage_cost[CLASS_INDEX[c]]) for c in classes}
+    total_storage_cost = sum(storage_cost.values())
+
+    start_date = date(1970, 1, 1) + timedelta(days=start_day)
+    return {
+        "rules": [rule.rule_id for rule in rules],
+        "start_date": start_date.isoformat(),
+        "horizon_days": horizon,
+        "objects": len(snapshot),
+        "bytes": int(snapshot.sizes.sum()),
+        "rule_matches": projection.rule_matches,
+        "expired_objects": projection.expired_objects,
+        "expired_bytes": projection.expired_bytes,
+        "transition_requests": transitions,
+        "transition_cost": transition_cost,
+        "storage_cost_by_class": storage_cost,
+        "storage_cost": total_storage_cost,
+        "early_deletion_cost": projection.early_deletion_cost,
+        "total_cost": (
+            total_storage_cost + transition_cost + projection.early_deletion_cost
+        ),
+        "daily": {
+            "date": [
+                (start_date + timedelta(days=day)).isoformat() for day in range(horizon)
+            ],
+            "bytes_by_class": {
+                c: daily_bytes[CLASS_INDEX[c]].astype(np.int64).tolist()
+                for c in classes
+            },
+            "objects_by_class": {
+                c: daily_objects[CLASS_INDEX[c]].tolist() for c in classes
+            },
+        },
+    }
+
+
+def write_daily_csv(result: Dict, path: str):
+    """Write daily bytes per storage class as CSV."""
+    daily = result["daily"]
+    classes = list(daily["bytes_by_class"])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", *classes])
+        for day, day_date in enumerate(daily["date"]):
+            writer.writerow(
+                [day_date, *(daily["bytes_by_class"][c][day] for c in classes)]
+            )
+
+
+def log_result(title: str, result: Dict):
+    """Log a summary of a simulation result."""
+    logger.info("=" * 60)
+    logger.info(title)
+    logger.info("=" * 60)
+    logger.info(
+        f"{result['objects']} objects, {format_bytes(result['bytes'])}, "
+        f"{result['horizon_days']} days from {result['start_date']}"
+    )
+    for rule_id, matched in result["rule_matches"].items():
+        logger.info(f"  rule {rule_id:<40} {matched:>12} objects")
+
+    daily = result["daily"]
+    horizon = result["horizon_days"]
+    checkpoints = sorted({0, 30, 90, 180, 365, horizon - 1} & set(range(horizon)))
+    logger.info("Projected bytes per storage class:")
+    logger.info(
+        "  " + f"{'date':<12}" + "".join(f"{c:>20}" for c in daily["bytes_by_class"])
+    )
+    for day in checkpoints:
+        logger.info(
+            f"  {daily['date'][day]:<12}"
+            + "".join(
+                f"{format_bytes(values[day]):>20}"
+                for values in daily["bytes_by_class"].values()
+            )
+        )
+
+    logger.info(
+        f"Expired: {result['expired_objects']} objects, "
+        f"{format_bytes(result['expired_bytes'])}"
+    )
+    for storage_class, requests in result["transition_requests"].items():
+        logger.info(f"Transitions to {storage_class}: {requests}")
+    logger.info(f"Storage cost: ${result['storage_cost']:.2f}")
+    logger.info(f"Transition request cost: ${result['transition_cost']:.2f}")
+    logger.info(f"Early deletion charges: ${result['early_deletion_cost']:.2f}")
+    logger.info(f"Total cost over the horizon: ${result['total_cost']:.2f}")
+
+
+def main():
+    """Main function to simulate lifecycle rules against an inventory."""
+    parser = argparse.ArgumentParser(
+        description="Project S3 lifecycle rule effects on an inventory snapshot"
+    )
+    parser.add_argument(
+        "--inventory-manifest",
+        required=True,
+        metavar="PATH",
+        help="Local S3 Inventory manifest.json",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="JSON",
+        help="Lifecycle rules to simulate (default: the deployed S3_LIFECYCLE_RULES)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="JSON",
+        help="Candidate lifecycle rules to compare with --rules",
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=180, help="Days to simulate (default: 180)"
+    )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        help="First simulated day, YYYY-MM-DD (default: the inventory date)",
+    )
+    parser.add_argument(
+        "--fusion-config",
+        metavar="CONFIG",
+        help="Nextflow config with the fusion.tags rules used to infer tags "
+        "(default: seqerakit/configs/nextflow-base.config)",
+    )
+    parser.add_argument(
+        "--tagged-prefix",
+        default="work/",
+        help="Prefix of the keys Fusion tags (default: work/)",
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument(
+        "--csv", metavar="PATH", help="Write daily bytes per storage class as CSV"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    if args.horizon < 1:
+        parser.error("--horizon must be at least 1")
+
+    try:
+        rule_sets = {
+            "current": parse_rules(
+                load_rules_file(args.rules) if args.rules else load_deployed_rules()
+            )
+        }
+        if args.compare:
+            rule_sets["candidate"] = parse_rules(load_rules_file(args.compare))
+    except LifecycleRuleError as e:
+        parser.error(str(e))
+
+    try:
+        matcher = FusionTagMatcher.from_config(args.fusion_config)
+    except (OSError, FusionTagsError) as e:
+        parser.error(f"Cannot load fusion.tags rules: {e}")
+
+    try:
+        manifest = load_inventory_manifest(args.inventory_manifest)
+        if args.start_date:
+            start_day = _day_number(args.start_date)
+        elif "creationTimestamp" in manifest:
+            created = int(manifest["creationTimestamp"]) / 1000
+            start_day = _day_number(datetime.fromtimestamp(created, timezone.utc))
+        else:
+            start_day = _day_number(datetime.now(timezone.utc))
+
+        logger.info(f"Loading inventory of {manifest['sourceBucket']}")
+        prefixes = [
+            rule.prefix for rules in rule_sets.values() for rule in rules if rule.prefix
+        ]
+        snapshot = InventorySnapshot(
+            iter_inventory_objects(args.inventory_manifest),
+            start_day,
+            prefixes,
+            matcher,
+            args.tagged_prefix,
+        )
+    except (InventoryError, LifecycleRuleError) as e:
+        logger.error(f"Inventory error: {e}")
+        sys.exit(1)
+
+    results = {
+        name: simulate(snapshot, rules, start_day, args.horizon)
+        for name, rules in rule_sets.items()
+    }
+    for name, result in results.items():
+        log_result(f"LIFECYCLE SIMULATION: {name.upper()} RULES", result)
+    if "candidate" in results:
+        difference = (
+            results["candidate"]["total_cost"] - results["current"]["total_cost"]
+        )
+        logger.info(f"Candidate rules change the total cost by ${difference:+.2f}")
+
+    if args.csv:
+        write_daily_csv(results["current"], args.csv)
+        logger.info(f"Daily projection written to {args.csv}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        logger.info(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
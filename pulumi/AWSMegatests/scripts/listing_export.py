@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Columnar export of bucket listings for offline analysis.
+
+ListingExporter wraps the tagger's page classifier: every listed object
+passes through it, so it records the whole listing (key, size, ETag,
+LastModified, storage class) together with the classification the tagger
+gave each object. Rows are buffered and written as numbered part files of
+Parquet or Arrow IPC, so one crawl of the bucket can feed many reports.
+
+Arrow IPC files are written uncompressed and are memory-mapped when read
+back, so loading an export does not copy the column data. Parquet files
+are smaller but are decoded on read.
+
+A ``_listing.json`` metadata file is written once the listing has been
+consumed to the end; readers refuse exports without it, as they would be
+missing objects.
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from fusion_tags import tag_class_label
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "_listing.json"
+EXPORT_VERSION = 1
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+DEFAULT_ROWS_PER_FILE = 1_000_000
+
+# Classification of objects selected by the log file patterns, which carry
+# no per-object tag set
+LOG_FILE = "log"
+
+# Column name -> listing field name
+COLUMNS = {
+    "key": "Key",
+    "size": "Size",
+    "etag": "ETag",
+    "last_modified": "LastModified",
+    "storage_class": "StorageClass",
+    "classification": "Classification",
+}
+
+
+class ListingExportError(Exception):
+    """Raised when a listing export cannot be written or read."""
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ListingExportError(
+            "Listing export requires pyarrow (pip install pyarrow)"
+        )
+    return pyarrow
+
+
+def listing_schema(pa):
+    """Arrow schema of exported listings."""
+    return pa.schema(
+        [
+            ("key", pa.string()),
+            ("size", pa.int64()),
+            ("etag", pa.string()),
+            ("last_modified", pa.timestamp("ms", tz="UTC")),
+            ("storage_class", pa.dictionary(pa.int8(), pa.string())),
+            ("classification", pa.dictionary(pa.int8(), pa.string())),
+        ]
+    )
+
+
+class ListingExporter:
+    """Classifier wrapper that writes every listed page to columnar files."""
+
+    def __init__(
+        self,
+        directory: str,
+        bucket: str,
+        classifier: Callable[[List[Dict]], List[Dict]],
+        file_format: str = "parquet",
+        rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+    ):
+        """Prepare an empty export directory.
+
+        Args:
+            directory: Directory for the part files; created if missing and
+                must otherwise be empty
+            bucket: Bucket the listing comes from
+            classifier: The page classifier being wrapped
+            file_format: ``parquet`` or ``arrow`` (Arrow IPC file format)
+            rows_per_file: Rows buffered before a part file is written
+
+        Raises:
+            ListingExportError: If pyarrow is missing or the directory is
+                not empty
+        """
+        if file_format not in FORMATS:
+            raise ListingExportError(f"Unknown listing export format {file_format}")
+        self._pa = _import_pyarrow()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if any(self.directory.iterdir()):
+            raise ListingExportError(f"Export directory {directory} is not empty")
+
+        self.bucket = bucket
+        self.classifier = classifier
+        self.file_format = file_format
+        self.rows_per_file = rows_per_file
+        self.schema = listing_schema(self._pa)
+        self.rows = 0
+        self.finished = False
+        self._lock = threading.Lock()
+        self._buffer = self._empty_buffer()
+        self._files: List[str] = []
+        self._next_part = 0
+
+    @staticmethod
+    def _empty_buffer() -> Dict[str, list]:
+        return {column: [] for column in COLUMNS}
+
+    @staticmethod
+    def _classification(obj: Dict) -> str:
+        tags = obj.get("Tags")
+        return tag_class_label(tags) if tags else LOG_FILE
+
+    def __call__(self, objects: List[Dict]) -> List[Dict]:
+        """Classify a page with the wrapped classifier and record all of it."""
+        selected = self.classifier(objects)
+        labels = {obj["Key"]: self._classification(obj) for obj in selected}
+
+        full = None
+        with self._lock:
+            buffer = self._buffer
+            for obj in objects:
+                key = obj["Key"]
+                buffer["key"].append(key)
+                buffer["size"].append(obj.get("Size"))
+                buffer["etag"].append(obj.get("ETag"))
+                buffer["last_modified"].append(obj.get("LastModified"))
+                buffer["storage_class"].append(obj.get("StorageClass"))
+                buffer["classification"].append(labels.get(key))
+            if len(buffer["key"]) >= self.rows_per_file:
+                full = self._take_buffer()
+        if full is not None:
+            self._write_part(*full)
+        return selected
+
+    def _take_buffer(self):
+        # Called with the lock held
+        buffer, self._buffer = self._buffer, self._empty_buffer()
+        part = self._next_part
+        self._next_part += 1
+        return part, buffer
+
+    def _write_part(self, part: int, buffer: Dict[str, list]):
+        pa = self._pa
+        table = pa.Table.from_pydict(buffer, schema=self.schema)
+        name = f"part-{part:05d}{FORMATS[self.file_format]}"
+        path = self.directory / name
+        if self.file_format == "parquet":
+            pa.parquet.write_table(table, path, compression="zstd")
+        else:
+            with pa.OSFile(str(path), "wb") as sink:
+                with pa.ipc.new_file(sink, self.schema) as writer:
+                    writer.write_table(table)
+        with self._lock:
+            self._files.append(name)
+            self.rows += table.num_rows
+        logger.debug(f"Wrote {table.num_rows} listing rows to {path}")
+
+    def complete_after(self, objects: Iterable[Dict]) -> Iterator[Dict]:
+        """Pass objects through, finishing the export once they run out."""
+        yield from objects
+        self.finish()
+
+    def finish(self):
+        """Write the remaining rows and the export metadata."""
+        with self._lock:
+            remaining = self._take_buffer() if self._buffer["key"] else None
+        if remaining is not None:
+            self._write_part(*remaining)
+
+        metadata = {
+            "version": EXPORT_VERSION,
+            "bucket": self.bucket,
+            "format": self.file_format,
+            "rows": self.rows,
+            "files": sorted(self._files),
+            "created": datetime.now(timezone.utc).isoformat(),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(metadata, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.directory / METADATA_FILE)
+        self.finished = True
+        logger.info(
+            f"Exported {self.rows} listed objects to {len(self._files)} "
+            f"{self.file_format} files in {self.directory}"
+        )
+
+
+def load_listing_metadata(directory: str) -> Dict:
+    """Load the metadata of a complete listing export.
+
+    Raises:
+        ListingExportError: If the export is incomplete or unreadable
+    """
+    path = Path(directory) / METADATA_FILE
+    try:
+        with open(path) as f:
+            metadata = json.load(f)
+    except FileNotFoundError:
+        raise ListingExportError(
+            f"{directory} has no {METADATA_FILE}; the export is missing or incomplete"
+        )
+    except (OSError, json.JSONDecodeError) as e:
+        raise ListingExportError(f"Cannot read {path}: {e}")
+    if metadata.get("version") != EXPORT_VERSION:
+        raise ListingExportError(
+            f"Unsupported listing export version {metadata.get('version')}"
+        )
+    return metadata
+
+
+def read_listing_export(directory: str):
+    """Read a listing export as one pyarrow Table.
+
+    Arrow IPC part files are memory-mapped, so their columns are not copied.
+    """
+    pa = _import_pyarrow()
+    metadata = load_listing_metadata(directory)
+    tables = []
+    for name in metadata["files"]:
+        path = str(Path(directory) / name)
+        if metadata["format"] == "arrow":
+            tables.append(pa.ipc.open_file(pa.memory_map(path)).read_all())
+        else:
+            tables.append(pa.parquet.read_table(path, memory_map=True))
+    if not tables:
+        return listing_schema(pa).empty_table()
+    return pa.concat_tables(tables)
+
+
+def iter_listing_export(
+    directory: str, prefix: str = "", batch_size: int = 65536
+) -> Iterator[Dict]:
+    """Yield exported objects with listing field names (Key, Size, ...).
+
+    Objects the tagger selected carry a Classification entry, e.g.
+    ``metadata`` or ``log``; it is None for the others.
+    """
+    import pyarrow.compute as pc
+
+    table = read_listing_export(directory)
+    if prefix:
+        table = table.filter(pc.starts_with(table["key"], prefix))
+    names = [COLUMNS[name] for name in table.schema.names]
+    for batch in table.to_batches(max_chunksize=batch_size):
+        for values in zip(*(column.to_pylist() for column in batch.columns)):
+            yield dict(zip(names, values))
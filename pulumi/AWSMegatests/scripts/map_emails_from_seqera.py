@@ -12,6 +12,8 @@ import sys
 import requests
 from typing import Dict, List, Optional
 
+from seqera_pagination import SeqeraApiError, iter_workspace_participants
+
 
 def get_seqera_participants():
     """Get current participants from Seqera Platform workspace."""
@@ -21,48 +23,34 @@ def get_seqera_participants():
         print("Error: TOWER_ACCESS_TOKEN environment variable not set")
         sys.exit(1)
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     workspace_id = 59994744926013  # AWSMegatests workspace
     org_id = 252464779077610  # nf-core org
 
-    # Use official pagination parameters: max=100 (API limit) to get all participants
-    url = f"https://api.cloud.seqera.io/orgs/{org_id}/workspaces/{workspace_id}/participants?max=100"
-
     print("Fetching ALL workspace participants...")
-    print(f"URL: {url}")
+    print(f"Workspace: {workspace_id} (organization {org_id})")
     print()
 
+    total_size: Dict[str, int] = {}
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-
-        if response.status_code == 200:
-            data = response.json()
-            all_participants = data.get("participants", [])
-            total_size = data.get("totalSize", 0)
-
-            print(f"✓ Got {len(all_participants)}/{total_size} participants")
-
-            if len(all_participants) < total_size:
-                print(
-                    "⚠️  API returned fewer participants than total, but this is the maximum per request"
-                )
-            else:
-                print("🎉 Successfully retrieved ALL workspace participants!")
-
-        else:
-            print(f"✗ Error fetching participants: HTTP {response.status_code}")
-            try:
-                error_data = response.json()
-                print(f"Error details: {error_data}")
-            except Exception:
-                print(f"Response: {response.text}")
-            return []
-
+        all_participants = list(
+            iter_workspace_participants(
+                token, org_id, workspace_id, total_size=total_size
+            )
+        )
+    except SeqeraApiError as e:
+        print(f"✗ Error fetching participants: {e}")
+        return []
     except requests.exceptions.RequestException as e:
         print(f"✗ Network error: {e}")
         return []
 
+    total = total_size.get("total", len(all_participants))
+    print(f"✓ Got {len(all_participants)}/{total} participants")
+    if len(all_participants) < total:
+        print("⚠️  Fewer participants than the reported total (changed while paging?)")
+    else:
+        print("🎉 Successfully retrieved ALL workspace participants!")
+
     print(f"\n✓ Total participants found: {len(all_participants)}")
     return all_participants
 
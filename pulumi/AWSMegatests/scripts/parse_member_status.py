@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Parse individual member status from Pulumi Command outputs.
+Parse member sync statuses from the team sync Pulumi Command output.
 
 This script helps analyze the workspace participant sync results.
 """
@@ -25,14 +25,13 @@ def get_pulumi_outputs():
 
 
 def parse_member_statuses(outputs):
-    """Parse member sync statuses from command outputs."""
+    """Parse member sync statuses from the team sync command output."""
     workspace_participants = outputs.get("workspace_participants", {})
-    member_commands = workspace_participants.get("individual_member_commands", {})
+    team_sync = workspace_participants.get("team_sync", {})
+    command_output = team_sync.get("status") or ""
+    command_id = team_sync.get("command_id", "N/A")
 
-    print("=== Individual Team Member Sync Status ===")
-    print(
-        f"Total tracked members: {workspace_participants.get('total_tracked_members', 0)}"
-    )
+    print("=== Team Member Sync Status ===")
     print(f"Workspace ID: {workspace_participants.get('workspace_id', 'N/A')}")
     print("Role precedence: core team (OWNER) > maintainers (MAINTAIN)")
     print()
@@ -46,48 +45,26 @@ def parse_member_statuses(outputs):
         "UNKNOWN": [],
     }
 
-    for username, cmd_info in member_commands.items():
-        command_output = cmd_info.get("status", "")
-
-        # Parse STATUS line from command output
-        status_line = None
-        for line in command_output.split("\n"):
-            if line.startswith("STATUS:"):
-                status_line = line
-                break
-
-        if status_line:
-            # Parse: STATUS:ADDED:email@example.com:MAINTAIN
-            parts = status_line.split(":")
-            if len(parts) >= 4:
-                status = parts[1]
-                email = parts[2]
-                role = parts[3]
-
-                statuses[status].append(
-                    {
-                        "username": username,
-                        "email": email,
-                        "role": role,
-                        "command_id": cmd_info.get("command_id", "N/A"),
-                    }
-                )
-            else:
-                statuses["UNKNOWN"].append(
-                    {
-                        "username": username,
-                        "status_line": status_line,
-                        "command_id": cmd_info.get("command_id", "N/A"),
-                    }
-                )
+    # One line per member: STATUS:ADDED:email@example.com:MAINTAIN:username
+    for line in command_output.split("\n"):
+        if not line.startswith("STATUS:"):
+            continue
+        parts = line.split(":")
+        if len(parts) >= 5 and parts[1] in statuses:
+            statuses[parts[1]].append(
+                {
+                    "username": parts[4],
+                    "email": parts[2],
+                    "role": parts[3],
+                    "command_id": command_id,
+                }
+            )
         else:
             statuses["UNKNOWN"].append(
                 {
-                    "username": username,
-                    "output": command_output[:100] + "..."
-                    if len(command_output) > 100
-                    else command_output,
-                    "command_id": cmd_info.get("command_id", "N/A"),
+                    "username": parts[4] if len(parts) >= 5 else "unknown",
+                    "output": line,
+                    "command_id": command_id,
                 }
             )
 
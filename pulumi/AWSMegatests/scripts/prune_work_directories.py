@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Prune Nextflow task directories from the S3 work/ directory.
+
+The bucket lifecycle rules expire work/ objects after a fixed number of
+days. This script instead selects whole task directories (work/<xx>/<hash>/)
+by age, total size or absence from a keep-list, and deletes them with
+DeleteObjects requests of up to 1000 keys issued in parallel, so storage is
+reclaimed in minutes.
+
+Without --delete the script only reports what would be removed: directory,
+object and byte counts per storage class, the monthly storage cost saved,
+the cost of the listing requests and any early deletion charges.
+
+Usage:
+    python prune_work_directories.py --bucket nf-core-awsmegatests --older-than 14
+    python prune_work_directories.py --bucket nf-core-awsmegatests \\
+        --keep-list keep.txt --older-than 3 --delete
+
+Requirements:
+    - AWS credentials configured (via AWS CLI, IAM role, or environment variables)
+    - S3 permissions: s3:ListBucket, s3:DeleteObject
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TypedDict
+
+from botocore.exceptions import ClientError
+
+from s3_clients import S3ClientFactory
+from tag_existing_log_files import (
+    get_s3_client,
+    iter_sharded_work_directory_objects,
+    iter_work_directory_objects,
+)
+
+logger = logging.getLogger(__name__)
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# us-east-1 list prices in USD. DELETE requests are free; LIST requests are not.
+STORAGE_PRICE_PER_GB_MONTH = {
+    "STANDARD": 0.023,
+    "INTELLIGENT_TIERING": 0.023,
+    "STANDARD_IA": 0.0125,
+    "ONEZONE_IA": 0.01,
+    "GLACIER_IR": 0.004,
+    "GLACIER": 0.0036,
+    "DEEP_ARCHIVE": 0.00099,
+}
+LIST_REQUEST_PRICE_PER_1000 = 0.005
+
+# Storage classes billed for a minimum duration when deleted early
+MINIMUM_STORAGE_DAYS = {
+    "STANDARD_IA": 30,
+    "ONEZONE_IA": 30,
+    "GLACIER_IR": 90,
+    "GLACIER": 90,
+    "DEEP_ARCHIVE": 180,
+}
+
+GB = 1024**3
+
+
+def configure_logging():
+    """Log to stdout and prune_work_directories.log in the current directory."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler("prune_work_directories.log"),
+        ],
+    )
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count with a binary unit, e.g. ``1.5 GiB``."""
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KiB", "MiB", "GiB", "TiB", "PiB"):
+        size /= 1024
+        if size < 1024:
+            break
+    return f"{size:.1f} {unit}"
+
+
+@dataclass
+class TaskDirectory:
+    """Objects and totals of one work/<xx>/<hash>/ directory."""
+
+    prefix: str
+    keys: List[str] = field(default_factory=list)
+    size: int = 0
+    newest: Optional[datetime] = None
+    bytes_by_class: Dict[str, int] = field(default_factory=dict)
+    early_deletion_cost: float = 0.0
+
+    @property
+    def task_id(self) -> str:
+        """The ``<xx>/<hash>`` part of the prefix, as shown by nextflow log."""
+        return "/".join(self.prefix.rstrip("/").split("/")[-2:])
+
+    def add(self, obj: Dict, now: datetime):
+        """Account for one listed object."""
+        size = obj.get("Size", 0)
+        storage_class = obj.get("StorageClass") or "STANDARD"
+        self.keys.append(obj["Key"])
+        self.size += size
+        self.bytes_by_class[storage_class] = (
+            self.bytes_by_class.get(storage_class, 0) + size
+        )
+
+        modified = obj.get("LastModified")
+        if modified is None:
+            return
+        if self.newest is None or modified > self.newest:
+            self.newest = modified
+
+        minimum_days = MINIMUM_STORAGE_DAYS.get(storage_class)
+        if minimum_days:
+            remaining_days = minimum_days - (now - modified).total_seconds() / 86400
+            if remaining_days > 0:
+                price = STORAGE_PRICE_PER_GB_MONTH.get(storage_class, 0.0)
+                self.early_deletion_cost += size / GB * price * remaining_days / 30
+
+
+def iter_task_directories(
+    objects: Iterable[Dict], prefix: str = "work/", now: Optional[datetime] = None
+) -> Iterator[TaskDirectory]:
+    """Group a listing into task directories, yielding each once complete.
+
+    Listings return the keys of a shard in lexicographic order, so a task
+    directory is complete as soon as a key from another directory of the same
+    shard arrives. Shards may be interleaved, as with the sharded lister, so
+    memory is bounded by one open directory per shard.
+
+    Args:
+        objects: Listed objects under ``prefix``
+        prefix: The work directory prefix
+        now: Reference time for early deletion charges (default: now)
+
+    Yields:
+        TaskDirectory for every work/<xx>/<hash>/ directory. Objects stored
+        directly in work/ or work/<xx>/ are ignored.
+    """
+    now = now or datetime.now(timezone.utc)
+    open_directories: Dict[str, TaskDirectory] = {}
+
+    for obj in objects:
+        parts = obj["Key"][len(prefix) :].split("/", 2)
+        if len(parts) < 3:
+            continue
+        shard, task_hash = parts[0], parts[1]
+        directory_prefix = f"{prefix}{shard}/{task_hash}/"
+
+        current = open_directories.get(shard)
+        if current is None or current.prefix != directory_prefix:
+            if current is not None:
+                yield current
+            current = open_directories[shard] = TaskDirectory(directory_prefix)
+        current.add(obj, now)
+
+    yield from open_directories.values()
+
+
+class KeepList:
+    """Task directories that must never be pruned.
+
+    Each line names a task directory as a full key prefix or S3 URI
+    (``s3://bucket/work/ab/cdef.../``), or by its ``ab/cdef...`` hash. As in
+    ``nextflow log`` output, hashes may be abbreviated; an entry protects
+    every directory whose hash starts with it. Blank lines and lines starting
+    with ``#`` are ignored.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        self._entries: Set[str] = set()
+        for entry in entries:
+            entry = entry.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            if "work/" in entry:
+                entry = entry.rsplit("work/", 1)[1]
+            entry = entry.strip("/")
+            if entry.count("/") != 1:
+                raise ValueError(f"Not a task directory or hash: {entry!r}")
+            self._entries.add(entry)
+        self._lengths = sorted({len(entry) for entry in self._entries})
+
+    @classmethod
+    def from_file(cls, path: str) -> "KeepList":
+        with open(path) as f:
+            return cls(f)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task_id: str) -> bool:
+        return any(task_id[:length] in self._entries for length in self._lengths)
+
+
+@dataclass
+class PruneCriteria:
+    """Selection rules; a directory is pruned only if every given rule holds."""
+
+    older_than: Optional[timedelta] = None
+    min_size: Optional[int] = None
+    keep_list: Optional[KeepList] = None
+    # Directories written to more recently than this are never pruned
+    min_age: timedelta = timedelta(hours=24)
+    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def matches(self, directory: TaskDirectory) -> bool:
+        """Check whether a task directory should be pruned."""
+        if directory.newest is not None:
+            age = self.now - directory.newest
+            if age < self.min_age:
+                return False
+            if self.older_than is not None and age < self.older_than:
+                return False
+        elif self.older_than is not None:
+            return False
+        if self.min_size is not None and directory.size < self.min_size:
+            return False
+        if self.keep_list is not None and directory.task_id in self.keep_list:
+            return False
+        return True
+
+
+class PageCounter:
+    """Pass-through classifier that counts listing pages (LIST requests).
+
+    Passing it as the lister's classifier keeps every object, not just log
+    files.
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, objects: List[Dict]) -> List[Dict]:
+        with self._lock:
+            self.pages += 1
+        return objects
+
+
+def delete_batch(s3_client, bucket_name: str, keys: List[str]) -> List[Dict]:
+    """Delete up to 1000 keys with one DeleteObjects request.
+
+    Returns:
+        The per-key errors reported by S3 (empty on success)
+    """
+    try:
+        response = s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+    except ClientError as e:
+        code = e.response["Error"]["Code"]
+        return [{"Key": key, "Code": code, "Message": str(e)} for key in keys]
+    return response.get("Errors", [])
+
+
+class PruneReport(TypedDict):
+    """Totals of a prune run, as returned by prune_directories()."""
+
+    dry_run: bool
+    directories_scanned: int
+    directories_selected: int
+    objects_selected: int
+    bytes_selected: int
+    bytes_by_storage_class: Dict[str, int]
+    objects_deleted: int
+    delete_errors: int
+    delete_requests: int
+    early_deletion_cost_usd: float
+    monthly_storage_saving_usd: float
+    # Filled in by the caller, which owns the listing
+    list_requests: int
+    list_request_cost_usd: float
+    elapsed_seconds: float
+
+
+def prune_directories(
+    s3_client,
+    bucket_name: str,
+    directories: Iterable[TaskDirectory],
+    criteria: PruneCriteria,
+    dry_run: bool = True,
+    max_workers: int = 16,
+) -> PruneReport:
+    """Select task directories and delete their objects in parallel batches.
+
+    Keys of selected directories are packed into DeleteObjects requests of
+    1000 keys. At most ``2 * max_workers`` requests are in flight, so memory
+    does not grow with the number of selected directories.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        directories: Task directories, e.g. from iter_task_directories()
+        criteria: Selection rules
+        dry_run: If True, only report what would be deleted
+        max_workers: Number of concurrent DeleteObjects requests
+
+    Returns:
+        Report dictionary with directory, object, byte and cost totals
+    """
+    report: PruneReport = {
+        "dry_run": dry_run,
+        "directories_scanned": 0,
+        "directories_selected": 0,
+        "objects_selected": 0,
+        "bytes_selected": 0,
+        "bytes_by_storage_class": {},
+        "objects_deleted": 0,
+        "delete_errors": 0,
+        "delete_requests": 0,
+        "early_deletion_cost_usd": 0.0,
+        "monthly_storage_saving_usd": 0.0,
+        "list_requests": 0,
+        "list_request_cost_usd": 0.0,
+        "elapsed_seconds": 0.0,
+    }
+    bytes_by_class: Dict[str, int] = report["bytes_by_storage_class"]
+    window_size = max_workers * 2
+    start_time = time.time()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: Dict = {}
+        batch: List[str] = []
+
+        def collect(return_when):
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                keys = in_flight.pop(future)
+                errors = future.result()
+                report["objects_deleted"] += len(keys) - len(errors)
+                report["delete_errors"] += len(errors)
+                for error in errors[:5]:
+                    logger.error(
+                        f"Failed to delete {error.get('Key')}: "
+                        f"{error.get('Code')} {error.get('Message')}"
+                    )
+
+        def submit(keys: List[str]):
+            if len(in_flight) >= window_size:
+                collect(FIRST_COMPLETED)
+            in_flight[executor.submit(delete_batch, s3_client, bucket_name, keys)] = (
+                keys
+            )
+            report["delete_requests"] += 1
+
+        for directory in directories:
+            report["directories_scanned"] += 1
+            if not criteria.matches(directory):
+                continue
+
+            report["directories_selected"] += 1
+            report["objects_selected"] += len(directory.keys)
+            report["bytes_selected"] += directory.size
+            report["early_deletion_cost_usd"] += directory.early_deletion_cost
+            for storage_class, size in directory.bytes_by_class.items():
+                bytes_by_class[storage_class] = (
+                    bytes_by_class.get(storage_class, 0) + size
+                )
+            logger.debug(
+                f"Selected {directory.prefix} ({len(directory.keys)} objects, "
+                f"{format_bytes(directory.size)})"
+            )
+
+            if report["directories_selected"] % 1000 == 0:
+                logger.info(
+                    f"Selected {report['directories_selected']} of "
+                    f"{report['directories_scanned']} directories "
+                    f"({format_bytes(report['bytes_selected'])}, "
+                    f"{time.time() - start_time:.0f}s)"
+                )
+
+            if dry_run:
+                continue
+            batch.extend(directory.keys)
+            while len(batch) >= DELETE_BATCH_SIZE:
+                submit(batch[:DELETE_BATCH_SIZE])
+                batch = batch[DELETE_BATCH_SIZE:]
+
+        if batch:
+            submit(batch)
+        if in_flight:
+            collect(ALL_COMPLETED)
+
+    report["monthly_storage_saving_usd"] = sum(
+        size / GB * STORAGE_PRICE_PER_GB_MONTH.get(storage_class, 0.0)
+        for storage_class, size in bytes_by_class.items()
+    )
+    return report
+
+
+def log_report(report: PruneReport):
+    """Log a human readable summary of a prune report."""
+    action = "Would delete" if report["dry_run"] else "Deleted"
+    logger.info("=" * 60)
+    logger.info("PRUNE SUMMARY" + (" (DRY RUN)" if report["dry_run"] else ""))
+    logger.info("=" * 60)
+    logger.info(f"Task directories scanned: {report['directories_scanned']}")
+    logger.info(f"Task directories selected: {report['directories_selected']}")
+    logger.info(
+        f"{action}: {report['objects_selected']} objects, "
+        f"{format_bytes(report['bytes_selected'])}"
+    )
+    for storage_class, size in sorted(report["bytes_by_storage_class"].items()):
+        logger.info(f"  {storage_class}: {format_bytes(size)}")
+    logger.info(
+        f"Storage cost saved: ${report['monthly_storage_saving_usd']:.2f}/month"
+    )
+    logger.info(
+        f"Listing cost: ${report['list_request_cost_usd']:.4f} "
+        f"({report['list_requests']} LIST requests; DeleteObjects is free)"
+    )
+    logger.info(
+        f"Early deletion charges: ${report['early_deletion_cost_usd']:.2f} "
+        "(objects deleted before their storage class minimum duration)"
+    )
+    if not report["dry_run"]:
+        logger.info(
+            f"Objects deleted: {report['objects_deleted']} in "
+            f"{report['delete_requests']} DeleteObjects requests, "
+            f"{report['delete_errors']} errors"
+        )
+
+
+def main():
+    """Main function to select and prune task directories."""
+    parser = argparse.ArgumentParser(
+        description="Prune Nextflow task directories from S3 work/"
+    )
+    parser.add_argument("--bucket", required=True, help="S3 bucket name")
+    parser.add_argument(
+        "--prefix", default="work/", help="Work directory prefix (default: work/)"
+    )
+    parser.add_argument(
+        "--older-than",
+        type=float,
+        metavar="DAYS",
+        help="Select directories whose newest object is older than DAYS",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=float,
+        metavar="GIB",
+        help="Select directories holding at least GIB gibibytes",
+    )
+    parser.add_argument(
+        "--keep-list",
+        metavar="PATH",
+        help="File of task hashes or work directory paths to keep; every other "
+        "directory is selected",
+    )
+    parser.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=24,
+        help="Never prune directories written to within this many hours, so "
+        "running pipelines are left alone (default: 24)",
+    )
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Actually delete the selected directories (default: dry run)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=16,
+        help="Concurrent DeleteObjects requests (default: 16)",
+    )
+    parser.add_argument(
+        "--list-workers",
+        type=int,
+        default=32,
+        help="Number of work/<xx>/ shards listed in parallel (default: 32)",
+    )
+    parser.add_argument(
+        "--no-shard-listing",
+        action="store_true",
+        help="List the work directory sequentially instead of by shard",
+    )
+    parser.add_argument("--report", metavar="PATH", help="Write the report as JSON")
+    parser.add_argument(
+        "--endpoint-url",
+        help="Custom S3 endpoint, e.g. http://localhost:5000 for a moto server",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.older_than is None and args.min_size is None and not args.keep_list:
+        parser.error("Give at least one of --older-than, --min-size or --keep-list")
+
+    keep_list = None
+    if args.keep_list:
+        try:
+            keep_list = KeepList.from_file(args.keep_list)
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot read keep-list {args.keep_list}: {e}")
+
+    configure_logging()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    criteria = PruneCriteria(
+        older_than=(
+            timedelta(days=args.older_than) if args.older_than is not None else None
+        ),
+        min_size=int(args.min_size * GB) if args.min_size is not None else None,
+        keep_list=keep_list,
+        min_age=timedelta(hours=args.min_age_hours),
+    )
+    logger.info(f"Pruning task directories in s3://{args.bucket}/{args.prefix}")
+    if keep_list is not None:
+        logger.info(f"Keeping {len(keep_list)} directories from {args.keep_list}")
+    if not args.delete:
+        logger.info("DRY RUN MODE - pass --delete to remove the selected objects")
+
+    s3_client = get_s3_client(
+        factory=S3ClientFactory(
+            max(args.max_workers, args.list_workers), args.endpoint_url
+        )
+    )
+    try:
+        versioning = s3_client.get_bucket_versioning(Bucket=args.bucket)
+        if versioning.get("Status") == "Enabled":
+            logger.warning(
+                "Bucket versioning is enabled: deletes only add delete markers and "
+                "storage is reclaimed once noncurrent versions expire"
+            )
+    except ClientError as e:
+        logger.debug(f"Could not read bucket versioning: {e}")
+
+    page_counter = PageCounter()
+    if args.no_shard_listing:
+        objects = iter_work_directory_objects(
+            s3_client, args.bucket, args.prefix, classifier=page_counter
+        )
+    else:
+        objects = iter_sharded_work_directory_objects(
+            s3_client,
+            args.bucket,
+            args.prefix,
+            max_workers=args.list_workers,
+            classifier=page_counter,
+        )
+
+    start_time = time.time()
+    report = prune_directories(
+        s3_client,
+        args.bucket,
+        iter_task_directories(objects, args.prefix, criteria.now),
+        criteria,
+        dry_run=not args.delete,
+        max_workers=args.max_workers,
+    )
+    report["list_requests"] = page_counter.pages
+    report["list_request_cost_usd"] = (
+        report["list_requests"] / 1000 * LIST_REQUEST_PRICE_PER_1000
+    )
+    report["elapsed_seconds"] = round(time.time() - start_time, 2)
+
+    log_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        logger.info(f"Report written to {args.report}")
+
+    if report["delete_errors"]:
+        logger.warning(
+            f"{report['delete_errors']} objects could not be deleted - check logs"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
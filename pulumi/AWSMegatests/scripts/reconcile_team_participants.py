@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Reconcile nf-core GitHub teams with the Seqera workspace participants.
+
+One run replaces the per-member team_sync commands: both team member lists
+are fetched once, every member's email is resolved once, the current
+workspace participants are fetched once, and only the members missing from
+the workspace are added. GitHub API traffic is therefore proportional to
+the number of members rather than to its square.
+
+Role precedence: core team (OWNER) > maintainers (MAINTAIN).
+
+Emails come from the member's public GitHub profile, falling back to the
+email cached in scripts/unified_team_data.json by setup_team_data.py (which
+also maps members without a public email via the workspace).
+
+One ``STATUS:<status>:<email>:<role>:<github_username>`` line is printed per
+member for parse_member_status.py.
+
+Usage:
+    uv run python scripts/reconcile_team_participants.py [--dry-run]
+
+Environment Variables:
+    GITHUB_TOKEN: GitHub token with org:read permissions (used by gh)
+    TOWER_ACCESS_TOKEN: Seqera Platform token with workspace access
+    TOWER_WORKSPACE_ID: Workspace to reconcile (default: AWSMegatests)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from add_maintainers_to_workspace import SeqeraWorkspaceManager
+
+# Teams in order of precedence with the workspace role their members get
+TEAMS = [("core", "OWNER"), ("maintainers", "MAINTAIN")]
+
+UNIFIED_DATA_FILE = "scripts/unified_team_data.json"
+
+# Placeholder setup_team_data.py stores for members without a known email
+NO_EMAIL_PREFIX = "github:"
+
+DEFAULT_ORG_ID = 252464779077610  # nf-core
+DEFAULT_WORKSPACE_ID = 59994744926013  # AWSMegatests
+
+GhApi = Callable[[str, str], str]
+
+
+def gh_api(path: str, jq: str) -> str:
+    """Call the GitHub API through gh, following pagination.
+
+    Raises:
+        subprocess.CalledProcessError: If the request fails
+    """
+    result = subprocess.run(
+        ["gh", "api", path, "--paginate", "--jq", jq],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+def fetch_team_roles(gh: GhApi = gh_api) -> Dict[str, str]:
+    """Map every member of the synced teams to their workspace role.
+
+    Each team's member list is fetched once; a member of several teams gets
+    the role of the first team in TEAMS.
+    """
+    roles: Dict[str, str] = {}
+    for team, role in TEAMS:
+        logins = gh(f"orgs/nf-core/teams/{team}/members", ".[].login").split()
+        print(f"Found {len(logins)} members in nf-core/{team} ({role})")
+        for login in logins:
+            roles.setdefault(login, role)
+    return roles
+
+
+def load_cached_emails(path: str = UNIFIED_DATA_FILE) -> Dict[str, str]:
+    """Load the emails setup_team_data.py resolved, by GitHub username."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"No cached team data in {path}; using public GitHub emails only")
+        return {}
+    except json.JSONDecodeError as e:
+        print(f"Ignoring unreadable cached team data {path}: {e}")
+        return {}
+    return {
+        member["github_username"]: member["name"]
+        for member in data.get("seqera_participants", [])
+        if not member["name"].startswith(NO_EMAIL_PREFIX)
+    }
+
+
+def resolve_emails(
+    logins: List[str], cached: Dict[str, str], gh: GhApi = gh_api
+) -> Dict[str, Optional[str]]:
+    """Resolve each member's email with one profile lookup per member.
+
+    The public profile email wins, so changed addresses are picked up; the
+    cached email is used when there is none or the lookup fails.
+    """
+    emails: Dict[str, Optional[str]] = {}
+    for login in logins:
+        try:
+            public = gh(f"/users/{login}", ".email // empty")
+        except subprocess.CalledProcessError as e:
+            print(f"⚠️  Could not fetch profile of {login}: {e.stderr or e}")
+            public = ""
+        if public and cached.get(login) and public != cached[login]:
+            print(f"🔄 {login} email changed: {cached[login]} → {public}")
+        emails[login] = public or cached.get(login)
+    return emails
+
+
+def plan_changes(
+    roles: Dict[str, str],
+    emails: Dict[str, Optional[str]],
+    participants: List[Dict],
+) -> Dict[str, List[Tuple[str, Optional[str], str]]]:
+    """Diff the team members against the current workspace participants.
+
+    Returns:
+        ``(github_username, email, role)`` tuples under ``add`` (not in the
+        workspace), ``exists`` (already a participant) and ``no_email``
+    """
+    current = {p.get("email", "").lower() for p in participants if p.get("email")}
+    plan: Dict[str, List[Tuple[str, Optional[str], str]]] = {
+        "add": [],
+        "exists": [],
+        "no_email": [],
+    }
+    for login in sorted(roles, key=str.lower):
+        email = emails.get(login)
+        if not email:
+            plan["no_email"].append((login, None, roles[login]))
+        elif email.lower() in current:
+            plan["exists"].append((login, email, roles[login]))
+        else:
+            plan["add"].append((login, email, roles[login]))
+    return plan
+
+
+def report_role_mismatches(
+    existing: List[Tuple[str, Optional[str], str]], participants: List[Dict]
+):
+    """Print existing participants whose workspace role differs from their team's."""
+    workspace_roles = {
+        p.get("email", "").lower(): p.get("wspRole", "") for p in participants
+    }
+    for login, email, role in existing:
+        current = workspace_roles.get((email or "").lower(), "")
+        if current and current.lower() != role.lower():
+            print(f"  ! {login} has role {current.lower()}, team role {role.lower()}")
+
+
+def print_status(status: str, login: str, email: Optional[str], role: str):
+    print(f"STATUS:{status}:{email or '-'}:{role}:{login}")
+
+
+def add_status(
+    email: str, results: Dict[str, bool], manager: SeqeraWorkspaceManager
+) -> str:
+    """Status of an attempted add: ADDED, USER_NOT_FOUND or FAILED."""
+    if results.get(email):
+        return "ADDED"
+    if email.lower() in manager.not_found:
+        return "USER_NOT_FOUND"
+    return "FAILED"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Add nf-core team members missing from the Seqera workspace"
+    )
+    parser.add_argument(
+        "--workspace-id",
+        type=int,
+        default=int(os.getenv("TOWER_WORKSPACE_ID") or DEFAULT_WORKSPACE_ID),
+        help="Seqera workspace ID (default: $TOWER_WORKSPACE_ID or AWSMegatests)",
+    )
+    parser.add_argument(
+        "--org-id",
+        type=int,
+        default=DEFAULT_ORG_ID,
+        help=f"Seqera organization ID (default: {DEFAULT_ORG_ID}, nf-core)",
+    )
+    parser.add_argument(
+        "--team-data",
+        default=UNIFIED_DATA_FILE,
+        help=f"Cached team data with resolved emails (default: {UNIFIED_DATA_FILE})",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show the planned changes without adding participants",
+    )
+    args = parser.parse_args()
+
+    token = os.getenv("TOWER_ACCESS_TOKEN")
+    if not token:
+        print("✗ Error: TOWER_ACCESS_TOKEN environment variable not set")
+        sys.exit(1)
+
+    print("=== Reconciling nf-core teams with Seqera workspace participants ===")
+    try:
+        roles = fetch_team_roles()
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"✗ Could not fetch GitHub team members: {e}")
+        sys.exit(1)
+    emails = resolve_emails(list(roles), load_cached_emails(args.team_data))
+
+    manager = SeqeraWorkspaceManager(token, args.org_id, args.workspace_id)
+    participants = manager.get_current_participants()
+    if not manager.participants_loaded:
+        # Without the current list every member would look missing
+        print("✗ Could not fetch the current workspace participants")
+        sys.exit(1)
+    print(f"Found {len(participants)} current workspace participants")
+
+    plan = plan_changes(roles, emails, participants)
+    report_role_mismatches(plan["exists"], participants)
+    print(
+        f"{len(plan['add'])} to add, {len(plan['exists'])} already participants, "
+        f"{len(plan['no_email'])} without an email"
+    )
+    print()
+
+    results: Dict[str, bool] = {}
+    if plan["add"] and not args.dry_run:
+        results = manager.add_maintainers_batch(
+            [
+                {"name": email, "role": role, "github_username": login}
+                for login, email, role in plan["add"]
+            ]
+        )
+        print()
+
+    for login, email, role in plan["add"]:
+        if args.dry_run:
+            print_status("PLANNED", login, email, role)
+        else:
+            print_status(add_status(email, results, manager), login, email, role)
+    for login, email, role in plan["exists"]:
+        print_status("EXISTS", login, email, role)
+    for login, email, role in plan["no_email"]:
+        print_status("NO_EMAIL", login, email, role)
+
+    # Members without a Seqera account are reported, not treated as failures
+    if any(add_status(email, results, manager) == "FAILED" for email in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+S3 client factory for the multi-threaded bucket scripts.
+
+botocore keeps at most ``max_pool_connections`` (default 10) HTTP connections
+per client. Threads beyond that wait for a free connection or open and
+discard extra ones, so a 32-worker tagger sharing a default client runs at
+the speed of ten. S3ClientFactory sizes the pool to the concurrency the
+script actually uses, enables TCP keepalive on the pooled connections and
+selects the adaptive retry mode, whose client-side rate limiter slows all
+threads of a client down together when S3 answers with SlowDown.
+
+Two ways of handing out clients are supported:
+
+- shared (default): one client whose pool holds a connection per worker.
+  Clients are thread-safe, and all workers share one retry rate limiter.
+- per-thread: every thread gets its own client with a small pool, so no
+  thread ever waits on another for a connection. Each client has its own
+  rate limiter and its own endpoint/credential resolution, which costs
+  some memory and startup time per thread.
+
+``benchmark_s3_clients.py`` measures both against a bucket or moto server.
+"""
+
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_MODE = "adaptive"
+DEFAULT_MAX_ATTEMPTS = 10
+
+# Connections kept by each client in per-thread mode; a thread only ever has
+# one request in flight, the spare covers a paginator interleaved with calls
+PER_THREAD_POOL_CONNECTIONS = 2
+
+
+def client_config(
+    max_pool_connections: int,
+    retry_mode: str = DEFAULT_RETRY_MODE,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    tcp_keepalive: bool = True,
+) -> Config:
+    """Build a botocore Config for a client used by several threads.
+
+    Args:
+        max_pool_connections: HTTP connections kept by the client
+        retry_mode: botocore retry mode (legacy, standard or adaptive)
+        max_attempts: Total attempts per request, including the first
+        tcp_keepalive: Enable TCP keepalive on the pooled connections
+    """
+    return Config(
+        max_pool_connections=max(1, max_pool_connections),
+        retries={"mode": retry_mode, "total_max_attempts": max_attempts},
+        tcp_keepalive=tcp_keepalive,
+    )
+
+
+class ThreadLocalS3Client:
+    """Proxy that forwards every call to the calling thread's own client.
+
+    Paginators and waiters are bound to the client of the thread that
+    created them, so they must be used from that thread.
+    """
+
+    def __init__(self, factory: "S3ClientFactory"):
+        self._factory = factory
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self._factory.create_client(
+                PER_THREAD_POOL_CONNECTIONS
+            )
+        return client
+
+    def __getattr__(self, name: str):
+        return getattr(self._client(), name)
+
+
+class S3ClientFactory:
+    """Create S3 clients with connection pools sized to the concurrency."""
+
+    def __init__(
+        self,
+        concurrency: int,
+        endpoint_url: Optional[str] = None,
+        per_thread: bool = False,
+        retry_mode: str = DEFAULT_RETRY_MODE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        tcp_keepalive: bool = True,
+    ):
+        """Configure the clients without creating any yet.
+
+        Args:
+            concurrency: Maximum number of threads issuing S3 requests at once
+            endpoint_url: Optional S3 endpoint, e.g. a local moto server
+            per_thread: Give every thread its own client instead of sharing one
+            retry_mode: botocore retry mode (legacy, standard or adaptive)
+            max_attempts: Total attempts per request, including the first
+            tcp_keepalive: Enable TCP keepalive on the pooled connections
+        """
+        self.concurrency = concurrency
+        self.endpoint_url = endpoint_url
+        self.per_thread = per_thread
+        self.retry_mode = retry_mode
+        self.max_attempts = max_attempts
+        self.tcp_keepalive = tcp_keepalive
+        self.clients_created = 0
+        self._hooks: List[Callable] = []
+        # boto3 sessions are not thread-safe; clients are, once created
+        self._session = boto3.session.Session()
+        self._lock = threading.Lock()
+        self._shared = None
+
+    def add_client_hook(self, hook: Callable):
+        """Call ``hook(client)`` on every client created from now on.
+
+        Used to register botocore event handlers, e.g.
+        TaggingMetrics.instrument_client, on per-thread clients as well.
+        """
+        self._hooks.append(hook)
+
+    def create_client(self, max_pool_connections: Optional[int] = None):
+        """Create a new client.
+
+        Args:
+            max_pool_connections: Pool size (default: the factory concurrency)
+        """
+        config = client_config(
+            max_pool_connections or self.concurrency,
+            self.retry_mode,
+            self.max_attempts,
+            self.tcp_keepalive,
+        )
+        with self._lock:
+            client = self._session.client(
+                "s3", endpoint_url=self.endpoint_url, config=config
+            )
+            self.clients_created += 1
+        for hook in self._hooks:
+            hook(client)
+        return client
+
+    def client(self):
+        """Return the client to hand to worker threads.
+
+        In shared mode this is one client created on first use; in per-thread
+        mode it is a ThreadLocalS3Client proxy.
+        """
+        with self._lock:
+            shared = self._shared
+        if shared is not None:
+            return shared
+        if self.per_thread:
+            shared = ThreadLocalS3Client(self)
+        else:
+            shared = self.create_client()
+            logger.debug(
+                f"Created S3 client with {self.concurrency} pooled connections "
+                f"({self.retry_mode} retries)"
+            )
+        with self._lock:
+            if self._shared is None:
+                self._shared = shared
+            return self._shared
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for S3 Inventory reports stored on local disk.
+
+An inventory delivery consists of a manifest.json describing the report
+schema and a list of data files (gzipped CSV or Parquet). This module
+resolves those data files next to the manifest and yields one dictionary
+per object, using the same field names as a ListObjectsV2 response (Key,
+Size, ETag, LastModified, StorageClass), so inventory rows can be fed into
+code written for live listings.
+
+Parquet support requires pyarrow (pip install pyarrow).
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import unquote_plus
+
+logger = logging.getLogger(__name__)
+
+# Normalised inventory field name -> ListObjectsV2 field name
+FIELD_MAP = {
+    "bucket": "Bucket",
+    "key": "Key",
+    "versionid": "VersionId",
+    "islatest": "IsLatest",
+    "isdeletemarker": "IsDeleteMarker",
+    "size": "Size",
+    "lastmodifieddate": "LastModified",
+    "etag": "ETag",
+    "storageclass": "StorageClass",
+}
+
+
+class InventoryError(Exception):
+    """Raised when an inventory manifest or data file cannot be used."""
+
+
+def _normalise_field(name: str) -> str:
+    return name.strip().replace("_", "").lower()
+
+
+def load_inventory_manifest(manifest_path: str) -> Dict:
+    """Load and validate an inventory manifest.json.
+
+    Args:
+        manifest_path: Path to manifest.json
+
+    Returns:
+        Parsed manifest dictionary
+
+    Raises:
+        InventoryError: If the manifest is missing required fields or uses an
+            unsupported format
+    """
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise InventoryError(f"Cannot read inventory manifest {manifest_path}: {e}")
+
+    for field in ("sourceBucket", "fileFormat", "files"):
+        if field not in manifest:
+            raise InventoryError(f"Inventory manifest is missing '{field}'")
+
+    file_format = manifest["fileFormat"].upper()
+    if file_format not in ("CSV", "PARQUET"):
+        raise InventoryError(
+            f"Unsupported inventory format {manifest['fileFormat']} (use CSV or Parquet)"
+        )
+    if file_format == "CSV" and "fileSchema" not in manifest:
+        raise InventoryError("CSV inventory manifest is missing 'fileSchema'")
+
+    return manifest
+
+
+def resolve_data_file(manifest_path: str, file_key: str) -> Path:
+    """Find a data file listed in the manifest on local disk.
+
+    Inventory file keys are relative to the destination bucket (for example
+    ``source-bucket/config-id/data/<uuid>.csv.gz``). Downloaded reports are
+    commonly laid out either as a mirror of that key or with the data files
+    in a ``data/`` directory beside the manifest, so both are tried.
+
+    Raises:
+        InventoryError: If the file cannot be found
+    """
+    base = Path(manifest_path).parent
+    name = Path(file_key).name
+    for candidate in (base / file_key, base / "data" / name, base / name):
+        if candidate.is_file():
+            return candidate
+    raise InventoryError(f"Inventory data file not found locally: {file_key}")
+
+
+def _convert_row(row: Dict) -> Optional[Dict]:
+    """Convert a raw inventory row to listing-style fields.
+
+    Returns None for delete markers and non-current versions.
+    """
+    obj = {FIELD_MAP[k]: v for k, v in row.items() if k in FIELD_MAP}
+
+    for flag, skip_if in (("IsLatest", False), ("IsDeleteMarker", True)):
+        if flag in obj:
+            value = obj.pop(flag)
+            if isinstance(value, str):
+                value = value.lower() == "true"
+            if value == skip_if:
+                return None
+
+    if "Size" in obj:
+        obj["Size"] = int(obj["Size"] or 0)
+    if isinstance(obj.get("LastModified"), str) and obj["LastModified"]:
+        obj["LastModified"] = datetime.fromisoformat(
+            obj["LastModified"].replace("Z", "+00:00")
+        )
+    if obj.get("ETag") and not obj["ETag"].startswith('"'):
+        # Listings quote ETags; inventory reports do not
+        obj["ETag"] = f'"{obj["ETag"]}"'
+    return obj
+
+
+def _iter_csv_rows(path: Path, fields: List[str]) -> Iterator[Dict]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+        for values in reader:
+            row = dict(zip(fields, values))
+            if "key" in row:
+                row["key"] = unquote_plus(row["key"])
+            yield row
+
+
+def _iter_parquet_rows(path: Path, batch_size: int) -> Iterator[Dict]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise InventoryError(
+            "Reading Parquet inventory requires pyarrow (pip install pyarrow)"
+        )
+
+    parquet_file = pq.ParquetFile(path)
+    columns = [
+        name
+        for name in parquet_file.schema_arrow.names
+        if _normalise_field(name) in FIELD_MAP
+    ]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        normalised = [_normalise_field(name) for name in batch.schema.names]
+        for values in zip(*(column.to_pylist() for column in batch.columns)):
+            yield dict(zip(normalised, values))
+
+
+def iter_inventory_objects(
+    manifest_path: str, prefix: str = "", batch_size: int = 65536
+) -> Iterator[Dict]:
+    """Yield current objects from an inventory report, one data file at a time.
+
+    Only one data file (for Parquet, one record batch) is decoded at a time,
+    so memory use is independent of the size of the inventory.
+
+    Args:
+        manifest_path: Path to the inventory manifest.json
+        prefix: Only yield keys starting with this prefix
+        batch_size: Rows per Parquet record batch
+
+    Yields:
+        Object dictionaries with Key, Size, ETag, LastModified, StorageClass
+    """
+    manifest = load_inventory_manifest(manifest_path)
+    file_format = manifest["fileFormat"].upper()
+    fields = [_normalise_field(f) for f in manifest.get("fileSchema", "").split(",")]
+
+    total = 0
+    for entry in manifest["files"]:
+        path = resolve_data_file(manifest_path, entry["key"])
+        logger.info(f"Reading inventory file {path.name}")
+
+        if file_format == "CSV":
+            rows = _iter_csv_rows(path, fields)
+        else:
+            rows = _iter_parquet_rows(path, batch_size)
+
+        for row in rows:
+            if not str(row.get("key", "")).startswith(prefix):
+                continue
+            obj = _convert_row(row)
+            if obj is not None:
+                total += 1
+                yield obj
+
+    logger.info(f"Inventory read complete: {total} objects under '{prefix}'")
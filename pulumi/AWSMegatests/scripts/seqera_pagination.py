@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Paginated listing of Seqera Platform API collections.
+
+Seqera list endpoints (e.g. workspace participants) return at most 100
+items per request together with the collection's ``totalSize``. The first
+page is fetched on its own to learn the size and the server's page size;
+the remaining offset pages are then fetched concurrently and yielded in
+order as they arrive, so the caller can start processing before the last
+page is in.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+
+SEQERA_API_URL = "https://api.cloud.seqera.io"
+
+# Largest page Seqera list endpoints return
+MAX_PAGE_SIZE = 100
+
+DEFAULT_PAGE_WORKERS = 8
+
+PageFetcher = Callable[[int, int], Dict[str, Any]]
+
+
+class SeqeraApiError(Exception):
+    """Raised when a Seqera API page request does not return 200."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+def http_page_fetcher(
+    url: str, headers: Dict[str, str], timeout: float = 30
+) -> PageFetcher:
+    """Build a page fetcher issuing ``GET url?max=..&offset=..`` requests.
+
+    Raises (when called):
+        SeqeraApiError: If a page request does not return 200
+        requests.exceptions.RequestException: On network errors
+    """
+
+    def fetch_page(offset: int, max_items: int) -> Dict[str, Any]:
+        response = requests.get(
+            url,
+            headers=headers,
+            params={"max": max_items, "offset": offset},
+            timeout=timeout,
+        )
+        if response.status_code != 200:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise SeqeraApiError(response.status_code, message)
+        return response.json()
+
+    return fetch_page
+
+
+def iter_paginated(
+    fetch_page: PageFetcher,
+    items_key: str,
+    page_size: int = MAX_PAGE_SIZE,
+    max_workers: int = DEFAULT_PAGE_WORKERS,
+    total_size: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every item of a paginated collection, in offset order.
+
+    Args:
+        fetch_page: Returns the response body for ``(offset, max)``
+        items_key: Key of the item list in each response body
+        page_size: Items requested per page
+        max_workers: Pages fetched concurrently after the first one
+        total_size: If given, receives the reported size under ``"total"``
+
+    The server may cap pages below ``page_size``; the size of the first page
+    is then used as the step between offsets. A later page that comes back
+    shorter than that step is completed with sequential requests, so no
+    items between two offsets are skipped.
+
+    Errors raised by ``fetch_page`` propagate to the caller; pages still in
+    flight are cancelled when the iterator is closed early.
+    """
+    first = fetch_page(0, page_size)
+    items = first.get(items_key, [])
+    yield from items
+    step = len(items)
+
+    if "totalSize" not in first:
+        # No size to plan with: follow the pages one at a time. A short first
+        # page may be the server's cap rather than the end, so check once more
+        offset = step
+        while items and len(items) == step:
+            items = fetch_page(offset, page_size).get(items_key, [])
+            offset += len(items)
+            yield from items
+        return
+
+    total = first["totalSize"]
+    if total_size is not None:
+        total_size["total"] = total
+    offsets = range(step, total, step) if step else range(0)
+    if not offsets:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(offsets)))
+    try:
+        futures = [executor.submit(fetch_page, offset, step) for offset in offsets]
+        for offset, future in zip(offsets, futures):
+            page = future.result().get(items_key, [])
+            yield from page
+            # Fill the gap a short page leaves before the next offset
+            end = min(offset + step, total)
+            offset += len(page)
+            while page and offset < end:
+                page = fetch_page(offset, end - offset).get(items_key, [])
+                offset += len(page)
+                yield from page
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_workspace_participants(
+    token: str,
+    org_id: int,
+    workspace_id: int,
+    api_url: str = SEQERA_API_URL,
+    max_workers: int = DEFAULT_PAGE_WORKERS,
+    total_size: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield every participant of a Seqera workspace."""
+    fetch_page = http_page_fetcher(
+        f"{api_url}/orgs/{org_id}/workspaces/{workspace_id}/participants",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        },
+    )
+    return iter_paginated(
+        fetch_page, "participants", max_workers=max_workers, total_size=total_size
+    )
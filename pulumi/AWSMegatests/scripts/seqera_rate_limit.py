@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Client-side rate limiting for Seqera Platform API calls.
+
+Batch operations (e.g. adding workspace participants) run requests from a
+thread pool. A shared TokenBucket keeps them under the API's request rate,
+and a 429 response pauses the whole bucket for its Retry-After so that the
+other workers back off too instead of each running into the limit.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+# Stay below Seqera Cloud's per-token API rate limit; bursts are short
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_BURST = 10
+
+# Statuses worth retrying: throttling and transient gateway errors
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second, up to ``capacity`` at once."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_REQUESTS_PER_SECOND,
+        capacity: int = DEFAULT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                # Refills accumulate rounding error; treat "almost one" as one
+                if self._updated <= now and self._tokens >= 1 - 1e-9:
+                    self._tokens = max(self._tokens - 1, 0.0)
+                    return
+                # Paused (refill starts in the future) or out of tokens
+                wait = max(self._updated - now, 0) + (1 - self._tokens) / self.rate
+                # Never sleep for less than the clock can resolve
+                wait = max(wait, 1e-6)
+                self.waited += wait
+            self._sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for ``seconds``, e.g. after a 429."""
+        with self._lock:
+            resume = self._clock() + seconds
+            if resume > self._updated:
+                self._tokens = 0.0
+                self._updated = resume
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Full jitter exponential backoff for the given (1-based) attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -17,24 +17,59 @@ Requirements:
 import argparse
 import boto3
 import logging
+import queue
+import random
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import List, Dict, Tuple
+from datetime import timedelta
+from typing import Callable, List, Dict, Iterator, Optional, Set, Tuple
 import re
+import sqlite3
 import time
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("tag_log_files.log"),
-    ],
+from async_tagging import run_async_tagging
+from batch_operations_manifest import (
+    DEFAULT_MAX_KEYS_PER_MANIFEST,
+    write_batch_manifests,
 )
+from fusion_tags import DEFAULT_CONFIG_PATH, FusionTagMatcher, FusionTagsError
+from listing_export import FORMATS, ListingExporter, ListingExportError
+from s3_clients import S3ClientFactory
+from s3_inventory import InventoryError, iter_inventory_objects, load_inventory_manifest
+from tag_state_cache import TagStateCache
+from tagging_checkpoint import TaggingCheckpoint
+from tagging_metrics import (
+    DEFAULT_WRITE_INTERVAL,
+    MetricsFileWriter,
+    TaggingMetrics,
+    serve_metrics,
+)
+from tagging_watermark import TaggingWatermark, WatermarkError
+from task_directories import (
+    DirectoryStateError,
+    TaskDirectory,
+    TaskDirectoryState,
+    group_task_directories,
+)
+
 logger = logging.getLogger(__name__)
 
+
+def configure_logging():
+    """Log to stdout and tag_log_files.log in the current directory."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler("tag_log_files.log"),
+        ],
+    )
+
+
 # Log file patterns for Nextflow work directories
 LOG_FILE_PATTERNS = [
     r"\.command\.log$",  # Main command log
@@ -50,14 +85,22 @@ LOG_FILE_PATTERNS = [
     r"dag\.html$",  # DAG visualization
 ]
 
-# Compile regex patterns for performance
-COMPILED_PATTERNS = [
-    re.compile(pattern, re.IGNORECASE) for pattern in LOG_FILE_PATTERNS
-]
+# All patterns combined into a single alternation, so classifying a filename
+# is one regex search instead of one search per pattern
+LOG_FILE_REGEX = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in LOG_FILE_PATTERNS), re.IGNORECASE
+)
 
 # Nextflow metadata tag
 METADATA_TAG = {"nextflow.io/metadata": "true"}
 
+# Checkpoint database used by --resume when --checkpoint is not given
+DEFAULT_CHECKPOINT_PATH = "tag_log_files.checkpoint.db"
+
+# Suffixes of the messages for optimistic writes checked by reading first
+SAMPLED = "(sampled)"
+SAMPLED_WITH_OTHER_TAGS = "(sampled, other tags kept)"
+
 
 def is_log_file(key: str) -> bool:
     """Check if an S3 object key matches log file patterns.
@@ -68,17 +111,40 @@ def is_log_file(key: str) -> bool:
     Returns:
         bool: True if key matches log file patterns
     """
-    # Extract filename from key
-    filename = key.split("/")[-1]
+    # Patterns only ever match within the filename
+    return LOG_FILE_REGEX.search(key.rpartition("/")[2]) is not None
 
-    # Check against compiled patterns
-    return any(pattern.search(filename) for pattern in COMPILED_PATTERNS)
 
+def filter_log_objects(objects: List[Dict]) -> List[Dict]:
+    """Return the log file objects from a listing page in one batched pass.
 
-def get_s3_client():
-    """Create and configure S3 client with error handling."""
+    Args:
+        objects: Object dictionaries, e.g. the "Contents" of a listing page
+
+    Returns:
+        The objects whose keys match log file patterns, in order
+    """
+    search = LOG_FILE_REGEX.search
+    return [obj for obj in objects if search(obj["Key"].rpartition("/")[2])]
+
+
+def get_s3_client(
+    endpoint_url: Optional[str] = None,
+    config: Optional[Config] = None,
+    factory: Optional[S3ClientFactory] = None,
+):
+    """Create and configure S3 client with error handling.
+
+    Args:
+        endpoint_url: Optional S3 endpoint, e.g. a local moto server
+        config: Optional botocore client configuration
+        factory: Optional client factory; replaces endpoint_url and config
+    """
     try:
-        client = boto3.client("s3")
+        if factory is not None:
+            client = factory.client()
+        else:
+            client = boto3.client("s3", endpoint_url=endpoint_url, config=config)
         # Test credentials by listing buckets
         client.list_buckets()
         return client
@@ -90,50 +156,335 @@ def get_s3_client():
         sys.exit(1)
 
 
-def list_work_directory_objects(s3_client, bucket_name: str) -> List[Dict]:
-    """List all objects in work/ directories that match log file patterns.
+def iter_work_directory_objects(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "work/",
+    log_progress: bool = True,
+    checkpoint: Optional[TaggingCheckpoint] = None,
+    classifier: Callable[[List[Dict]], List[Dict]] = filter_log_objects,
+    watermark: Optional[TaggingWatermark] = None,
+) -> Iterator[Dict]:
+    """Yield objects in work/ directories that match log file patterns.
+
+    Objects are yielded as soon as their listing page arrives, so callers can
+    start tagging before the scan has finished and memory stays bounded by a
+    single page.
 
     Args:
         s3_client: Boto3 S3 client
         bucket_name: S3 bucket name
-
-    Returns:
-        List of object dictionaries for log files
+        prefix: Key prefix to scan (default: work/)
+        log_progress: If False, only log at debug level (used for shards)
+        checkpoint: Optional checkpoint; listing restarts from its saved
+            continuation token and keys it has already tagged are skipped
+        classifier: Selects the objects to tag from a listing page
+        watermark: Optional watermark state; objects last modified before the
+            prefix's watermark are dropped before classification
+
+    Yields:
+        Object dictionaries for log files
     """
-    log_objects = []
     paginator = s3_client.get_paginator("list_objects_v2")
-
-    logger.info("Scanning work/ directory for log files...")
+    log = logger.info if log_progress else logger.debug
+
+    log(f"Scanning {prefix} directory for log files...")
+
+    list_kwargs = {"Bucket": bucket_name, "Prefix": prefix}
+    if checkpoint is not None:
+        if checkpoint.is_shard_complete(prefix):
+            log(f"Skipping {prefix}: already completed in a previous run")
+            return
+        token = checkpoint.get_continuation_token(prefix)
+        if token:
+            log(f"Resuming {prefix} from saved continuation token")
+            list_kwargs["ContinuationToken"] = token
+    if watermark is not None:
+        watermark.start_shard(prefix)
 
     try:
-        # List objects with work/ prefix
         page_iterator = paginator.paginate(
-            Bucket=bucket_name, Prefix="work/", PaginationConfig={"PageSize": 1000}
+            **list_kwargs, PaginationConfig={"PageSize": 1000}
         )
 
         total_objects = 0
+        log_files = 0
         for page in page_iterator:
-            if "Contents" in page:
-                for obj in page["Contents"]:
-                    total_objects += 1
-                    if is_log_file(obj["Key"]):
-                        log_objects.append(obj)
-
-                    # Progress update every 10k objects
-                    if total_objects % 10000 == 0:
-                        logger.info(
-                            f"Scanned {total_objects} objects, found {len(log_objects)} log files"
-                        )
-
-        logger.info(
-            f"Scan complete: {len(log_objects)} log files found in {total_objects} total objects"
+            contents = page.get("Contents", [])
+            total_objects += len(contents)
+            if watermark is not None:
+                # Pages holding only old objects are dropped without classifying
+                contents = watermark.filter_new(prefix, contents)
+            page_log_objects = classifier(contents)
+
+            if checkpoint is not None:
+                untagged = set(
+                    checkpoint.filter_untagged(obj["Key"] for obj in page_log_objects)
+                )
+                page_log_objects = [
+                    obj for obj in page_log_objects if obj["Key"] in untagged
+                ]
+                checkpoint.begin_page(
+                    prefix,
+                    page.get("NextContinuationToken"),
+                    [obj["Key"] for obj in page_log_objects],
+                )
+
+            log_files += len(page_log_objects)
+            yield from page_log_objects
+
+            # Progress update every 10k objects
+            if total_objects % 10000 < len(contents):
+                log(f"Scanned {total_objects} objects, found {log_files} log files")
+
+        if checkpoint is not None:
+            checkpoint.finish_listing(prefix)
+        if watermark is not None:
+            watermark.finish_shard(prefix)
+
+        log(
+            f"Scan complete: {log_files} log files found in {total_objects} total objects"
         )
 
     except ClientError as e:
         logger.error(f"Error listing objects: {e}")
         raise
 
-    return log_objects
+
+def _put_until_stopped(
+    target_queue: queue.Queue, item, stop_event: threading.Event
+) -> bool:
+    """Put an item on a bounded queue, giving up if the stop event is set.
+
+    Returns:
+        bool: True if the item was queued, False if stopped first
+    """
+    while not stop_event.is_set():
+        try:
+            target_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def discover_work_shards(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "work/",
+    classifier: Callable[[List[Dict]], List[Dict]] = filter_log_objects,
+) -> Tuple[List[str], List[Dict]]:
+    """Discover the shard prefixes below the work/ directory.
+
+    Nextflow lays out task directories as work/<2-hex>/<hash>/, so a
+    delimiter listing of work/ returns up to 256 prefixes that partition the
+    keyspace and can be listed independently.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        prefix: Key prefix to shard (default: work/)
+        classifier: Selects the objects to tag from a listing page
+
+    Returns:
+        Tuple of (shard prefixes, log file objects stored directly under prefix)
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    shards: List[str] = []
+    root_log_objects = []
+
+    try:
+        for page in paginator.paginate(
+            Bucket=bucket_name, Prefix=prefix, Delimiter="/"
+        ):
+            shards.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+            root_log_objects.extend(classifier(page.get("Contents", [])))
+    except ClientError as e:
+        logger.error(f"Error discovering shards under {prefix}: {e}")
+        raise
+
+    logger.info(f"Discovered {len(shards)} shards under {prefix}")
+    return shards, root_log_objects
+
+
+def iter_sharded_work_directory_objects(
+    s3_client,
+    bucket_name: str,
+    prefix: str = "work/",
+    max_workers: int = 32,
+    queue_size: int = 10000,
+    checkpoint: Optional[TaggingCheckpoint] = None,
+    classifier: Callable[[List[Dict]], List[Dict]] = filter_log_objects,
+    watermark: Optional[TaggingWatermark] = None,
+) -> Iterator[Dict]:
+    """Yield log file objects by listing work/ shards concurrently.
+
+    Each shard found by discover_work_shards() is listed by its own worker
+    and the results are merged into a single stream through a bounded queue.
+    Objects from different shards are interleaved in arrival order.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        prefix: Key prefix to scan (default: work/)
+        max_workers: Number of shards listed in parallel
+        queue_size: Maximum number of objects buffered between listers and
+            the consumer
+        checkpoint: Optional checkpoint; completed shards are skipped and
+            the rest resume from their saved continuation tokens
+        classifier: Selects the objects to tag from a listing page
+        watermark: Optional watermark state; each shard keeps its own
+            watermark (objects directly under prefix are always tagged)
+
+    Yields:
+        Object dictionaries for log files
+    """
+    shards, root_log_objects = discover_work_shards(
+        s3_client, bucket_name, prefix, classifier
+    )
+    if checkpoint is not None:
+        untagged = set(checkpoint.filter_untagged(o["Key"] for o in root_log_objects))
+        root_log_objects = [o for o in root_log_objects if o["Key"] in untagged]
+        remaining_shards = [s for s in shards if not checkpoint.is_shard_complete(s)]
+        logger.info(
+            f"Skipping {len(shards) - len(remaining_shards)} shards completed "
+            "in a previous run"
+        )
+        shards = remaining_shards
+
+    yield from root_log_objects
+    if not shards:
+        return
+
+    shard_done = object()
+    object_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+
+    def list_shard(shard: str):
+        try:
+            for obj in iter_work_directory_objects(
+                s3_client,
+                bucket_name,
+                shard,
+                log_progress=False,
+                checkpoint=checkpoint,
+                classifier=classifier,
+                watermark=watermark,
+            ):
+                if not _put_until_stopped(object_queue, obj, stop_event):
+                    return
+        except BaseException as e:
+            _put_until_stopped(object_queue, e, stop_event)
+        finally:
+            _put_until_stopped(object_queue, shard_done, stop_event)
+
+    logger.info(f"Listing {len(shards)} shards with {max_workers} workers...")
+    executor = ThreadPoolExecutor(
+        max_workers=min(max_workers, len(shards)), thread_name_prefix="shard-lister"
+    )
+    try:
+        for shard in shards:
+            executor.submit(list_shard, shard)
+
+        remaining = len(shards)
+        log_files = 0
+        while remaining:
+            item = object_queue.get()
+            if item is shard_done:
+                remaining -= 1
+                completed = len(shards) - remaining
+                if completed % 16 == 0 or not remaining:
+                    logger.info(
+                        f"Listed {completed}/{len(shards)} shards, "
+                        f"found {log_files} log files"
+                    )
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                log_files += 1
+                yield item
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_inventory_log_objects(
+    manifest_path: str,
+    bucket_name: str,
+    prefix: str = "work/",
+    checkpoint: Optional[TaggingCheckpoint] = None,
+    chunk_size: int = 1000,
+    classifier: Callable[[List[Dict]], List[Dict]] = filter_log_objects,
+) -> Iterator[Dict]:
+    """Yield log file objects from an S3 Inventory report instead of listing.
+
+    Args:
+        manifest_path: Path to a locally downloaded inventory manifest.json
+        bucket_name: Bucket the inventory is expected to describe
+        prefix: Key prefix to scan (default: work/)
+        checkpoint: Optional checkpoint; keys it has already tagged are skipped
+        chunk_size: Number of inventory rows classified at once
+        classifier: Selects the objects to tag from a chunk of rows
+
+    Yields:
+        Object dictionaries for log files
+
+    Raises:
+        InventoryError: If the manifest is invalid or describes another bucket
+    """
+    manifest = load_inventory_manifest(manifest_path)
+    if manifest["sourceBucket"] != bucket_name:
+        raise InventoryError(
+            f"Inventory describes bucket {manifest['sourceBucket']}, not {bucket_name}"
+        )
+
+    total_objects = 0
+    log_files = 0
+
+    def classify(chunk: List[Dict]) -> List[Dict]:
+        nonlocal total_objects, log_files
+        total_objects += len(chunk)
+        chunk_log_objects = classifier(chunk)
+        log_files += len(chunk_log_objects)
+
+        # Progress update every 100k objects
+        if total_objects % 100000 < len(chunk):
+            logger.info(
+                f"Read {total_objects} inventory rows, found {log_files} log files"
+            )
+
+        if checkpoint is None:
+            return chunk_log_objects
+        untagged = set(
+            checkpoint.filter_untagged(obj["Key"] for obj in chunk_log_objects)
+        )
+        return [obj for obj in chunk_log_objects if obj["Key"] in untagged]
+
+    chunk: List[Dict] = []
+    for obj in iter_inventory_objects(manifest_path, prefix):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield from classify(chunk)
+            chunk = []
+    yield from classify(chunk)
+
+    logger.info(
+        f"Inventory scan complete: {log_files} log files found in "
+        f"{total_objects} total objects"
+    )
+
+
+def list_work_directory_objects(s3_client, bucket_name: str) -> List[Dict]:
+    """List all objects in work/ directories that match log file patterns.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+
+    Returns:
+        List of object dictionaries for log files
+    """
+    return list(iter_work_directory_objects(s3_client, bucket_name))
 
 
 def get_object_tags(s3_client, bucket_name: str, key: str) -> Dict[str, str]:
@@ -159,8 +510,156 @@ def get_object_tags(s3_client, bucket_name: str, key: str) -> Dict[str, str]:
             raise
 
 
+def has_tags(tags: Dict[str, str], target: Dict[str, str]) -> bool:
+    """Check whether a tag set already carries all of the target tags."""
+    return all(tags.get(k) == v for k, v in target.items())
+
+
+def has_metadata_tag(tags: Dict[str, str]) -> bool:
+    """Check whether a tag set already carries the Nextflow metadata tag."""
+    return has_tags(tags, METADATA_TAG)
+
+
+def merge_tags(
+    existing_tags: Dict[str, str],
+    tags: Dict[str, str],
+    managed_keys: Optional[Set[str]] = None,
+) -> Dict[str, str]:
+    """Merge target tags into an existing tag set.
+
+    Keys in ``managed_keys`` that are not part of ``tags`` are dropped, so an
+    object moving from one Fusion rule to another does not keep the tag of
+    its previous rule. All other existing tags are preserved.
+    """
+    managed_keys = managed_keys or set()
+    merged = {
+        k: v for k, v in existing_tags.items() if k not in managed_keys or k in tags
+    }
+    merged.update(tags)
+    return merged
+
+
+def apply_metadata_tag(
+    s3_client,
+    bucket_name: str,
+    key: str,
+    dry_run: bool = False,
+    known_tags: Optional[Dict[str, str]] = None,
+    tags: Optional[Dict[str, str]] = None,
+    managed_keys: Optional[Set[str]] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """Add the metadata tag to a single log file, preserving existing tags.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        key: S3 object key
+        dry_run: If True, don't actually apply tags
+        known_tags: Current tag set if already known; skips GetObjectTagging
+        tags: Tags to apply instead of the metadata tag
+        managed_keys: Tag keys owned by the tagger; existing values for these
+            keys are removed unless they are part of ``tags``
+
+    Returns:
+        Tuple of (status message, resulting tag set)
+
+    Raises:
+        ClientError: If reading or writing the tag set fails
+    """
+    tags = tags or METADATA_TAG
+
+    # Get existing tags unless the caller already knows them
+    if known_tags is None:
+        existing_tags = get_object_tags(s3_client, bucket_name, key)
+    else:
+        existing_tags = known_tags
+
+    # Merge with existing tags
+    new_tags = merge_tags(existing_tags, tags, managed_keys)
+
+    # Check if already tagged
+    if new_tags == existing_tags:
+        return "Already tagged", existing_tags
+
+    if dry_run:
+        return f"Would tag with: {new_tags}", existing_tags
+
+    # Apply tags
+    tag_set = [{"Key": k, "Value": v} for k, v in new_tags.items()]
+    s3_client.put_object_tagging(
+        Bucket=bucket_name, Key=key, Tagging={"TagSet": tag_set}
+    )
+
+    return "Tagged successfully", new_tags
+
+
+def tag_object(
+    s3_client,
+    bucket_name: str,
+    key: str,
+    etag: Optional[str] = None,
+    dry_run: bool = False,
+    tag_cache: Optional[TagStateCache] = None,
+    optimistic: bool = False,
+    sample_fraction: float = 0.0,
+    tags: Optional[Dict[str, str]] = None,
+    managed_keys: Optional[Set[str]] = None,
+) -> str:
+    """Tag a log file, skipping GetObjectTagging when the tag set is known.
+
+    The tag set is taken from ``tag_cache`` when it holds an entry for the
+    object's current ETag. Otherwise, in optimistic mode the object is assumed
+    to carry no tags and is written with a single PutObjectTagging call, which
+    replaces any tags it did carry. A random ``sample_fraction`` of those
+    objects is read first and tagged safely instead; the message then ends in
+    SAMPLED, or SAMPLED_WITH_OTHER_TAGS if the optimistic write would have
+    replaced other tags.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        key: S3 object key
+        etag: ETag from the listing, used to validate cache entries
+        dry_run: If True, don't actually apply tags
+        tag_cache: Optional cache of tag sets from previous runs
+        optimistic: If True, assume untagged objects when the cache has no entry
+        sample_fraction: Fraction of optimistic writes to check (0.0 - 1.0)
+        tags: Tags to apply instead of the metadata tag
+        managed_keys: Tag keys owned by the tagger (see apply_metadata_tag())
+
+    Returns:
+        Status message
+
+    Raises:
+        ClientError: If reading or writing the tag set fails
+    """
+    known_tags = tag_cache.lookup(key, etag) if tag_cache is not None else None
+    sample = None
+    if known_tags is None and optimistic:
+        if random.random() < sample_fraction:
+            known_tags = get_object_tags(s3_client, bucket_name, key)
+            target = tags or METADATA_TAG
+            replaced = set(merge_tags(known_tags, target, managed_keys)) - set(target)
+            sample = SAMPLED_WITH_OTHER_TAGS if replaced else SAMPLED
+        else:
+            known_tags = {}
+
+    message, result_tags = apply_metadata_tag(
+        s3_client, bucket_name, key, dry_run, known_tags, tags, managed_keys
+    )
+    if tag_cache is not None and not dry_run:
+        tag_cache.record(key, etag, result_tags)
+    if sample is not None:
+        message = f"{message} {sample}"
+    return message
+
+
 def tag_log_file(
-    s3_client, bucket_name: str, key: str, dry_run: bool = False
+    s3_client,
+    bucket_name: str,
+    key: str,
+    dry_run: bool = False,
+    **tag_options,
 ) -> Tuple[bool, str]:
     """Tag a single log file with metadata tag.
 
@@ -169,34 +668,58 @@ def tag_log_file(
         bucket_name: S3 bucket name
         key: S3 object key
         dry_run: If True, don't actually apply tags
+        **tag_options: Extra keyword arguments for tag_object() (etag,
+            tag_cache, optimistic, sample_fraction, tags, managed_keys)
 
     Returns:
         Tuple of (success, message)
     """
     try:
-        # Get existing tags
-        existing_tags = get_object_tags(s3_client, bucket_name, key)
+        return True, tag_object(
+            s3_client, bucket_name, key, dry_run=dry_run, **tag_options
+        )
+    except ClientError as e:
+        return False, f"Error: {e}"
 
-        # Check if already tagged
-        if METADATA_TAG["nextflow.io/metadata"] in existing_tags.values():
-            return True, "Already tagged"
 
-        # Merge with existing tags
-        new_tags = {**existing_tags, **METADATA_TAG}
+def _record_result(stats: Dict[str, int], key: str, success: bool, message: str):
+    """Update processing statistics with the outcome of a single tag operation.
 
-        if dry_run:
-            return True, f"Would tag with: {new_tags}"
+    Args:
+        stats: Statistics dictionary to update in place
+        key: S3 object key that was processed
+        success: Whether the tag operation succeeded
+        message: Message returned by tag_log_file()
+    """
+    stats["processed"] += 1
+    if success:
+        if "Already tagged" in message:
+            stats["already_tagged"] += 1
+        else:
+            stats["tagged"] += 1
+    else:
+        stats["errors"] += 1
+        logger.error(f"Failed to tag {key}: {message}")
 
-        # Apply tags
-        tag_set = [{"Key": k, "Value": v} for k, v in new_tags.items()]
-        s3_client.put_object_tagging(
-            Bucket=bucket_name, Key=key, Tagging={"TagSet": tag_set}
-        )
 
-        return True, "Tagged successfully"
+def _format_progress(processed: int, total: Optional[int], elapsed: float) -> str:
+    """Format a progress line with throughput and, if the total is known, ETA.
 
-    except ClientError as e:
-        return False, f"Error: {e}"
+    Args:
+        processed: Number of files processed so far
+        total: Total number of files, or None if unknown
+        elapsed: Seconds since processing started
+
+    Returns:
+        Human readable progress message
+    """
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    if total is None:
+        return f"Processed {processed} files ({rate:.1f} files/s)"
+
+    remaining = total - processed
+    eta = f"{remaining / rate:.0f}s" if rate > 0 else "unknown"
+    return f"Processed {processed}/{total} files ({rate:.1f} files/s, ETA {eta})"
 
 
 def process_log_files_batch(
@@ -205,58 +728,313 @@ def process_log_files_batch(
     log_objects: List[Dict],
     dry_run: bool = False,
     max_workers: int = 10,
+    window_size: Optional[int] = None,
+    checkpoint: Optional[TaggingCheckpoint] = None,
+    tag_options: Optional[Dict] = None,
+    on_result: Optional[Callable[[str, bool, str], None]] = None,
 ) -> Dict[str, int]:
     """Process log files in batches with threading.
 
+    At most ``window_size`` tag operations are outstanding at any time; a new
+    one is submitted each time one completes, so memory stays proportional to
+    the window rather than to the number of log files.
+
     Args:
         s3_client: Boto3 S3 client
         bucket_name: S3 bucket name
         log_objects: List of log file objects
         dry_run: If True, don't actually apply tags
         max_workers: Maximum number of worker threads
+        window_size: Maximum in-flight tag operations (default: 4 * max_workers)
+        checkpoint: Optional checkpoint recording the outcome of each key
+        tag_options: Extra keyword arguments for tag_object()
+        on_result: Optional callback ``(key, success, message)`` invoked once
+            per key
 
     Returns:
         Dictionary with processing statistics
     """
     stats = {"processed": 0, "tagged": 0, "already_tagged": 0, "errors": 0}
+    tag_options = tag_options or {}
+    window_size = window_size or max_workers * 4
+    total = len(log_objects)
 
     logger.info(
-        f"Processing {len(log_objects)} log files with {max_workers} workers..."
+        f"Processing {total} log files with {max_workers} workers "
+        f"(window size {window_size})..."
     )
 
+    start_time = time.time()
+    objects = iter(log_objects)
+
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all jobs
-        future_to_key = {
-            executor.submit(
-                tag_log_file, s3_client, bucket_name, obj["Key"], dry_run
-            ): obj["Key"]
-            for obj in log_objects
-        }
-
-        # Process results
-        for future in as_completed(future_to_key):
-            key = future_to_key[future]
-            stats["processed"] += 1
+        future_to_key: Dict = {}
+
+        def fill_window():
+            while len(future_to_key) < window_size:
+                obj = next(objects, None)
+                if obj is None:
+                    return
+                future = executor.submit(
+                    tag_log_file,
+                    s3_client,
+                    bucket_name,
+                    obj["Key"],
+                    dry_run,
+                    etag=obj.get("ETag"),
+                    tags=obj.get("Tags"),
+                    **tag_options,
+                )
+                future_to_key[future] = obj["Key"]
+
+        fill_window()
+        while future_to_key:
+            done, _ = wait(future_to_key, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = future_to_key.pop(future)
+
+                try:
+                    success, message = future.result()
+                except Exception as e:
+                    success, message = False, f"Exception: {e}"
+
+                _record_result(stats, key, success, message)
+                if checkpoint is not None:
+                    checkpoint.mark_done(key, success)
+                if on_result is not None:
+                    on_result(key, success, message)
+                if stats["processed"] % 100 == 0:
+                    logger.info(
+                        _format_progress(
+                            stats["processed"], total, time.time() - start_time
+                        )
+                    )
+
+            fill_window()
+
+    return stats
+
+
+def stream_log_files(
+    s3_client,
+    bucket_name: str,
+    log_objects: Iterator[Dict],
+    dry_run: bool = False,
+    max_workers: int = 10,
+    queue_size: int = 10000,
+    checkpoint: Optional[TaggingCheckpoint] = None,
+    tag_options: Optional[Dict] = None,
+    on_result: Optional[Callable[[str, bool, str], None]] = None,
+) -> Dict[str, int]:
+    """Tag log files while they are still being listed.
+
+    A producer thread drains ``log_objects`` into a bounded queue and worker
+    threads tag keys as soon as they arrive. The queue bound applies
+    backpressure to the listing, so peak memory is independent of bucket
+    size.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        log_objects: Iterator of log file objects, e.g. from
+            iter_work_directory_objects()
+        dry_run: If True, don't actually apply tags
+        max_workers: Number of tagging worker threads
+        queue_size: Maximum number of keys buffered between listing and tagging
+        checkpoint: Optional checkpoint recording the outcome of each key
+        tag_options: Extra keyword arguments for tag_object()
+        on_result: Optional callback ``(key, success, message)`` invoked once
+            per key
+
+    Returns:
+        Dictionary with processing statistics
+    """
+    stats = {"processed": 0, "tagged": 0, "already_tagged": 0, "errors": 0}
+    tag_options = tag_options or {}
+    stats_lock = threading.Lock()
+    object_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    producer_errors: List[BaseException] = []
+    sentinel = None
+
+    logger.info(
+        f"Streaming log files to {max_workers} workers (queue size {queue_size})..."
+    )
 
+    def produce():
+        try:
+            for obj in log_objects:
+                if not _put_until_stopped(object_queue, obj, stop_event):
+                    return
+        except BaseException as e:
+            producer_errors.append(e)
+        finally:
+            for _ in range(max_workers):
+                object_queue.put(sentinel)
+
+    def consume():
+        while True:
+            obj = object_queue.get()
+            if obj is sentinel:
+                return
+            key = obj["Key"]
             try:
-                success, message = future.result()
-                if success:
-                    if "Already tagged" in message:
-                        stats["already_tagged"] += 1
-                    else:
-                        stats["tagged"] += 1
-
-                    if stats["processed"] % 100 == 0:
-                        logger.info(
-                            f"Processed {stats['processed']}/{len(log_objects)} files"
+                success, message = tag_log_file(
+                    s3_client,
+                    bucket_name,
+                    key,
+                    dry_run,
+                    etag=obj.get("ETag"),
+                    tags=obj.get("Tags"),
+                    **tag_options,
+                )
+            except Exception as e:
+                success, message = False, f"Exception: {e}"
+
+            if checkpoint is not None:
+                checkpoint.mark_done(key, success)
+            if on_result is not None:
+                on_result(key, success, message)
+            with stats_lock:
+                _record_result(stats, key, success, message)
+                if stats["processed"] % 100 == 0:
+                    logger.info(
+                        _format_progress(
+                            stats["processed"], None, time.time() - start_time
                         )
-                else:
-                    stats["errors"] += 1
-                    logger.error(f"Failed to tag {key}: {message}")
+                    )
+
+    start_time = time.time()
+    producer = threading.Thread(target=produce, name="log-file-lister", daemon=True)
+    workers = [
+        threading.Thread(target=consume, name=f"log-file-tagger-{i}", daemon=True)
+        for i in range(max_workers)
+    ]
+
+    producer.start()
+    for worker in workers:
+        worker.start()
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        stop_event.set()
+        raise
+    producer.join()
+
+    if producer_errors:
+        raise producer_errors[0]
+
+    return stats
+
+
+def tag_task_directories(
+    s3_client,
+    bucket_name: str,
+    directories: Iterator[TaskDirectory],
+    dry_run: bool = False,
+    max_workers: int = 10,
+    window_size: Optional[int] = None,
+    tag_options: Optional[Dict] = None,
+    on_result: Optional[Callable[[str, bool, str], None]] = None,
+    on_directory_complete: Optional[Callable[[str], None]] = None,
+) -> Dict[str, int]:
+    """Tag log files one task directory at a time.
+
+    Each directory from group_task_directories() is submitted as a single
+    batch to a worker thread, which tags its files in turn. At most
+    ``window_size`` directories are outstanding at any time.
+
+    Args:
+        s3_client: Boto3 S3 client
+        bucket_name: S3 bucket name
+        directories: Task directories with the objects to tag
+        dry_run: If True, don't actually apply tags
+        max_workers: Number of tagging worker threads
+        window_size: Maximum in-flight directories (default: 4 * max_workers)
+        tag_options: Extra keyword arguments for tag_object()
+        on_result: Optional callback ``(key, success, message)`` invoked once
+            per key
+        on_directory_complete: Optional callback invoked with the prefix of
+            each finished task directory whose files were all tagged (not
+            in dry-run mode)
+
+    Returns:
+        Dictionary with processing statistics, including the number of
+        directories
+    """
+    stats = {
+        "processed": 0,
+        "tagged": 0,
+        "already_tagged": 0,
+        "errors": 0,
+        "directories": 0,
+    }
+    tag_options = tag_options or {}
+    window_size = window_size or max_workers * 4
 
+    logger.info(
+        f"Tagging task directories with {max_workers} workers "
+        f"(window size {window_size})..."
+    )
+
+    def tag_directory(directory: TaskDirectory) -> List[Tuple[str, bool, str]]:
+        results = []
+        for obj in directory.objects:
+            try:
+                success, message = tag_log_file(
+                    s3_client,
+                    bucket_name,
+                    obj["Key"],
+                    dry_run,
+                    etag=obj.get("ETag"),
+                    tags=obj.get("Tags"),
+                    **tag_options,
+                )
             except Exception as e:
-                stats["errors"] += 1
-                logger.error(f"Exception processing {key}: {e}")
+                success, message = False, f"Exception: {e}"
+            results.append((obj["Key"], success, message))
+        return results
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Dict = {}
+
+        def fill_window():
+            while len(pending) < window_size:
+                directory = next(directories, None)
+                if directory is None:
+                    return
+                pending[executor.submit(tag_directory, directory)] = directory
+
+        fill_window()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory = pending.pop(future)
+                results = future.result()
+                for key, success, message in results:
+                    _record_result(stats, key, success, message)
+                    if on_result is not None:
+                        on_result(key, success, message)
+                stats["directories"] += 1
+                if (
+                    on_directory_complete is not None
+                    and directory.prefix is not None
+                    and directory.finished
+                    and not dry_run
+                    and all(success for _, success, _ in results)
+                ):
+                    on_directory_complete(directory.prefix)
+                if stats["directories"] % 100 == 0:
+                    logger.info(
+                        f"{stats['directories']} directories: "
+                        + _format_progress(
+                            stats["processed"], None, time.time() - start_time
+                        )
+                    )
+            fill_window()
 
     return stats
 
@@ -280,48 +1058,584 @@ def main():
         default=10,
         help="Maximum number of worker threads (default: 10)",
     )
+    parser.add_argument(
+        "--window-size",
+        type=int,
+        default=None,
+        help="Maximum in-flight tag operations (default: 4 x --max-workers)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Tag log files while listing instead of scanning the bucket first",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=10000,
+        help="Maximum keys buffered between listing and tagging in --stream mode (default: 10000)",
+    )
+    parser.add_argument(
+        "--by-directory",
+        action="store_true",
+        help="Group the streamed listing by work/<xx>/<hash>/ task directory "
+        "and tag one directory per work item",
+    )
+    parser.add_argument(
+        "--directory-state",
+        metavar="PATH",
+        help="SQLite record of fully tagged task directories (with "
+        "--by-directory); directories recorded by a previous run are skipped",
+    )
+    parser.add_argument(
+        "--shard-listing",
+        action="store_true",
+        help="List the work/<xx>/ prefixes concurrently instead of one sequential scan",
+    )
+    parser.add_argument(
+        "--inventory-manifest",
+        metavar="PATH",
+        help="Read keys from a local S3 Inventory manifest.json (CSV or Parquet) "
+        "instead of listing the bucket",
+    )
+    parser.add_argument(
+        "--list-workers",
+        type=int,
+        default=32,
+        help="Number of shards listed in parallel with --shard-listing (default: 32)",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Tag with the asyncio engine and adaptive (AIMD) concurrency",
+    )
+    parser.add_argument(
+        "--initial-concurrency",
+        type=int,
+        default=16,
+        help="Starting number of in-flight requests with --async (default: 16)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=256,
+        help="Upper bound for the adaptive concurrency with --async (default: 256)",
+    )
+    parser.add_argument(
+        "--per-shard-limit",
+        type=int,
+        default=64,
+        help="Maximum in-flight requests per work/<xx>/ shard with --async (default: 64)",
+    )
+    parser.add_argument(
+        "--tag-cache",
+        metavar="PATH",
+        help="SQLite cache of tag sets by key and ETag; skips GetObjectTagging "
+        "for objects unchanged since a previous run",
+    )
+    parser.add_argument(
+        "--optimistic",
+        action="store_true",
+        help="Assume objects without a cached tag set are untagged and write the "
+        "metadata tag without reading tags first (replaces any other tags)",
+    )
+    parser.add_argument(
+        "--sample-fraction",
+        type=float,
+        default=0.01,
+        help="Fraction of objects in --optimistic mode whose tags are read first, "
+        "to count how many other tags the optimistic writes replace (default: 0.01)",
+    )
+    parser.add_argument(
+        "--fusion-tags",
+        nargs="?",
+        const=str(DEFAULT_CONFIG_PATH),
+        metavar="CONFIG",
+        help="Classify and tag every work/ file with the fusion.tags rules from a "
+        "Nextflow config (default: seqerakit/configs/nextflow-base.config), "
+        "including nextflow.io/temporary",
+    )
+    parser.add_argument(
+        "--batch-manifest-dir",
+        metavar="DIR",
+        help="Write S3 Batch Operations manifests and job specs here instead of tagging",
+    )
+    parser.add_argument(
+        "--batch-role-arn",
+        help="IAM role S3 Batch Operations assumes (required with --batch-manifest-dir)",
+    )
+    parser.add_argument(
+        "--batch-manifest-bucket",
+        help="Bucket the manifests will be uploaded to (default: --bucket)",
+    )
+    parser.add_argument(
+        "--batch-manifest-prefix",
+        default="batch-operations/tag-log-files",
+        help="Key prefix for uploaded manifests (default: batch-operations/tag-log-files)",
+    )
+    parser.add_argument(
+        "--batch-account-id", help="AWS account ID to include in the job specs"
+    )
+    parser.add_argument(
+        "--batch-max-keys",
+        type=int,
+        default=DEFAULT_MAX_KEYS_PER_MANIFEST,
+        help=f"Maximum keys per manifest file (default: {DEFAULT_MAX_KEYS_PER_MANIFEST})",
+    )
+    parser.add_argument(
+        "--endpoint-url",
+        help="Custom S3 endpoint, e.g. http://localhost:5000 for a moto server",
+    )
+    parser.add_argument(
+        "--client-per-thread",
+        action="store_true",
+        help="Give every worker thread its own S3 client and connection pool "
+        "instead of sharing one client sized to the concurrency",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="Record progress in a SQLite checkpoint so the run can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Resume from the checkpoint (default path: {DEFAULT_CHECKPOINT_PATH})",
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="STATE",
+        help="Only tag objects modified since the last successful run, using "
+        "per-shard LastModified watermarks stored in this JSON file",
+    )
+    parser.add_argument(
+        "--watermark-overlap-hours",
+        type=float,
+        default=6.0,
+        help="Safety margin subtracted from each listing start time when "
+        "advancing watermarks (default: 6)",
+    )
+    parser.add_argument(
+        "--export-listing",
+        metavar="DIR",
+        help="Also write the full listing with each object's classification "
+        "to columnar files in DIR for offline analysis (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=sorted(FORMATS),
+        default="parquet",
+        help="File format of --export-listing: parquet, or arrow for "
+        "memory-mappable Arrow IPC files (default: parquet)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="Write OpenMetrics counters, S3 request latencies and throttle "
+        "counts to this file while the job runs (e.g. for the node_exporter "
+        "textfile collector)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=DEFAULT_WRITE_INTERVAL,
+        help=f"Seconds between --metrics-file updates (default: {DEFAULT_WRITE_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve OpenMetrics on http://127.0.0.1:PORT/metrics while the job runs",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
 
+    checkpoint_path = args.checkpoint or (
+        DEFAULT_CHECKPOINT_PATH if args.resume else None
+    )
+    if checkpoint_path and args.dry_run:
+        parser.error("--checkpoint and --resume cannot be combined with --dry-run")
+    if args.batch_manifest_dir and not args.batch_role_arn:
+        parser.error("--batch-manifest-dir requires --batch-role-arn")
+    if args.batch_manifest_dir and checkpoint_path:
+        parser.error(
+            "--batch-manifest-dir cannot be combined with --checkpoint/--resume"
+        )
+    if args.inventory_manifest and args.shard_listing:
+        parser.error("--inventory-manifest replaces listing; drop --shard-listing")
+    if args.incremental and (args.inventory_manifest or args.batch_manifest_dir):
+        parser.error(
+            "--incremental tracks tagging of bucket listings; it cannot be "
+            "combined with --inventory-manifest or --batch-manifest-dir"
+        )
+    if args.export_listing and (args.resume or args.incremental):
+        parser.error(
+            "--export-listing needs a full listing; it cannot be combined "
+            "with --resume or --incremental"
+        )
+    if args.directory_state and not args.by_directory:
+        parser.error("--directory-state requires --by-directory")
+    if args.by_directory and (
+        args.use_async
+        or args.inventory_manifest
+        or args.batch_manifest_dir
+        or checkpoint_path
+    ):
+        parser.error(
+            "--by-directory groups a listing into task directories; it cannot be "
+            "combined with --async, --inventory-manifest, --batch-manifest-dir "
+            "or --checkpoint/--resume"
+        )
+    if args.export_listing and args.directory_state:
+        parser.error(
+            "--export-listing needs a full listing; it cannot be combined "
+            "with --directory-state"
+        )
+    if args.fusion_tags and args.batch_manifest_dir:
+        parser.error(
+            "--fusion-tags applies several tag sets; it cannot be combined "
+            "with --batch-manifest-dir"
+        )
+
+    classifier = filter_log_objects
+    managed_keys = None
+    if args.fusion_tags:
+        try:
+            matcher = FusionTagMatcher.from_config(args.fusion_tags)
+        except (OSError, FusionTagsError) as e:
+            parser.error(f"Cannot load fusion.tags from {args.fusion_tags}: {e}")
+        classifier = matcher.classify
+        managed_keys = matcher.tag_keys
+    listing_classifier = classifier
+    directory_state = None
+    if args.directory_state:
+        try:
+            directory_state = TaskDirectoryState(args.directory_state, args.bucket)
+        except (sqlite3.Error, DirectoryStateError) as e:
+            parser.error(f"Cannot use {args.directory_state}: {e}")
+        listing_classifier = directory_state.skip_completed(listing_classifier)
+    exporter = None
+    if args.export_listing:
+        try:
+            exporter = ListingExporter(
+                args.export_listing, args.bucket, classifier, args.export_format
+            )
+        except ListingExportError as e:
+            parser.error(str(e))
+        listing_classifier = exporter
+
+    configure_logging()
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
     logger.info(f"Starting log file tagging for bucket: {args.bucket}")
     if args.dry_run:
         logger.info("DRY RUN MODE - No actual changes will be made")
+    if directory_state is not None:
+        logger.info(
+            f"Skipping {directory_state.completed} task directories completed in "
+            f"previous runs ({args.directory_state})"
+        )
 
-    # Initialize S3 client
-    s3_client = get_s3_client()
+    # Size the connection pool for every thread that can issue requests at
+    # once: the tag workers plus the listers. The async engine handles
+    # throttling of its tag calls itself, so those go through a separate
+    # client on which botocore surfaces SlowDown immediately instead of
+    # retrying it; listing keeps botocore's retries.
+    list_concurrency = args.list_workers if args.shard_listing else 1
+    if args.use_async:
+        concurrency = list_concurrency
+        client_factory = S3ClientFactory(
+            concurrency, args.endpoint_url, per_thread=args.client_per_thread
+        )
+        tag_client_factory = S3ClientFactory(
+            args.max_concurrency,
+            args.endpoint_url,
+            per_thread=args.client_per_thread,
+            retry_mode="standard",
+            max_attempts=1,
+        )
+    else:
+        concurrency = args.max_workers + list_concurrency
+        client_factory = S3ClientFactory(
+            concurrency, args.endpoint_url, per_thread=args.client_per_thread
+        )
+        tag_client_factory = client_factory
 
-    # List log files in work directories
-    start_time = time.time()
-    log_objects = list_work_directory_objects(s3_client, args.bucket)
-    scan_time = time.time() - start_time
+    checkpoint = (
+        TaggingCheckpoint(checkpoint_path, args.bucket, resume=args.resume)
+        if checkpoint_path
+        else None
+    )
+    tag_cache = TagStateCache(args.tag_cache) if args.tag_cache else None
+
+    metrics = None
+    metrics_writer = None
+    metrics_server = None
+    if args.metrics_file or args.metrics_port is not None:
+        metrics = TaggingMetrics()
+        client_factory.add_client_hook(metrics.instrument_client)
+        if tag_client_factory is not client_factory:
+            tag_client_factory.add_client_hook(metrics.instrument_client)
+        listing_classifier = metrics.count_classified(listing_classifier)
+        if args.metrics_port is not None:
+            try:
+                metrics_server = serve_metrics(metrics.registry, args.metrics_port)
+            except OSError as e:
+                parser.error(f"Cannot serve metrics on port {args.metrics_port}: {e}")
+        if args.metrics_file:
+            metrics_writer = MetricsFileWriter(
+                metrics.registry, args.metrics_file, args.metrics_interval
+            )
+            metrics_writer.start()
+    s3_client = get_s3_client(factory=client_factory)
+    tag_client = tag_client_factory.client()
+    if args.client_per_thread:
+        logger.info("Using one S3 client per worker thread")
+    elif args.use_async:
+        logger.info(
+            f"Using S3 clients with {concurrency} pooled connections for listing "
+            f"and {args.max_concurrency} for tagging"
+        )
+    else:
+        logger.info(f"Using a shared S3 client with {concurrency} pooled connections")
+
+    watermark = None
+    if args.incremental:
+        try:
+            watermark = TaggingWatermark(
+                args.incremental,
+                args.bucket,
+                overlap=timedelta(hours=args.watermark_overlap_hours),
+            )
+        except WatermarkError as e:
+            logger.error(f"Watermark error: {e}")
+            sys.exit(1)
+    tag_options = {
+        "tag_cache": tag_cache,
+        "optimistic": args.optimistic,
+        "sample_fraction": args.sample_fraction,
+        "managed_keys": managed_keys,
+    }
+
+    def list_log_objects() -> Iterator[Dict]:
+        if args.inventory_manifest:
+            return iter_inventory_log_objects(
+                args.inventory_manifest,
+                args.bucket,
+                checkpoint=checkpoint,
+                classifier=listing_classifier,
+            )
+        if args.shard_listing:
+            return iter_sharded_work_directory_objects(
+                s3_client,
+                args.bucket,
+                max_workers=args.list_workers,
+                checkpoint=checkpoint,
+                classifier=listing_classifier,
+                watermark=watermark,
+            )
+        return iter_work_directory_objects(
+            s3_client,
+            args.bucket,
+            checkpoint=checkpoint,
+            classifier=listing_classifier,
+            watermark=watermark,
+        )
 
-    if not log_objects:
-        logger.info("No log files found to tag")
-        return
+    def iter_log_objects() -> Iterator[Dict]:
+        if exporter is not None:
+            return exporter.complete_after(list_log_objects())
+        return list_log_objects()
+
+    # Optimistic writes checked by reading first, and how many of those
+    # objects carried other tags an unchecked write would have replaced
+    samples = {"checked": 0, "other_tags": 0}
+    samples_lock = threading.Lock()
+
+    def on_result(key: str, success: bool, message: str):
+        if message.endswith((SAMPLED, SAMPLED_WITH_OTHER_TAGS)):
+            with samples_lock:
+                samples["checked"] += 1
+                if message.endswith(SAMPLED_WITH_OTHER_TAGS):
+                    samples["other_tags"] += 1
+        if checkpoint is not None:
+            checkpoint.mark_done(key, success)
+        if watermark is not None:
+            watermark.mark_done(key, success)
+        if metrics is not None:
+            metrics.record_result(key, success, message)
 
-    logger.info(
-        f"Found {len(log_objects)} log files to process (scan took {scan_time:.2f}s)"
-    )
+    start_time = time.time()
+    # Set once listing and tagging ran to the end, so watermarks may advance
+    finished = False
+
+    try:
+        if args.batch_manifest_dir:
+            # Only list; S3 Batch Operations applies the tags server-side
+            shards = write_batch_manifests(
+                iter_log_objects(),
+                args.bucket,
+                args.batch_manifest_dir,
+                METADATA_TAG,
+                role_arn=args.batch_role_arn,
+                manifest_bucket=args.batch_manifest_bucket or args.bucket,
+                manifest_prefix=args.batch_manifest_prefix,
+                account_id=args.batch_account_id,
+                max_keys_per_manifest=args.batch_max_keys,
+            )
+            total_keys = sum(shard["keys"] for shard in shards)
+            logger.info(
+                f"Wrote {len(shards)} manifests covering {total_keys} log files "
+                f"to {args.batch_manifest_dir} in {time.time() - start_time:.2f}s"
+            )
+            logger.info(
+                "Upload the manifest-*.csv files unchanged, then create each job with "
+                "aws s3control create-job --cli-input-json file://job-NNNNN.json"
+            )
+            return
+
+        if args.use_async:
+            # List and tag concurrently under the adaptive concurrency limit
+            scan_time = 0.0
+            process_start = start_time
+            stats = run_async_tagging(
+                lambda obj: tag_object(
+                    tag_client,
+                    args.bucket,
+                    obj["Key"],
+                    obj.get("ETag"),
+                    args.dry_run,
+                    tags=obj.get("Tags"),
+                    **tag_options,
+                ),
+                iter_log_objects(),
+                initial_concurrency=args.initial_concurrency,
+                max_concurrency=args.max_concurrency,
+                per_shard_limit=args.per_shard_limit,
+                on_result=on_result,
+            )
+        elif args.by_directory:
+            # List and tag concurrently, one task directory per work item
+            scan_time = 0.0
+            process_start = start_time
+            stats = tag_task_directories(
+                s3_client,
+                args.bucket,
+                group_task_directories(iter_log_objects()),
+                args.dry_run,
+                args.max_workers,
+                args.window_size,
+                tag_options=tag_options,
+                on_result=on_result,
+                on_directory_complete=(
+                    directory_state.mark_complete
+                    if directory_state is not None
+                    else None
+                ),
+            )
+        elif args.stream:
+            # List and tag concurrently; there is no separate scan phase
+            scan_time = 0.0
+            process_start = start_time
+            stats = stream_log_files(
+                s3_client,
+                args.bucket,
+                iter_log_objects(),
+                args.dry_run,
+                args.max_workers,
+                args.queue_size,
+                tag_options=tag_options,
+                on_result=on_result,
+            )
+        else:
+            # List log files in work directories
+            log_objects = list(iter_log_objects())
+            scan_time = time.time() - start_time
+
+            if not log_objects:
+                logger.info("No log files found to tag")
+                finished = True
+                return
+
+            logger.info(
+                f"Found {len(log_objects)} log files to process (scan took {scan_time:.2f}s)"
+            )
+
+            # Process log files
+            process_start = time.time()
+            stats = process_log_files_batch(
+                s3_client,
+                args.bucket,
+                log_objects,
+                args.dry_run,
+                args.max_workers,
+                args.window_size,
+                tag_options=tag_options,
+                on_result=on_result,
+            )
+        finished = True
+    except InventoryError as e:
+        logger.error(f"Inventory error: {e}")
+        sys.exit(1)
+    finally:
+        if exporter is not None and not exporter.finished:
+            logger.warning(
+                f"Listing export in {args.export_listing} is incomplete and "
+                "will be refused by readers"
+            )
+        if checkpoint is not None:
+            checkpoint.close()
+        if directory_state is not None:
+            logger.info(
+                f"Directory state: skipped {directory_state.skipped_objects} "
+                f"listed objects, recorded {directory_state.recorded} "
+                "completed directories"
+            )
+            directory_state.close()
+        if watermark is not None:
+            if finished and not args.dry_run:
+                logger.info(
+                    f"Skipped {watermark.skipped} objects older than their watermark"
+                )
+                watermark.save()
+            watermark.close()
+        if tag_cache is not None:
+            logger.info(f"Tag cache: {tag_cache.hits} hits, {tag_cache.misses} misses")
+            tag_cache.close()
+        if metrics_writer is not None:
+            metrics_writer.stop()
+            logger.info(f"Metrics written to {args.metrics_file}")
+        if metrics_server is not None:
+            metrics_server.shutdown()
+            metrics_server.server_close()
 
-    # Process log files
-    process_start = time.time()
-    stats = process_log_files_batch(
-        s3_client, args.bucket, log_objects, args.dry_run, args.max_workers
-    )
     process_time = time.time() - process_start
 
     # Print summary
     logger.info("=" * 60)
     logger.info("TAGGING SUMMARY")
     logger.info("=" * 60)
+    if "directories" in stats:
+        logger.info(f"Task directories processed: {stats['directories']}")
     logger.info(f"Total files processed: {stats['processed']}")
     logger.info(f"Files newly tagged: {stats['tagged']}")
     logger.info(f"Files already tagged: {stats['already_tagged']}")
     logger.info(f"Errors encountered: {stats['errors']}")
+    if "throttled" in stats:
+        logger.info(f"Throttled requests retried: {stats['throttled']}")
+    if samples["checked"]:
+        logger.info(
+            f"Optimistic writes sampled: {samples['checked']}, "
+            f"{samples['other_tags']} of them carried other tags"
+        )
+        if samples["other_tags"]:
+            logger.warning(
+                "--optimistic replaced the tag sets of unsampled objects; about "
+                f"{samples['other_tags'] / samples['checked']:.1%} of them "
+                "probably lost other tags"
+            )
     logger.info(f"Processing time: {process_time:.2f}s")
     logger.info(f"Total time: {(scan_time + process_time):.2f}s")
 
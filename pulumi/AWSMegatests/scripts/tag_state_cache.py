@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cache of known S3 object tag sets, keyed by object key and ETag.
+
+The tagger records the tag set of every object it reads or writes. On a
+later run an object whose ETag is unchanged does not need a
+GetObjectTagging call: if the cached tags already contain the metadata tag
+it is skipped outright, otherwise the merged tag set is written directly.
+A changed ETag means the object was overwritten, so the cached entry is
+ignored.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS object_tags (
+    key TEXT PRIMARY KEY,
+    etag TEXT NOT NULL,
+    tags TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class TagStateCache:
+    """Thread-safe SQLite cache of object tag sets."""
+
+    def __init__(self, path: str):
+        """Open (or create) a tag cache database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._pending_writes = 0
+        self._last_commit = time.time()
+
+    def lookup(self, key: str, etag: Optional[str]) -> Optional[Dict[str, str]]:
+        """Return the cached tag set for an object, if it is still valid.
+
+        Args:
+            key: S3 object key
+            etag: Current ETag of the object from the listing
+
+        Returns:
+            Cached tags, or None if unknown or the object changed since
+        """
+        if not etag:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, tags FROM object_tags WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != etag:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[1])
+
+    def record(self, key: str, etag: Optional[str], tags: Dict[str, str]):
+        """Remember the tag set of an object at a given ETag."""
+        if not etag:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO object_tags (key, etag, tags) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET etag = excluded.etag, tags = excluded.tags",
+                (key, etag, json.dumps(tags, sort_keys=True)),
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= 1000 or time.time() - self._last_commit >= 5:
+                self._conn.commit()
+                self._pending_writes = 0
+                self._last_commit = time.time()
+
+    def close(self):
+        """Commit outstanding entries and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+SQLite checkpoint store for resumable log file tagging runs.
+
+The store records, per listing shard, the continuation token from which
+listing can safely restart and whether the shard is complete, plus every key
+that has been tagged. A token only advances once every log file on the pages
+before it has been tagged, so a crash between listing and tagging never
+skips work on resume.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    bucket TEXT PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    prefix TEXT PRIMARY KEY,
+    continuation_token TEXT,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tagged_keys (
+    key TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+class CheckpointError(Exception):
+    """Raised when a checkpoint cannot be used for the requested run."""
+
+
+class TaggingCheckpoint:
+    """Thread-safe checkpoint of listing progress and tagged keys."""
+
+    def __init__(self, path: str, bucket: str, resume: bool = False):
+        """Open (or create) a checkpoint database.
+
+        Args:
+            path: Path to the SQLite database file
+            bucket: Bucket the run operates on
+            resume: If False, any existing progress in the file is discarded
+
+        Raises:
+            CheckpointError: If resuming a checkpoint recorded for another bucket
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._pending_writes = 0
+        self._last_commit = time.time()
+
+        # In-flight page bookkeeping: shard -> ordered list of page records
+        self._pages: Dict[str, List[Dict]] = {}
+        self._key_to_page: Dict[str, Dict] = {}
+        self._listing_finished: Set[str] = set()
+
+        row = self._conn.execute("SELECT bucket FROM runs").fetchone()
+        if resume and row and row[0] != bucket:
+            raise CheckpointError(
+                f"Checkpoint {path} belongs to bucket {row[0]}, not {bucket}"
+            )
+        if not resume:
+            self._conn.executescript(
+                "DELETE FROM runs; DELETE FROM shards; DELETE FROM tagged_keys;"
+            )
+        if not resume or not row:
+            self._conn.execute(
+                "INSERT INTO runs (bucket, started_at) VALUES (?, ?)",
+                (bucket, time.time()),
+            )
+        self._conn.commit()
+
+        if resume:
+            completed = self._conn.execute(
+                "SELECT COUNT(*) FROM shards WHERE completed = 1"
+            ).fetchone()[0]
+            tagged = self._conn.execute("SELECT COUNT(*) FROM tagged_keys").fetchone()[
+                0
+            ]
+            logger.info(
+                f"Resuming from checkpoint {path}: {completed} shards complete, "
+                f"{tagged} keys already tagged"
+            )
+
+    def is_shard_complete(self, prefix: str) -> bool:
+        """Check whether a shard was fully listed and tagged in a previous run."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed FROM shards WHERE prefix = ?", (prefix,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def get_continuation_token(self, prefix: str) -> Optional[str]:
+        """Return the token listing of a shard should restart from, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT continuation_token FROM shards WHERE prefix = ?", (prefix,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def filter_untagged(self, keys: Iterable[str]) -> List[str]:
+        """Return the keys that have not been tagged by a previous run."""
+        keys = list(keys)
+        if not keys:
+            return []
+        with self._lock:
+            done: Set[str] = set()
+            # Stay below SQLite's default host parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                done.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT key FROM tagged_keys WHERE key IN ({placeholders})",
+                        chunk,
+                    )
+                )
+        return [key for key in keys if key not in done]
+
+    def begin_page(self, prefix: str, next_token: Optional[str], keys: List[str]):
+        """Register a listed page whose keys are about to be tagged.
+
+        Args:
+            prefix: Shard prefix the page belongs to
+            next_token: Continuation token of the page after this one, or None
+                if this was the last page of the shard
+            keys: Log file keys from this page that still need tagging
+        """
+        with self._lock:
+            page = {
+                "prefix": prefix,
+                "next_token": next_token,
+                "pending": len(keys),
+                "failed": False,
+            }
+            self._pages.setdefault(prefix, []).append(page)
+            for key in keys:
+                self._key_to_page[key] = page
+            self._advance(prefix)
+
+    def finish_listing(self, prefix: str):
+        """Record that every page of a shard has been listed."""
+        with self._lock:
+            self._listing_finished.add(prefix)
+            self._advance(prefix)
+
+    def mark_done(self, key: str, success: bool):
+        """Record the outcome of tagging a key.
+
+        Failed keys keep their page pending so the shard token never moves
+        past them and a resumed run lists them again.
+        """
+        with self._lock:
+            page = self._key_to_page.pop(key, None)
+            if success:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO tagged_keys (key) VALUES (?)", (key,)
+                )
+                self._pending_writes += 1
+            if page is not None:
+                if success:
+                    page["pending"] -= 1
+                else:
+                    page["failed"] = True
+                self._advance(page["prefix"])
+            self._maybe_commit()
+
+    def _advance(self, prefix: str):
+        """Move the shard token past leading pages that are fully tagged."""
+        pages = self._pages.get(prefix, [])
+        advanced = False
+        token = None
+        while pages and pages[0]["pending"] == 0 and not pages[0]["failed"]:
+            token = pages.pop(0)["next_token"]
+            advanced = True
+
+        if advanced:
+            self._conn.execute(
+                "INSERT INTO shards (prefix, continuation_token) VALUES (?, ?) "
+                "ON CONFLICT(prefix) DO UPDATE SET continuation_token = excluded.continuation_token",
+                (prefix, token),
+            )
+            self._pending_writes += 1
+
+        if prefix in self._listing_finished and not pages:
+            self._conn.execute(
+                "INSERT INTO shards (prefix, continuation_token, completed) VALUES (?, NULL, 1) "
+                "ON CONFLICT(prefix) DO UPDATE SET completed = 1, continuation_token = NULL",
+                (prefix,),
+            )
+            self._pending_writes += 1
+            self._listing_finished.discard(prefix)
+            self._pages.pop(prefix, None)
+
+        self._maybe_commit()
+
+    def _maybe_commit(self, max_writes: int = 1000, max_interval: float = 5.0):
+        if self._pending_writes >= max_writes or (
+            self._pending_writes and time.time() - self._last_commit >= max_interval
+        ):
+            self._conn.commit()
+            self._pending_writes = 0
+            self._last_commit = time.time()
+
+    def close(self):
+        """Commit outstanding progress and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+OpenMetrics instrumentation for the S3 tagging scripts.
+
+TaggingMetrics counts objects as they move through the tagger (listed,
+classified, tagged, already tagged, failed) and measures every S3 request
+through botocore's event hooks: a latency histogram and an in-flight gauge
+per operation, plus counters of throttled and failed requests. Together with
+the process CPU time these show whether a run is throttled, network-bound
+or CPU-bound.
+
+Metrics are rendered in the OpenMetrics text format and either written to a
+file at a fixed interval (for the node_exporter textfile collector or for
+inspection after the run) or served from a local HTTP endpoint while the
+job runs. Only the standard library is used.
+"""
+
+import bisect
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from async_tagging import THROTTLING_ERROR_CODES
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_WRITE_INTERVAL = 15.0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """A metric family with a fixed set of label names."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(labels[name] for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# TYPE {self.name} {self.metric_type}",
+            f"# HELP {self.name} {_escape(self.documentation)}",
+        ]
+
+    def samples(self) -> List[str]:
+        """Sample lines of the family; implemented by each metric type."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, exposed as ``<name>_total``.
+
+    With ``function`` the unlabelled value is read from it at render time.
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, *args, function: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name}_total {_format_value(self._function())}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((k, (list(c), s)) for k, (c, s) in self._values.items())
+        lines = []
+        bounds = [*self.buckets, float("inf")]
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*key, _format_value(float(bound)))
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the OpenMetrics text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class TaggingMetrics:
+    """The metrics exported by the tagging scripts."""
+
+    def __init__(self):
+        registry = self.registry = MetricsRegistry()
+        self.objects_listed = registry.register(
+            Counter("tagger_objects_listed", "Objects returned by listings")
+        )
+        self.objects_classified = registry.register(
+            Counter("tagger_objects_classified", "Listed objects selected for tagging")
+        )
+        self.objects_processed = registry.register(
+            Counter(
+                "tagger_objects_processed",
+                "Objects processed by result (tagged, already_tagged, dry_run, error)",
+                ["result"],
+            )
+        )
+        self.request_duration = registry.register(
+            Histogram(
+                "tagger_s3_request_duration_seconds",
+                "Duration of S3 HTTP requests, including failed attempts",
+                ["operation"],
+            )
+        )
+        self.requests_in_flight = registry.register(
+            Gauge(
+                "tagger_s3_requests_in_flight",
+                "S3 HTTP requests currently in flight",
+                ["operation"],
+            )
+        )
+        self.requests_throttled = registry.register(
+            Counter(
+                "tagger_s3_requests_throttled",
+                "S3 requests answered with SlowDown or another throttling error",
+                ["operation"],
+            )
+        )
+        self.requests_failed = registry.register(
+            Counter(
+                "tagger_s3_requests_failed",
+                "S3 requests that failed for reasons other than throttling",
+                ["operation"],
+            )
+        )
+        registry.register(
+            Counter(
+                "process_cpu_seconds",
+                "User and system CPU time of the process",
+                function=time.process_time,
+            )
+        )
+        self._started = threading.local()
+
+    def instrument_client(self, s3_client):
+        """Measure every HTTP request a boto3 S3 client sends.
+
+        Hooks are per attempt, so retried requests are counted once per try.
+        """
+        events = s3_client.meta.events
+        events.register("before-send.s3.*", self._before_send)
+        events.register("response-received.s3.*", self._response_received)
+
+    def _before_send(self, request, event_name: str, **kwargs):
+        operation = event_name.rsplit(".", 1)[1]
+        self._started.value = (operation, time.perf_counter())
+        self.requests_in_flight.inc(operation=operation)
+
+    def _response_received(self, parsed_response, exception, event_name: str, **kwargs):
+        started = getattr(self._started, "value", None)
+        if started is None:
+            return
+        self._started.value = None
+        operation, start = started
+        self.requests_in_flight.dec(operation=operation)
+        self.request_duration.observe(time.perf_counter() - start, operation=operation)
+
+        if exception is not None:
+            self.requests_failed.inc(operation=operation)
+            return
+        status = parsed_response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        if status < 300:
+            return
+        code = parsed_response.get("Error", {}).get("Code", "")
+        if code in THROTTLING_ERROR_CODES or status == 503:
+            self.requests_throttled.inc(operation=operation)
+        else:
+            self.requests_failed.inc(operation=operation)
+
+    def count_classified(
+        self, classifier: Callable[[List[Dict]], List[Dict]]
+    ) -> Callable[[List[Dict]], List[Dict]]:
+        """Wrap a page classifier to count listed and selected objects."""
+
+        def classify(objects: List[Dict]) -> List[Dict]:
+            selected = classifier(objects)
+            self.objects_listed.inc(len(objects))
+            self.objects_classified.inc(len(selected))
+            return selected
+
+        return classify
+
+    def record_result(self, key: str, success: bool, message: str):
+        """Count the outcome of one tag operation (an on_result callback)."""
+        if not success:
+            result = "error"
+        elif "Already tagged" in message:
+            result = "already_tagged"
+        elif message.startswith("Would tag"):
+            result = "dry_run"
+        else:
+            result = "tagged"
+        self.objects_processed.inc(result=result)
+
+
+class MetricsFileWriter:
+    """Rewrite a metrics file atomically at a fixed interval."""
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        path: str,
+        interval: float = DEFAULT_WRITE_INTERVAL,
+    ):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-writer", daemon=True
+        )
+
+    def start(self):
+        self.write()
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"Cannot write metrics to {self.path}: {e}")
+
+    def write(self):
+        """Write the current metrics, replacing the file atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.registry.render())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stop(self):
+        """Stop the writer thread and write the final values."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+
+def serve_metrics(
+    registry: MetricsRegistry, port: int, address: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Serve metrics over HTTP from a daemon thread.
+
+    Returns:
+        The running server; call shutdown() and server_close() to stop it
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"Metrics request: {format % args}")
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    ).start()
+    logger.info(f"Serving metrics on http://{address}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+LastModified watermarks for incremental log file tagging runs.
+
+After a successful run the tagger stores, per listing shard, a watermark
+timestamp: every object in the shard last modified before it has been
+handled. The next run drops older objects straight from the listing pages,
+so only new work directories are classified and tagged.
+
+The watermark of a shard is the time its listing started minus an overlap
+margin, and it only advances when the shard was listed completely and every
+object in it was tagged. The margin covers clock skew and multipart uploads,
+whose LastModified is the time the upload was initiated rather than
+completed.
+
+State lives in a small JSON file that is replaced atomically, and an
+exclusive lock file stops two chained cron runs from using it at once.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+# Default safety margin subtracted from the listing start time
+DEFAULT_OVERLAP = timedelta(hours=6)
+
+
+class WatermarkError(Exception):
+    """Raised when the watermark state cannot be used for the requested run."""
+
+
+class TaggingWatermark:
+    """Thread-safe per-shard LastModified watermarks backed by a JSON file."""
+
+    def __init__(self, path: str, bucket: str, overlap: timedelta = DEFAULT_OVERLAP):
+        """Lock and load (or start) a watermark state file.
+
+        Args:
+            path: Path to the JSON state file
+            bucket: Bucket the run operates on
+            overlap: Margin subtracted from the listing start time
+
+        Raises:
+            WatermarkError: If another run holds the lock, or the state file
+                is unreadable or belongs to another bucket
+        """
+        self.path = path
+        self.bucket = bucket
+        self.overlap = overlap
+        self._lock = threading.Lock()
+        self._lock_file = open(f"{path}.lock", "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise WatermarkError(f"Another run is using {path}")
+
+        self._watermarks: Dict[str, datetime] = {}
+        try:
+            self._load()
+        except WatermarkError:
+            self.close()
+            raise
+
+        # Shard -> listing start time for shards listed completely this run
+        self._listed: Dict[str, datetime] = {}
+        self._started: Dict[str, datetime] = {}
+        self._failed: Set[str] = set()
+        self.skipped = 0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            logger.info(f"No watermark state at {self.path}; running a full scan")
+            return
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise WatermarkError(f"Cannot read watermark state {self.path}: {e}")
+
+        if state.get("version") != STATE_VERSION:
+            raise WatermarkError(
+                f"Unsupported watermark state version {state.get('version')}"
+            )
+        if state.get("bucket") != self.bucket:
+            raise WatermarkError(
+                f"Watermark state {self.path} belongs to bucket "
+                f"{state.get('bucket')}, not {self.bucket}"
+            )
+        self._watermarks = {
+            prefix: datetime.fromisoformat(value)
+            for prefix, value in state.get("shards", {}).items()
+        }
+        logger.info(
+            f"Loaded watermarks for {len(self._watermarks)} shards from {self.path}"
+        )
+
+    def get(self, prefix: str) -> Optional[datetime]:
+        """Return the watermark covering a prefix, if any.
+
+        A watermark stored for an enclosing prefix (e.g. ``work/`` from a
+        sequential run) also covers its shards; the newest one applies.
+        """
+        covering = [
+            mark
+            for stored, mark in self._watermarks.items()
+            if prefix.startswith(stored)
+        ]
+        return max(covering) if covering else None
+
+    def start_shard(self, prefix: str):
+        """Record that listing of a shard is starting."""
+        with self._lock:
+            self._started[prefix] = datetime.now(timezone.utc)
+
+    def filter_new(self, prefix: str, objects: List[Dict]) -> List[Dict]:
+        """Drop objects last modified before the shard's watermark.
+
+        Objects without a LastModified field are always kept.
+        """
+        mark = self.get(prefix)
+        if mark is None or not objects:
+            return objects
+        new_objects = [
+            obj
+            for obj in objects
+            if obj.get("LastModified") is None or obj["LastModified"] >= mark
+        ]
+        with self._lock:
+            self.skipped += len(objects) - len(new_objects)
+        return new_objects
+
+    def finish_shard(self, prefix: str):
+        """Record that a shard was listed to the end."""
+        with self._lock:
+            self._listed[prefix] = self._started.get(prefix, datetime.now(timezone.utc))
+
+    def mark_done(self, key: str, success: bool):
+        """Record the outcome of tagging a key; failures hold back its shard."""
+        if success:
+            return
+        with self._lock:
+            self._failed.update(
+                prefix for prefix in self._started if key.startswith(prefix)
+            )
+
+    def save(self):
+        """Advance watermarks of clean shards and write the state atomically."""
+        with self._lock:
+            advanced = 0
+            for prefix, started in self._listed.items():
+                if prefix in self._failed:
+                    continue
+                mark = started - self.overlap
+                if prefix not in self._watermarks or mark > self._watermarks[prefix]:
+                    self._watermarks[prefix] = mark
+                    advanced += 1
+
+            state = {
+                "version": STATE_VERSION,
+                "bucket": self.bucket,
+                "shards": {
+                    prefix: mark.isoformat()
+                    for prefix, mark in sorted(self._watermarks.items())
+                },
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=".watermark-", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(state, f, indent=2)
+                    f.write("\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        logger.info(
+            f"Saved watermarks to {self.path}: {advanced} shards advanced, "
+            f"{len(self._failed)} held back by errors"
+        )
+
+    def close(self):
+        """Release the state file lock."""
+        if not self._lock_file.closed:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
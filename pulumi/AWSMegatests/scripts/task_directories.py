@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Task-directory-level tagging for Nextflow work/ trees.
+
+Nextflow writes the same handful of files (.command.*, .exitcode) into every
+task directory work/<xx>/<hash>/. In --by-directory mode the tagger groups
+the streamed listing by task directory and handles each directory as one
+unit of work: it is tagged by a single worker, counted once and recorded
+once when every file in it has been tagged.
+
+Completed directories are kept in a TaskDirectoryState database. Later runs
+drop their keys from the listing pages before classification, so a
+directory tagged on a previous run costs neither classification nor tagging
+calls. A directory is only recorded once it holds its ``.exitcode``, the
+last file Nextflow writes; directories of running tasks are checked again.
+
+Nextflow task hashes are 128-bit, so each completed directory is stored as
+its 16-byte hash and held in memory as one sorted byte string, searched by
+bisection: 16 bytes per directory instead of a Python string per key.
+"""
+
+import bisect
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+DIGEST_SIZE = 16
+
+# Written by Nextflow when the task finishes, after all other task files
+COMPLETION_MARKER = ".exitcode"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    bucket TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS completed_directories (
+    digest BLOB PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+class DirectoryStateError(Exception):
+    """Raised when a directory state database cannot be used for a run."""
+
+
+def task_directory(key: str, prefix: str = "work/") -> Optional[str]:
+    """Return the ``work/<xx>/<hash>/`` directory holding a key, if any."""
+    if not key.startswith(prefix):
+        return None
+    parts = key[len(prefix) :].split("/", 2)
+    if len(parts) < 3:
+        return None
+    return f"{prefix}{parts[0]}/{parts[1]}/"
+
+
+def directory_digest(directory: str) -> bytes:
+    """Fixed-size identifier of a task directory.
+
+    For Nextflow's layout this is the task hash itself (the two-character
+    shard followed by the remaining 30 hex digits); other names are hashed.
+    """
+    shard, _, name = directory.rstrip("/").rpartition("/")
+    digits = shard.rpartition("/")[2] + name
+    if len(digits) == 2 * DIGEST_SIZE:
+        try:
+            return bytes.fromhex(digits)
+        except ValueError:
+            pass
+    return hashlib.blake2b(directory.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+@dataclass
+class TaskDirectory:
+    """Selected objects of one task directory, in listing order.
+
+    ``prefix`` is None for a selected object outside any task directory,
+    which then forms a group of its own.
+    """
+
+    prefix: Optional[str]
+    objects: List[Dict] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the task finished, i.e. its completion marker was listed."""
+        return any(
+            obj["Key"].rpartition("/")[2] == COMPLETION_MARKER for obj in self.objects
+        )
+
+
+def group_task_directories(
+    objects: Iterable[Dict], prefix: str = "work/"
+) -> Iterator[TaskDirectory]:
+    """Group a stream of selected objects by task directory.
+
+    Listings return keys in lexicographic order, so a directory's objects
+    are contiguous within each ``work/<xx>/`` shard. Sharded listings
+    interleave shards, so one open group is kept per shard and a group is
+    yielded once the next key of its shard belongs to another directory.
+    """
+    open_groups: Dict[str, TaskDirectory] = {}
+    for obj in objects:
+        directory = task_directory(obj["Key"], prefix)
+        if directory is None:
+            yield TaskDirectory(None, [obj])
+            continue
+        shard = directory[: directory.index("/", len(prefix)) + 1]
+        group = open_groups.get(shard)
+        if group is None or group.prefix != directory:
+            if group is not None:
+                yield group
+            group = open_groups[shard] = TaskDirectory(directory)
+        group.objects.append(obj)
+    yield from open_groups.values()
+
+
+class _PackedDigests:
+    """Sorted fixed-size digests stored back to back in one bytes object.
+
+    Indexable and sized, which is all bisect needs to search it.
+    """
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._data) // DIGEST_SIZE
+
+    def __getitem__(self, index: int) -> bytes:
+        start = index * DIGEST_SIZE
+        return self._data[start : start + DIGEST_SIZE]
+
+    def __contains__(self, digest: bytes) -> bool:
+        index = bisect.bisect_left(self, digest)
+        return index < len(self) and self[index] == digest
+
+
+class TaskDirectoryState:
+    """Thread-safe record of task directories tagged completely."""
+
+    def __init__(self, path: str, bucket: str):
+        """Open (or create) a directory state database.
+
+        Args:
+            path: Path to the SQLite database file
+            bucket: Bucket the run operates on
+
+        Raises:
+            DirectoryStateError: If the database belongs to another bucket
+        """
+        self.path = path
+        self.skipped_objects = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._pending_writes = 0
+        self._last_commit = time.time()
+
+        row = self._conn.execute("SELECT bucket FROM runs").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO runs (bucket) VALUES (?)", (bucket,))
+            self._conn.commit()
+        elif row[0] != bucket:
+            self._conn.close()
+            raise DirectoryStateError(
+                f"Directory state {path} belongs to bucket {row[0]}, not {bucket}"
+            )
+
+        # The primary key index returns the digests already sorted
+        self._completed = _PackedDigests(
+            b"".join(
+                digest
+                for (digest,) in self._conn.execute(
+                    "SELECT digest FROM completed_directories ORDER BY digest"
+                )
+            )
+        )
+        self._added: set = set()
+
+    @property
+    def completed(self) -> int:
+        """Number of directories recorded as complete, including this run's."""
+        return len(self._completed) + len(self._added)
+
+    def is_complete(self, directory: str) -> bool:
+        """Check whether a directory was tagged completely before."""
+        digest = directory_digest(directory)
+        return digest in self._completed or digest in self._added
+
+    def mark_complete(self, directory: str):
+        """Record that every file of a finished task directory is tagged."""
+        digest = directory_digest(directory)
+        with self._lock:
+            if digest in self._added or digest in self._completed:
+                return
+            self._added.add(digest)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO completed_directories (digest) VALUES (?)",
+                (digest,),
+            )
+            self.recorded += 1
+            self._pending_writes += 1
+            if self._pending_writes >= 1000 or time.time() - self._last_commit >= 5:
+                self._conn.commit()
+                self._pending_writes = 0
+                self._last_commit = time.time()
+
+    def skip_completed(
+        self, classifier: Callable[[List[Dict]], List[Dict]], prefix: str = "work/"
+    ) -> Callable[[List[Dict]], List[Dict]]:
+        """Wrap a page classifier to drop objects of completed directories."""
+
+        def classify(objects: List[Dict]) -> List[Dict]:
+            pending = []
+            last_directory = None
+            last_complete = False
+            for obj in objects:
+                directory = task_directory(obj["Key"], prefix)
+                if directory is not None and directory != last_directory:
+                    last_directory = directory
+                    last_complete = self.is_complete(directory)
+                if directory is not None and last_complete:
+                    continue
+                pending.append(obj)
+            if len(pending) < len(objects):
+                with self._lock:
+                    self.skipped_objects += len(objects) - len(pending)
+            return classifier(pending)
+
+        return classify
+
+    def close(self):
+        """Commit outstanding entries and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Storage analytics for the S3 work/ directory.
+
+Streams a bucket listing, an S3 Inventory report or a listing exported by
+the tagger (--export-listing) and aggregates bytes and object counts per
+task directory (work/<xx>/<hash>/), per storage class and per tag class.
+Tag classes come from the fusion.tags rules in nextflow-base.config
+(metadata vs temporary), i.e. the tags Fusion gives the files on live runs.
+
+Per-directory totals are kept in array-backed columns indexed through a
+dictionary of 16-byte task hash digests, so memory grows with the number of
+task directories (roughly 150 bytes each) rather than the number of objects.
+The report lists the top-N directories and a log2 histogram of directory
+sizes.
+
+Usage:
+    python work_storage_report.py --bucket nf-core-awsmegatests --top 25
+    python work_storage_report.py --bucket nf-core-awsmegatests \\
+        --inventory-manifest inventory/manifest.json --json report.json
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Union
+
+from fusion_tags import (
+    UNTAGGED,
+    FusionTagMatcher,
+    FusionTagsError,
+    tag_class_label,
+)
+from listing_export import (
+    ListingExportError,
+    iter_listing_export,
+    load_listing_metadata,
+)
+from prune_work_directories import format_bytes
+from s3_inventory import (
+    InventoryError,
+    iter_inventory_objects,
+    load_inventory_manifest,
+)
+from tag_existing_log_files import (
+    get_s3_client,
+    iter_sharded_work_directory_objects,
+    iter_work_directory_objects,
+)
+
+logger = logging.getLogger(__name__)
+
+# Histogram buckets: bucket b holds directories of [2**(b-1), 2**b) bytes
+HISTOGRAM_BUCKETS = 65
+
+
+class StorageAggregator:
+    """Accumulate work/ storage totals from a stream of listed objects."""
+
+    def __init__(self, matcher: Optional[FusionTagMatcher] = None, prefix="work/"):
+        """Create an empty aggregator.
+
+        Args:
+            matcher: fusion.tags rules used to assign tag classes; without
+                it every object counts as untagged
+            prefix: The work directory prefix
+        """
+        self.matcher = matcher
+        self.prefix = prefix
+        self._slots: Dict[Union[bytes, str], int] = {}
+        self.dir_bytes = array("Q")
+        self.dir_objects = array("I")
+
+        self.total_bytes = 0
+        self.total_objects = 0
+        # Objects directly in work/ or work/<xx>/, outside any task directory
+        self.other_bytes = 0
+        self.other_objects = 0
+        # (storage class, tag class) -> [objects, bytes]
+        self.by_class: Dict[tuple, List[int]] = {}
+
+        if matcher is not None:
+            self._rule_labels = [tag_class_label(rule.tags) for rule in matcher.rules]
+
+    @staticmethod
+    def _directory_id(shard: str, task_hash: str) -> Union[bytes, str]:
+        # Nextflow task directories are an MD5 digest in hex; store the
+        # 16 raw bytes, falling back to the name for anything else
+        try:
+            digest = bytes.fromhex(shard + task_hash)
+        except ValueError:
+            return f"{shard}/{task_hash}"
+        return digest if len(digest) == 16 else f"{shard}/{task_hash}"
+
+    @staticmethod
+    def _directory_name(directory_id: Union[bytes, str]) -> str:
+        if isinstance(directory_id, bytes):
+            hex_id = directory_id.hex()
+            return f"{hex_id[:2]}/{hex_id[2:]}"
+        return directory_id
+
+    def _tag_class(self, key: str) -> str:
+        if self.matcher is None:
+            return UNTAGGED
+        match = self.matcher.regex.match(key.rpartition("/")[2])
+        if match is None:
+            return UNTAGGED
+        return self._rule_labels[int(match.lastgroup[4:])]
+
+    def add_objects(self, objects: Iterable[Dict]):
+        """Add listed objects (Key, Size and, if known, StorageClass)."""
+        prefix_length = len(self.prefix)
+        slots = self._slots
+        dir_bytes = self.dir_bytes
+        dir_objects = self.dir_objects
+        by_class = self.by_class
+
+        for obj in objects:
+            key = obj["Key"]
+            size = obj.get("Size") or 0
+            self.total_bytes += size
+            self.total_objects += 1
+
+            class_key = (obj.get("StorageClass") or "STANDARD", self._tag_class(key))
+            totals = by_class.get(class_key)
+            if totals is None:
+                totals = by_class[class_key] = [0, 0]
+            totals[0] += 1
+            totals[1] += size
+
+            parts = key[prefix_length:].split("/", 2)
+            if len(parts) < 3:
+                self.other_bytes += size
+                self.other_objects += 1
+                continue
+            directory_id = self._directory_id(parts[0], parts[1])
+            slot = slots.get(directory_id)
+            if slot is None:
+                slot = slots[directory_id] = len(dir_bytes)
+                dir_bytes.append(0)
+                dir_objects.append(0)
+            dir_bytes[slot] += size
+            dir_objects[slot] += 1
+
+    @property
+    def directory_count(self) -> int:
+        return len(self.dir_bytes)
+
+    def top_directories(self, n: int, by: str = "bytes") -> List[Dict]:
+        """Return the ``n`` largest task directories by bytes or objects."""
+        column = self.dir_bytes if by == "bytes" else self.dir_objects
+        top_slots = heapq.nlargest(n, range(len(column)), key=column.__getitem__)
+        wanted = set(top_slots)
+        names = {
+            slot: directory_id
+            for directory_id, slot in self._slots.items()
+            if slot in wanted
+        }
+        return [
+            {
+                "directory": f"{self.prefix}{self._directory_name(names[slot])}/",
+                "bytes": self.dir_bytes[slot],
+                "objects": self.dir_objects[slot],
+            }
+            for slot in top_slots
+        ]
+
+    def size_histogram(self) -> List[Dict]:
+        """Return a log2 histogram of task directory sizes.
+
+        Each non-empty bucket reports its byte range, the number of
+        directories in it and the bytes they hold.
+        """
+        counts = array("Q", [0] * HISTOGRAM_BUCKETS)
+        sizes = array("Q", [0] * HISTOGRAM_BUCKETS)
+        for size in self.dir_bytes:
+            bucket = size.bit_length()
+            counts[bucket] += 1
+            sizes[bucket] += size
+        return [
+            {
+                "min_bytes": 0 if bucket == 0 else 2 ** (bucket - 1),
+                "max_bytes": 0 if bucket == 0 else 2**bucket - 1,
+                "directories": counts[bucket],
+                "bytes": sizes[bucket],
+            }
+            for bucket in range(HISTOGRAM_BUCKETS)
+            if counts[bucket]
+        ]
+
+    def report(self, top: int = 20) -> Dict:
+        """Build the full report as a JSON-serialisable dictionary."""
+
+        def totals_by(index: int) -> Dict[str, Dict[str, int]]:
+            grouped: Dict[str, Dict[str, int]] = {}
+            for class_key, (objects, size) in self.by_class.items():
+                entry = grouped.setdefault(class_key[index], {"objects": 0, "bytes": 0})
+                entry["objects"] += objects
+                entry["bytes"] += size
+            return grouped
+
+        return {
+            "total_objects": self.total_objects,
+            "total_bytes": self.total_bytes,
+            "task_directories": self.directory_count,
+            "outside_task_directories": {
+                "objects": self.other_objects,
+                "bytes": self.other_bytes,
+            },
+            "by_storage_class": totals_by(0),
+            "by_tag_class": totals_by(1),
+            "by_storage_and_tag_class": [
+                {
+                    "storage_class": storage_class,
+                    "tag_class": tag_class,
+                    "objects": objects,
+                    "bytes": size,
+                }
+                for (storage_class, tag_class), (objects, size) in sorted(
+                    self.by_class.items()
+                )
+            ],
+            "top_directories_by_bytes": self.top_directories(top, "bytes"),
+            "top_directories_by_objects": self.top_directories(top, "objects"),
+            "directory_size_histogram": self.size_histogram(),
+        }
+
+
+def log_report(report: Dict):
+    """Log a human readable version of a storage report."""
+    logger.info("=" * 60)
+    logger.info("WORK DIRECTORY STORAGE REPORT")
+    logger.info("=" * 60)
+    logger.info(
+        f"{report['total_objects']} objects, {format_bytes(report['total_bytes'])} "
+        f"in {report['task_directories']} task directories"
+    )
+    for title, key in (
+        ("By storage class", "by_storage_class"),
+        ("By tag class", "by_tag_class"),
+    ):
+        logger.info(f"{title}:")
+        for name, entry in sorted(report[key].items()):
+            logger.info(
+                f"  {name:<20} {format_bytes(entry['bytes']):>12} "
+                f"{entry['objects']:>12} objects"
+            )
+
+    logger.info("Largest task directories:")
+    for entry in report["top_directories_by_bytes"]:
+        logger.info(
+            f"  {format_bytes(entry['bytes']):>12} {entry['objects']:>8} objects  "
+            f"{entry['directory']}"
+        )
+
+    logger.info("Task directory sizes:")
+    largest = max(
+        (b["directories"] for b in report["directory_size_histogram"]), default=0
+    )
+    for bucket in report["directory_size_histogram"]:
+        bar = "#" * max(1, round(40 * bucket["directories"] / largest))
+        logger.info(
+            f"  {format_bytes(bucket['min_bytes']):>10} - "
+            f"{format_bytes(bucket['max_bytes']):>10} "
+            f"{bucket['directories']:>9} {bar}"
+        )
+
+
+def main():
+    """Main function to build a work/ storage report."""
+    parser = argparse.ArgumentParser(description="Report S3 work/ storage usage")
+    parser.add_argument("--bucket", required=True, help="S3 bucket name")
+    parser.add_argument(
+        "--prefix", default="work/", help="Work directory prefix (default: work/)"
+    )
+    parser.add_argument(
+        "--inventory-manifest",
+        metavar="PATH",
+        help="Read a local S3 Inventory manifest.json instead of listing the bucket",
+    )
+    parser.add_argument(
+        "--listing-export",
+        metavar="DIR",
+        help="Read a listing exported by tag_existing_log_files.py "
+        "--export-listing instead of listing the bucket",
+    )
+    parser.add_argument(
+        "--fusion-config",
+        metavar="CONFIG",
+        help="Nextflow config with the fusion.tags rules used for tag classes "
+        "(default: seqerakit/configs/nextflow-base.config)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=20, help="Number of top directories (default: 20)"
+    )
+    parser.add_argument(
+        "--list-workers",
+        type=int,
+        default=32,
+        help="Number of work/<xx>/ shards listed in parallel (default: 32)",
+    )
+    parser.add_argument(
+        "--no-shard-listing",
+        action="store_true",
+        help="List the work directory sequentially instead of by shard",
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    parser.add_argument(
+        "--endpoint-url",
+        help="Custom S3 endpoint, e.g. http://localhost:5000 for a moto server",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    if args.inventory_manifest and args.listing_export:
+        parser.error("Use either --inventory-manifest or --listing-export")
+
+    try:
+        matcher = FusionTagMatcher.from_config(args.fusion_config)
+    except (OSError, FusionTagsError) as e:
+        parser.error(f"Cannot load fusion.tags rules: {e}")
+
+    aggregator = StorageAggregator(matcher, args.prefix)
+    try:
+        if args.inventory_manifest:
+            manifest = load_inventory_manifest(args.inventory_manifest)
+            if manifest["sourceBucket"] != args.bucket:
+                raise InventoryError(
+                    f"Inventory describes bucket {manifest['sourceBucket']}, "
+                    f"not {args.bucket}"
+                )
+            objects = iter_inventory_objects(args.inventory_manifest, args.prefix)
+        elif args.listing_export:
+            metadata = load_listing_metadata(args.listing_export)
+            if metadata["bucket"] != args.bucket:
+                raise ListingExportError(
+                    f"Listing export describes bucket {metadata['bucket']}, "
+                    f"not {args.bucket}"
+                )
+            objects = iter_listing_export(args.listing_export, args.prefix)
+        else:
+            s3_client = get_s3_client(args.endpoint_url)
+            keep_all = lambda page: page  # noqa: E731
+            if args.no_shard_listing:
+                objects = iter_work_directory_objects(
+                    s3_client, args.bucket, args.prefix, classifier=keep_all
+                )
+            else:
+                objects = iter_sharded_work_directory_objects(
+                    s3_client,
+                    args.bucket,
+                    args.prefix,
+                    max_workers=args.list_workers,
+                    classifier=keep_all,
+                )
+        aggregator.add_objects(objects)
+    except InventoryError as e:
+        logger.error(f"Inventory error: {e}")
+        sys.exit(1)
+    except ListingExportError as e:
+        logger.error(f"Listing export error: {e}")
+        sys.exit(1)
+
+    report = aggregator.report(args.top)
+    log_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        logger.info(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
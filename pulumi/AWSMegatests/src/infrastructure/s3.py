@@ -5,7 +5,7 @@ from typing import Dict, Any
 import pulumi
 from pulumi_aws import s3
 
-from ..utils.constants import S3_BUCKET_NAME
+from ..utils.constants import S3_BUCKET_NAME, S3_LIFECYCLE_RULES
 
 
 def create_s3_infrastructure(aws_provider) -> Dict[str, Any]:
@@ -51,9 +51,57 @@ def create_s3_infrastructure(aws_provider) -> Dict[str, Any]:
     }
 
 
+def _lifecycle_rule_args(rule: Dict[str, Any]):
+    """Convert one S3 API-style lifecycle rule to Pulumi rule arguments.
+
+    Args:
+        rule: Rule from S3_LIFECYCLE_RULES (ID, Status, Filter with a Prefix
+            or Tag, Transitions, Expiration, AbortIncompleteMultipartUpload)
+
+    Returns:
+        s3.BucketLifecycleConfigurationV2RuleArgs for the rule
+    """
+    kwargs: Dict[str, Any] = {"id": rule["ID"], "status": rule["Status"]}
+
+    if "Filter" in rule:
+        rule_filter = rule["Filter"]
+        tag = rule_filter.get("Tag")
+        kwargs["filter"] = s3.BucketLifecycleConfigurationV2RuleFilterArgs(
+            prefix=rule_filter.get("Prefix"),
+            tag=s3.BucketLifecycleConfigurationV2RuleFilterTagArgs(
+                key=tag["Key"], value=tag["Value"]
+            )
+            if tag
+            else None,
+        )
+    if "Transitions" in rule:
+        kwargs["transitions"] = [
+            s3.BucketLifecycleConfigurationV2RuleTransitionArgs(
+                days=transition["Days"], storage_class=transition["StorageClass"]
+            )
+            for transition in rule["Transitions"]
+        ]
+    if "Expiration" in rule:
+        kwargs["expiration"] = s3.BucketLifecycleConfigurationV2RuleExpirationArgs(
+            days=rule["Expiration"]["Days"]
+        )
+    if "AbortIncompleteMultipartUpload" in rule:
+        kwargs["abort_incomplete_multipart_upload"] = (
+            s3.BucketLifecycleConfigurationV2RuleAbortIncompleteMultipartUploadArgs(
+                days_after_initiation=rule["AbortIncompleteMultipartUpload"][
+                    "DaysAfterInitiation"
+                ]
+            )
+        )
+    return s3.BucketLifecycleConfigurationV2RuleArgs(**kwargs)
+
+
 def create_s3_lifecycle_configuration(aws_provider, bucket):
     """Create S3 lifecycle configuration with proper rules for Nextflow workflows.
 
+    The rules are defined in S3_LIFECYCLE_RULES so that
+    scripts/lifecycle_simulator.py can evaluate exactly what is deployed.
+
     Args:
         aws_provider: Configured AWS provider instance
         bucket: S3 bucket resource
@@ -66,77 +114,7 @@ def create_s3_lifecycle_configuration(aws_provider, bucket):
     lifecycle_configuration = s3.BucketLifecycleConfigurationV2(
         "nf-core-awsmegatests-lifecycle",
         bucket=bucket.id,
-        rules=[
-            # Rule 1: Preserve metadata files with cost optimization
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="preserve-metadata-files",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(
-                    tag=s3.BucketLifecycleConfigurationV2RuleFilterTagArgs(
-                        key="nextflow.io/metadata", value="true"
-                    )
-                ),
-                transitions=[
-                    s3.BucketLifecycleConfigurationV2RuleTransitionArgs(
-                        days=30, storage_class="STANDARD_IA"
-                    ),
-                    s3.BucketLifecycleConfigurationV2RuleTransitionArgs(
-                        days=90, storage_class="GLACIER"
-                    ),
-                ],
-            ),
-            # Rule 2: Clean up temporary files after 30 days
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-temporary-files",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(
-                    tag=s3.BucketLifecycleConfigurationV2RuleFilterTagArgs(
-                        key="nextflow.io/temporary", value="true"
-                    )
-                ),
-                expiration=s3.BucketLifecycleConfigurationV2RuleExpirationArgs(days=30),
-            ),
-            # Rule 3: Clean up work directory after 30 days
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-work-directory",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(prefix="work/"),
-                expiration=s3.BucketLifecycleConfigurationV2RuleExpirationArgs(days=30),
-            ),
-            # Rule 4: Clean up scratch directory after 30 days
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-scratch-directory",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(
-                    prefix="scratch/"
-                ),
-                expiration=s3.BucketLifecycleConfigurationV2RuleExpirationArgs(days=30),
-            ),
-            # Rule 5: Clean up cache directories after 30 days
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-cache-directories",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(prefix="cache/"),
-                expiration=s3.BucketLifecycleConfigurationV2RuleExpirationArgs(days=30),
-            ),
-            # Rule 6: Clean up .cache directories after 30 days
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-dot-cache-directories",
-                status="Enabled",
-                filter=s3.BucketLifecycleConfigurationV2RuleFilterArgs(
-                    prefix=".cache/"
-                ),
-                expiration=s3.BucketLifecycleConfigurationV2RuleExpirationArgs(days=30),
-            ),
-            # Rule 7: Clean up incomplete multipart uploads
-            s3.BucketLifecycleConfigurationV2RuleArgs(
-                id="cleanup-incomplete-multipart-uploads",
-                status="Enabled",
-                abort_incomplete_multipart_upload=s3.BucketLifecycleConfigurationV2RuleAbortIncompleteMultipartUploadArgs(
-                    days_after_initiation=7
-                ),
-            ),
-        ],
+        rules=[_lifecycle_rule_args(rule) for rule in S3_LIFECYCLE_RULES],
         opts=pulumi.ResourceOptions(provider=aws_provider, depends_on=[bucket]),
     )
 
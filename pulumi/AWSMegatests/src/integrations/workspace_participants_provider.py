@@ -0,0 +1,322 @@
+"""Workspace participants as a Pulumi dynamic resource.
+
+Unlike the shell Commands and the apply() approach, the provider reads the
+workspace's participants from the Seqera API, so ``pulumi preview`` shows
+which members would be added, removed or changed and ``pulumi refresh``
+picks up changes made in the UI.
+
+One WorkspaceParticipants resource manages a whole set of participants
+(email → role). The participant list is fetched once per workspace and
+cached for the lifetime of the provider process, so read, diff and the
+following create/update of one deployment share a single list call.
+Only participants listed in the resource are ever modified, and only the
+ones the resource added itself (its ``created`` output) are ever removed:
+members who were already in the workspace, such as the token owner, are
+adopted and left in place when dropped from the list or on delete.
+"""
+
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pulumi
+import requests
+from pulumi.dynamic import (
+    CreateResult,
+    DiffResult,
+    ReadResult,
+    Resource,
+    ResourceProvider,
+    UpdateResult,
+)
+
+SEQERA_API_URL = "https://api.cloud.seqera.io"
+NF_CORE_ORG_ID = 252464779077610
+
+# Largest page the participants endpoint returns
+PAGE_SIZE = 100
+
+# Inputs that identify the workspace; changing them replaces the resource
+WORKSPACE_INPUTS = ("api_url", "org_id", "workspace_id")
+
+# Participants listed per workspace during this deployment
+_participant_cache: Dict[Tuple[str, int, int], Dict[str, Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+class ParticipantsApiError(Exception):
+    """Raised when the Seqera API rejects a workspace participants request."""
+
+
+class _WorkspaceClient:
+    """Minimal client for one workspace's participants endpoints."""
+
+    def __init__(self, props: Dict[str, Any]):
+        self.api_url = props.get("api_url") or SEQERA_API_URL
+        self.org_id = int(props["org_id"])
+        self.workspace_id = int(props["workspace_id"])
+        self.base_url = (
+            f"{self.api_url}/orgs/{self.org_id}"
+            f"/workspaces/{self.workspace_id}/participants"
+        )
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {props['token']}",
+                "Content-Type": "application/json",
+            }
+        )
+
+    @property
+    def cache_key(self) -> Tuple[str, int, int]:
+        return (self.api_url, self.org_id, self.workspace_id)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = self.session.request(method, url, timeout=30, **kwargs)
+        if response.status_code not in (200, 201, 204):
+            raise ParticipantsApiError(
+                f"{method} {url} failed with status {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+        return response
+
+    def participants(self, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Current participants by lowercased email, listed once per deployment."""
+        with _cache_lock:
+            if refresh or self.cache_key not in _participant_cache:
+                _participant_cache[self.cache_key] = self._list_participants()
+            return _participant_cache[self.cache_key]
+
+    def _list_participants(self) -> Dict[str, Dict[str, Any]]:
+        # Same paging as scripts/seqera_pagination.py, which the Pulumi program
+        # cannot import; pages are followed one at a time on the session
+        participants: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        while True:
+            data = self._request(
+                "GET", self.base_url, params={"max": PAGE_SIZE, "offset": offset}
+            ).json()
+            page = data.get("participants", [])
+            for participant in page:
+                if participant.get("email"):
+                    participants[participant["email"].lower()] = participant
+            offset += len(page)
+            if not page or offset >= data.get("totalSize", offset):
+                return participants
+
+    def add(self, email: str) -> Dict[str, Any]:
+        response = self._request(
+            "PUT", f"{self.base_url}/add", json={"userNameOrEmail": email}
+        )
+        # The API may answer 204 or an empty body instead of the participant
+        body = response.json() if response.content else {}
+        participant = body.get("participant")
+        if not participant:
+            listed = self._list_participants()
+            participant = listed.get(email.lower()) or {"email": email}
+        participant.setdefault("email", email)
+        self.participants()[email.lower()] = participant
+        return participant
+
+    def set_role(self, participant: Dict[str, Any], role: str):
+        self._request(
+            "PUT",
+            f"{self.base_url}/{participant['participantId']}/role",
+            json={"role": role.lower()},
+        )
+        participant["wspRole"] = role.lower()
+
+    def remove(self, participant: Dict[str, Any]):
+        self._request("DELETE", f"{self.base_url}/{participant['participantId']}")
+        self.participants().pop(participant["email"].lower(), None)
+
+
+def _normalise(participants: Dict[str, str]) -> Dict[str, str]:
+    """Lowercase emails and roles so they compare equal to the API's."""
+    return {email.lower(): role.lower() for email, role in participants.items()}
+
+
+def live_roles(current: Dict[str, Dict[str, Any]], emails: List[str]) -> Dict[str, str]:
+    """Workspace roles of the given emails that are participants."""
+    return {
+        email: current[email].get("wspRole", "").lower()
+        for email in emails
+        if email in current
+    }
+
+
+def plan_participant_changes(
+    desired: Dict[str, str], live: Dict[str, str], managed: List[str]
+) -> Dict[str, List[str]]:
+    """Emails to add, re-role and remove to turn ``live`` into ``desired``.
+
+    Args:
+        desired: Email → role the resource should hold
+        live: Email → role currently in the workspace, for managed emails
+        managed: Emails the resource added so far; only these are removed
+    """
+    return {
+        "add": sorted(email for email in desired if email not in live),
+        "set_role": sorted(
+            email
+            for email, role in desired.items()
+            if email in live and live[email] != role
+        ),
+        "remove": sorted(
+            email for email in managed if email not in desired and email in live
+        ),
+    }
+
+
+class WorkspaceParticipantsProvider(ResourceProvider):
+    """Dynamic provider managing a set of Seqera workspace participants."""
+
+    def _apply(self, props: Dict[str, Any], created: List[str]) -> Dict[str, Any]:
+        """Reconcile the workspace; ``created`` lists emails added on earlier runs."""
+        client = _WorkspaceClient(props)
+        desired = _normalise(props["participants"])
+        current = client.participants()
+        plan = plan_participant_changes(
+            desired, live_roles(current, list(desired) + created), created
+        )
+
+        for email in plan["add"]:
+            participant = client.add(email)
+            if participant.get("participantId") and (
+                participant.get("wspRole", "").lower() != desired[email]
+            ):
+                client.set_role(participant, desired[email])
+        for email in plan["set_role"]:
+            client.set_role(current[email], desired[email])
+        for email in plan["remove"]:
+            client.remove(current[email])
+
+        return {
+            **props,
+            "participants": desired,
+            "participant_ids": {
+                email: current[email].get("participantId")
+                for email in desired
+                if email in current
+            },
+            "created": sorted(
+                {email for email in created if email in desired} | set(plan["add"])
+            ),
+        }
+
+    def create(self, props: Dict[str, Any]) -> CreateResult:
+        outs = self._apply(props, created=[])
+        return CreateResult(
+            id_=f"{outs['org_id']}:{outs['workspace_id']}:participants", outs=outs
+        )
+
+    def update(
+        self, _id: str, olds: Dict[str, Any], news: Dict[str, Any]
+    ) -> UpdateResult:
+        return UpdateResult(
+            outs=self._apply(news, created=list(olds.get("created") or []))
+        )
+
+    def delete(self, _id: str, props: Dict[str, Any]):
+        """Remove the participants this resource added; adopted ones stay."""
+        client = _WorkspaceClient(props)
+        current = client.participants()
+        for email in props.get("created") or []:
+            if email in current:
+                client.remove(current[email])
+
+    def read(self, id_: str, props: Dict[str, Any]) -> ReadResult:
+        """Refresh the managed participants' roles from the workspace."""
+        client = _WorkspaceClient(props)
+        current = client.participants(refresh=True)
+        return ReadResult(
+            id_=id_,
+            outs={
+                **props,
+                "participants": live_roles(current, list(props["participants"])),
+                "participant_ids": {
+                    email: current[email].get("participantId")
+                    for email in props["participants"]
+                    if email in current
+                },
+            },
+        )
+
+    def diff(self, _id: str, olds: Dict[str, Any], news: Dict[str, Any]) -> DiffResult:
+        """Compare the desired participants with the workspace's live roles."""
+        replaces = [
+            key for key in WORKSPACE_INPUTS if str(olds.get(key)) != str(news.get(key))
+        ]
+        if replaces:
+            return DiffResult(changes=True, replaces=replaces)
+
+        managed = list(olds.get("created") or [])
+        desired = _normalise(news["participants"])
+        current = _WorkspaceClient(news).participants()
+        plan = plan_participant_changes(
+            desired, live_roles(current, list(desired) + managed), managed
+        )
+        changes = any(plan.values()) or _normalise(olds["participants"]) != desired
+        return DiffResult(changes=changes, replaces=[], stables=list(WORKSPACE_INPUTS))
+
+
+class WorkspaceParticipants(Resource):
+    """A set of participants of one Seqera workspace, by email and role."""
+
+    participants: pulumi.Output[Dict[str, str]]
+    participant_ids: pulumi.Output[Dict[str, Any]]
+    created: pulumi.Output[List[str]]
+
+    def __init__(
+        self,
+        name: str,
+        workspace_id: pulumi.Input[int],
+        token: pulumi.Input[str],
+        participants: pulumi.Input[Dict[str, str]],
+        org_id: int = NF_CORE_ORG_ID,
+        api_url: str = SEQERA_API_URL,
+        opts: Optional[pulumi.ResourceOptions] = None,
+    ):
+        """Manage workspace participants.
+
+        Args:
+            name: Pulumi resource name
+            workspace_id: Seqera workspace ID
+            token: Seqera API token (stored as a secret)
+            participants: Email → workspace role (e.g. OWNER, MAINTAIN)
+            org_id: Seqera organization ID (default: nf-core)
+            api_url: Seqera API base URL
+            opts: Pulumi resource options
+        """
+        super().__init__(
+            WorkspaceParticipantsProvider(),
+            name,
+            {
+                "api_url": api_url,
+                "org_id": org_id,
+                "workspace_id": workspace_id,
+                "token": pulumi.Output.secret(token),
+                "participants": participants,
+                "participant_ids": None,
+                "created": None,
+            },
+            pulumi.ResourceOptions.merge(
+                opts, pulumi.ResourceOptions(additional_secret_outputs=["token"])
+            ),
+        )
+
+
+def load_team_participants(
+    path: str = "scripts/unified_team_data.json",
+) -> Dict[str, str]:
+    """Load team members with a known email as email → workspace role."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return {
+        member["name"]: member["role"]
+        for member in data.get("seqera_participants", [])
+        if "@" in member["name"]
+    }
@@ -5,6 +5,61 @@ AWS_REGION = "eu-west-1"
 S3_BUCKET_NAME = "nf-core-awsmegatests"
 S3_WORK_DIR = f"s3://{S3_BUCKET_NAME}"
 
+# S3 lifecycle rules for the work bucket, in the shape of the S3
+# PutBucketLifecycleConfiguration API. create_s3_lifecycle_configuration()
+# deploys them and scripts/lifecycle_simulator.py projects their effect, so
+# this module must stay free of imports.
+S3_LIFECYCLE_RULES = [
+    # Preserve metadata files with cost optimization
+    {
+        "ID": "preserve-metadata-files",
+        "Status": "Enabled",
+        "Filter": {"Tag": {"Key": "nextflow.io/metadata", "Value": "true"}},
+        "Transitions": [
+            {"Days": 30, "StorageClass": "STANDARD_IA"},
+            {"Days": 90, "StorageClass": "GLACIER"},
+        ],
+    },
+    # Clean up temporary files after 30 days
+    {
+        "ID": "cleanup-temporary-files",
+        "Status": "Enabled",
+        "Filter": {"Tag": {"Key": "nextflow.io/temporary", "Value": "true"}},
+        "Expiration": {"Days": 30},
+    },
+    # Clean up work, scratch and cache directories after 30 days
+    {
+        "ID": "cleanup-work-directory",
+        "Status": "Enabled",
+        "Filter": {"Prefix": "work/"},
+        "Expiration": {"Days": 30},
+    },
+    {
+        "ID": "cleanup-scratch-directory",
+        "Status": "Enabled",
+        "Filter": {"Prefix": "scratch/"},
+        "Expiration": {"Days": 30},
+    },
+    {
+        "ID": "cleanup-cache-directories",
+        "Status": "Enabled",
+        "Filter": {"Prefix": "cache/"},
+        "Expiration": {"Days": 30},
+    },
+    {
+        "ID": "cleanup-dot-cache-directories",
+        "Status": "Enabled",
+        "Filter": {"Prefix": ".cache/"},
+        "Expiration": {"Days": 30},
+    },
+    # Clean up incomplete multipart uploads
+    {
+        "ID": "cleanup-incomplete-multipart-uploads",
+        "Status": "Enabled",
+        "AbortIncompleteMultipartUpload": {"DaysAfterInitiation": 7},
+    },
+]
+
 # Seqera Configuration
 SEQERA_API_URL = "https://api.cloud.seqera.io"
 
@@ -0,0 +1,123 @@
+"""In-memory stand-in for the parts of the boto3 S3 client the scripts use."""
+
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from botocore.exceptions import ClientError
+
+OLD_OBJECT_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakePaginator:
+    """Minimal list_objects_v2 paginator over a FakeS3Client."""
+
+    def __init__(self, client: "FakeS3Client"):
+        self.client = client
+
+    def paginate(
+        self, Bucket, Prefix="", Delimiter=None, PaginationConfig=None, **kwargs
+    ):
+        page_size = (PaginationConfig or {}).get("PageSize", 1000)
+        keys = sorted(k for k in self.client.objects if k.startswith(Prefix))
+        if Delimiter:
+            prefixes = sorted(
+                {
+                    Prefix + k[len(Prefix) :].split(Delimiter)[0] + Delimiter
+                    for k in keys
+                    if Delimiter in k[len(Prefix) :]
+                }
+            )
+            self.client.list_calls += 1
+            yield {
+                "CommonPrefixes": [{"Prefix": p} for p in prefixes],
+                "Contents": [
+                    {"Key": k, "Size": self.client.objects[k]}
+                    for k in keys
+                    if Delimiter not in k[len(Prefix) :]
+                ],
+            }
+            return
+        first = int(kwargs.get("ContinuationToken", 0))
+        for start in range(first, len(keys), page_size):
+            self.client.list_calls += 1
+            page = {
+                "Contents": [
+                    {
+                        "Key": key,
+                        "Size": self.client.objects[key],
+                        "ETag": f'"{hash(key) & 0xFFFFFFFF:08x}"',
+                        "LastModified": self.client.last_modified[key],
+                    }
+                    for key in keys[start : start + page_size]
+                ]
+            }
+            if start + page_size < len(keys):
+                page["NextContinuationToken"] = str(start + page_size)
+            yield page
+
+
+class FakeS3Client:
+    """Thread-safe in-memory S3 client supporting the calls the tagger makes."""
+
+    def __init__(self, keys: List[str]):
+        self.objects: Dict[str, int] = {key: 1 for key in keys}
+        self.tags: Dict[str, Dict[str, str]] = {key: {} for key in keys}
+        self.last_modified = {key: OLD_OBJECT_TIME for key in keys}
+        self.list_calls = 0
+        self.get_calls = 0
+        self.put_calls = 0
+        self.delete_calls = 0
+        self.failing_keys: set = set()
+        self._lock = threading.Lock()
+
+    def get_paginator(self, operation_name):
+        assert operation_name == "list_objects_v2"
+        return FakePaginator(self)
+
+    def get_object_tagging(self, Bucket, Key):
+        with self._lock:
+            self.get_calls += 1
+            tags = dict(self.tags[Key])
+        return {"TagSet": [{"Key": k, "Value": v} for k, v in tags.items()]}
+
+    def put_object_tagging(self, Bucket, Key, Tagging):
+        if Key in self.failing_keys:
+            raise ClientError(
+                {"Error": {"Code": "ExpiredToken", "Message": "expired"}},
+                "PutObjectTagging",
+            )
+        with self._lock:
+            self.put_calls += 1
+            self.tags[Key] = {t["Key"]: t["Value"] for t in Tagging["TagSet"]}
+        return {}
+
+    def delete_objects(self, Bucket, Delete):
+        assert len(Delete["Objects"]) <= 1000
+        errors = []
+        with self._lock:
+            self.delete_calls += 1
+            for entry in Delete["Objects"]:
+                key = entry["Key"]
+                if key in self.failing_keys:
+                    errors.append({"Key": key, "Code": "AccessDenied", "Message": ""})
+                    continue
+                for store in (self.objects, self.tags, self.last_modified):
+                    store.pop(key, None)
+        return {"Errors": errors} if errors else {}
+
+
+def make_work_keys(task_count: int) -> List[str]:
+    """Build a synthetic Nextflow work/ tree with log and data files."""
+    keys = []
+    for i in range(task_count):
+        task_dir = f"work/{i % 256:02x}/{i:030x}"
+        keys.extend(
+            [
+                f"{task_dir}/.command.log",
+                f"{task_dir}/.command.sh",
+                f"{task_dir}/.exitcode",
+                f"{task_dir}/output.bam",
+            ]
+        )
+    return keys
@@ -0,0 +1,79 @@
+"""Test S3 Batch Operations manifest generation.
+
+Manifests and job specifications are generated into a temporary directory and
+checked offline for sharding, encoding and consistency.
+"""
+
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from batch_operations_manifest import write_batch_manifests  # noqa: E402
+
+METADATA_TAG = {"nextflow.io/metadata": "true"}
+ROLE_ARN = "arn:aws:iam::123456789012:role/batch-tagging"
+
+
+def write_manifests(tmp_path, keys, max_keys):
+    return write_batch_manifests(
+        ({"Key": key} for key in keys),
+        "nf-core-awsmegatests",
+        str(tmp_path),
+        METADATA_TAG,
+        role_arn=ROLE_ARN,
+        manifest_bucket="manifest-bucket",
+        manifest_prefix="/batch/tagging/",
+        account_id="123456789012",
+        max_keys_per_manifest=max_keys,
+    )
+
+
+class TestBatchOperationsManifest:
+    """Test the manifest and job specification output."""
+
+    def test_manifests_are_sharded_by_key_count(self, tmp_path):
+        keys = [f"work/{i:02x}/abc/.command.log" for i in range(25)]
+
+        shards = write_manifests(tmp_path, keys, max_keys=10)
+
+        assert [shard["keys"] for shard in shards] == [10, 10, 5]
+        rows = []
+        for shard in shards:
+            with open(shard["manifest"], newline="") as f:
+                rows.extend(csv.reader(f))
+        assert [key for _, key in rows] == keys
+        assert {bucket for bucket, _ in rows} == {"nf-core-awsmegatests"}
+
+    def test_keys_are_url_encoded(self, tmp_path):
+        shards = write_manifests(tmp_path, ["work/00/abc/sample 1+2.log"], 10)
+
+        with open(shards[0]["manifest"]) as f:
+            line = f.read()
+
+        assert line == "nf-core-awsmegatests,work/00/abc/sample%201%2B2.log\n"
+
+    def test_job_specification_matches_manifest(self, tmp_path):
+        shards = write_manifests(tmp_path, ["work/00/abc/.exitcode"], 10)
+        job = json.loads(Path(shards[0]["job"]).read_text())
+        manifest_md5 = hashlib.md5(Path(shards[0]["manifest"]).read_bytes())
+
+        assert job["AccountId"] == "123456789012"
+        assert job["RoleArn"] == ROLE_ARN
+        assert job["Operation"]["S3PutObjectTagging"]["TagSet"] == [
+            {"Key": "nextflow.io/metadata", "Value": "true"}
+        ]
+        assert job["Manifest"]["Location"] == {
+            "ObjectArn": "arn:aws:s3:::manifest-bucket/batch/tagging/manifest-00000.csv",
+            "ETag": manifest_md5.hexdigest(),
+        }
+        assert job["Manifest"]["Spec"]["Fields"] == ["Bucket", "Key"]
+
+    def test_no_objects_writes_no_manifests(self, tmp_path):
+        assert write_manifests(tmp_path, [], 10) == []
+        assert list(tmp_path.iterdir()) == []
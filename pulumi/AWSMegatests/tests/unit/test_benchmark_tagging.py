@@ -0,0 +1,81 @@
+"""Test the helpers of the moto-based tagging benchmark."""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from benchmark_tagging import (  # noqa: E402
+    compare_results,
+    parse_configuration,
+    parse_metrics,
+    request_counts,
+    synthetic_keys,
+    task_file_names,
+)
+from tag_existing_log_files import filter_log_objects  # noqa: E402
+
+
+class TestSyntheticTree:
+    """Test the generated work/ tree."""
+
+    @pytest.mark.parametrize(
+        "files_per_task,log_ratio,logs", [(8, 0.5, 4), (4, 0.0, 0), (10, 1.0, 7)]
+    )
+    def test_log_ratio_selects_log_files(self, files_per_task, log_ratio, logs):
+        names = task_file_names(files_per_task, log_ratio)
+        keys = synthetic_keys(3, names)
+
+        selected = filter_log_objects([{"Key": key} for key in keys])
+
+        assert len(names) == files_per_task
+        assert len(keys) == 3 * files_per_task
+        assert len(selected) == 3 * logs
+
+
+class TestResults:
+    """Test reading tagger metrics and comparing result files."""
+
+    def test_request_counts_are_read_from_metrics(self):
+        samples = parse_metrics(
+            "# TYPE tagger_objects_listed counter\n"
+            "tagger_objects_listed_total 400\n"
+            'tagger_s3_request_duration_seconds_count{operation="ListObjectsV2"} 2\n'
+            'tagger_s3_request_duration_seconds_count{operation="PutObjectTagging"} 200\n'
+            'tagger_s3_request_duration_seconds_sum{operation="ListObjectsV2"} 0.5\n'
+            "# EOF\n"
+        )
+
+        assert samples["tagger_objects_listed_total"] == 400
+        assert request_counts(samples) == {"ListObjectsV2": 2, "PutObjectTagging": 200}
+
+    def test_results_are_compared_by_configuration(self):
+        baseline = {
+            "results": [
+                {"name": "stream", "objects_per_second": 100.0},
+                {"name": "old", "objects_per_second": 50.0},
+            ]
+        }
+        current = {
+            "results": [
+                {"name": "stream", "objects_per_second": 120.0},
+                {"name": "new", "objects_per_second": 80.0},
+            ]
+        }
+
+        assert compare_results(baseline, current) == [("stream", 100.0, 120.0)]
+
+    def test_configuration_arguments_are_split(self):
+        assert parse_configuration("fusion=--stream --fusion-tags") == (
+            "fusion",
+            ["--stream", "--fusion-tags"],
+        )
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_configuration("--stream")
@@ -0,0 +1,121 @@
+"""Test the fusion.tags parser and matcher.
+
+The matcher is built from the real nextflow-base.config so backfills are
+checked against the same rules live Fusion runs use.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from fusion_tags import (  # noqa: E402
+    FusionTagMatcher,
+    FusionTagsError,
+    load_fusion_tags_spec,
+    parse_fusion_tags,
+    strip_line_comment,
+)
+
+METADATA = {"nextflow.io/metadata": "true"}
+TEMPORARY = {"nextflow.io/temporary": "true"}
+
+
+class TestFusionTagsParser:
+    """Test parsing fusion.tags specifications."""
+
+    def test_base_config_spec_is_loaded(self):
+        spec = load_fusion_tags_spec()
+
+        rules = parse_fusion_tags(spec)
+
+        assert [rule.globs for rule in rules] == [
+            (".command.*", ".exitcode", ".fusion.*"),
+            ("*",),
+        ]
+        assert [rule.tags for rule in rules] == [METADATA, TEMPORARY]
+
+    def test_multiple_tags_per_rule(self):
+        rules = parse_fusion_tags("[*.log](a=1,b=2)")
+
+        assert rules[0].tags == {"a": "1", "b": "2"}
+
+    def test_slashes_inside_strings_are_not_comments(self, tmp_path):
+        config = tmp_path / "nextflow.config"
+        config.write_text(
+            "// fusion.tags = '[*](old=true)'\n"
+            "fusion {\n"
+            "    tags = '[*.log](source=s3://bucket/logs),[*](a=b)' // live rules\n"
+            "}\n"
+        )
+
+        spec = load_fusion_tags_spec(str(config))
+
+        assert spec == "[*.log](source=s3://bucket/logs),[*](a=b)"
+        assert parse_fusion_tags(spec)[0].tags == {"source": "s3://bucket/logs"}
+
+    @pytest.mark.parametrize(
+        "line,code",
+        [
+            ("x = 1 // note", "x = 1 "),
+            ("// all comment", ""),
+            ("url = 'http://a' // c", "url = 'http://a' "),
+            ('s = "it\\"s // here"', 's = "it\\"s // here"'),
+            ("path = a//b", "path = a//b"),
+        ],
+    )
+    def test_line_comments_are_stripped(self, line, code):
+        assert strip_line_comment(line) == code
+
+    @pytest.mark.parametrize(
+        "spec",
+        ["", "[*.log]", "[*.log](novalue)", "[*.log](a=b)[*](c=d)", "[](a=b)"],
+    )
+    def test_malformed_specs_are_rejected(self, spec):
+        with pytest.raises(FusionTagsError):
+            parse_fusion_tags(spec)
+
+
+class TestFusionTagMatcher:
+    """Test first-match-wins classification of object keys."""
+
+    @pytest.fixture
+    def matcher(self):
+        return FusionTagMatcher.from_config()
+
+    @pytest.mark.parametrize(
+        "key,expected",
+        [
+            ("work/00/abc/.command.log", METADATA),
+            ("work/00/abc/.command.sh", METADATA),
+            ("work/00/abc/.exitcode", METADATA),
+            ("work/00/abc/.fusion.log", METADATA),
+            ("work/00/abc/output.bam", TEMPORARY),
+            ("work/00/abc/trace.txt", TEMPORARY),
+            # Patterns apply to the file name, not the directory
+            ("work/00/.command.d/data.txt", TEMPORARY),
+            # Dots in patterns are literal
+            ("work/00/abc/xcommand.log", TEMPORARY),
+        ],
+    )
+    def test_keys_match_first_rule(self, matcher, key, expected):
+        assert matcher.tags_for(key) == expected
+
+    def test_question_mark_matches_one_character(self):
+        matcher = FusionTagMatcher.from_spec("[run?.log](a=b)")
+
+        assert matcher.tags_for("work/run1.log") == {"a": "b"}
+        assert matcher.tags_for("work/run10.log") is None
+
+    def test_classify_annotates_matching_objects(self):
+        matcher = FusionTagMatcher.from_spec("[.command.*](nextflow.io/metadata=true)")
+        page = [{"Key": "work/00/a/.command.err"}, {"Key": "work/00/a/out.txt"}]
+
+        assert matcher.classify(page) == [
+            {"Key": "work/00/a/.command.err", "Tags": METADATA}
+        ]
+        assert matcher.tag_keys == {"nextflow.io/metadata"}
@@ -0,0 +1,234 @@
+"""Test the lifecycle rule simulator on small in-memory snapshots."""
+
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from fusion_tags import FusionTagMatcher  # noqa: E402
+from lifecycle_simulator import (  # noqa: E402
+    InventorySnapshot,
+    LifecycleRuleError,
+    load_deployed_rules,
+    parse_rules,
+    simulate,
+)
+
+START = date(2025, 3, 1)
+START_DAY = (START - date(1970, 1, 1)).days
+LARGE = 1024 * 1024
+
+
+def created(days_ago: float) -> datetime:
+    """Creation time ``days_ago`` days before the start, at noon UTC."""
+    noon = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+    return noon - timedelta(days=days_ago)
+
+
+def snapshot(objects, rules, matcher=None):
+    prefixes = [rule.prefix for rule in rules if rule.prefix]
+    return InventorySnapshot(objects, START_DAY, prefixes, matcher)
+
+
+ARCHIVE_RULES = parse_rules(
+    [
+        {
+            "ID": "archive",
+            "Status": "Enabled",
+            "Filter": {"Prefix": "archive/"},
+            "Transitions": [
+                {"Days": 30, "StorageClass": "STANDARD_IA"},
+                {"Days": 90, "StorageClass": "GLACIER"},
+            ],
+        },
+        {
+            "ID": "disabled",
+            "Status": "Disabled",
+            "Filter": {"Prefix": "archive/"},
+            "Expiration": {"Days": 1},
+        },
+    ]
+)
+
+
+class TestLifecycleRules:
+    """Test loading and parsing lifecycle rules."""
+
+    def test_deployed_rules_are_loaded(self):
+        rules = parse_rules(load_deployed_rules())
+
+        by_id = {rule.rule_id: rule for rule in rules}
+        assert by_id["preserve-metadata-files"].tags == {"nextflow.io/metadata": "true"}
+        assert [
+            (t.days, t.storage_class)
+            for t in by_id["preserve-metadata-files"].transitions
+        ] == [(30, "STANDARD_IA"), (90, "GLACIER")]
+        assert by_id["cleanup-work-directory"].prefix == "work/"
+        assert by_id["cleanup-work-directory"].expiration.days == 30
+
+    def test_and_filters_are_parsed(self):
+        (rule,) = parse_rules(
+            [
+                {
+                    "ID": "big-results",
+                    "Status": "Enabled",
+                    "Filter": {
+                        "And": {
+                            "Prefix": "results/",
+                            "Tags": [{"Key": "a", "Value": "b"}],
+                            "ObjectSizeGreaterThan": 1000,
+                        }
+                    },
+                    "Expiration": {"Days": 7},
+                }
+            ]
+        )
+
+        assert (rule.prefix, rule.tags, rule.size_greater_than) == (
+            "results/",
+            {"a": "b"},
+            1000,
+        )
+        assert rule.filters_on_size
+
+    def test_unknown_storage_class_is_rejected(self):
+        with pytest.raises(LifecycleRuleError):
+            parse_rules(
+                [
+                    {
+                        "ID": "x",
+                        "Status": "Enabled",
+                        "Transitions": [{"Days": 1, "StorageClass": "TAPE"}],
+                    }
+                ]
+            )
+
+
+class TestSimulation:
+    """Test projected storage and costs."""
+
+    def test_work_files_expire_at_midnight_after_thirty_days(self):
+        rules = parse_rules(load_deployed_rules())
+        objects = [
+            {"Key": "work/ab/cdef/out.bam", "Size": LARGE, "LastModified": created(10)},
+            {"Key": "results/out.bam", "Size": LARGE, "LastModified": created(10)},
+        ]
+
+        result = simulate(
+            snapshot(objects, rules, FusionTagMatcher.from_config()),
+            rules,
+            START_DAY,
+            60,
+        )
+
+        standard = result["daily"]["bytes_by_class"]["STANDARD"]
+        # Created at noon 10 days ago: the clock starts 9 days ago and the
+        # object is removed 30 days later
+        assert standard[20] == 2 * LARGE
+        assert standard[21] == LARGE
+        assert result["expired_objects"] == 1
+        assert result["rule_matches"]["cleanup-work-directory"] == 1
+        assert result["rule_matches"]["cleanup-temporary-files"] == 1
+
+    def test_expiration_wins_over_metadata_transitions(self):
+        rules = parse_rules(load_deployed_rules())
+        objects = [
+            {
+                "Key": "work/ab/cdef/.command.log",
+                "Size": LARGE,
+                "LastModified": created(0),
+            }
+        ]
+
+        result = simulate(
+            snapshot(objects, rules, FusionTagMatcher.from_config()),
+            rules,
+            START_DAY,
+            60,
+        )
+
+        assert result["rule_matches"]["preserve-metadata-files"] == 1
+        assert result["transition_requests"] == {}
+        assert list(result["daily"]["bytes_by_class"]) == ["STANDARD"]
+
+    def test_transitions_move_large_objects_through_colder_classes(self):
+        objects = [
+            {"Key": "archive/big", "Size": LARGE, "LastModified": created(0)},
+            {"Key": "archive/small", "Size": 1024, "LastModified": created(0)},
+        ]
+
+        result = simulate(
+            snapshot(objects, ARCHIVE_RULES), ARCHIVE_RULES, START_DAY, 120
+        )
+
+        daily = result["daily"]["bytes_by_class"]
+        assert daily["STANDARD"][30] == LARGE + 1024
+        assert daily["STANDARD"][31] == 1024
+        assert daily["STANDARD_IA"][31] == LARGE
+        assert daily["STANDARD_IA"][91] == 0
+        assert daily["GLACIER"][91] == LARGE
+        assert result["transition_requests"] == {"STANDARD_IA": 1, "GLACIER": 1}
+        assert result["expired_objects"] == 0
+
+    def test_overdue_transitions_skip_to_the_coldest_class(self):
+        objects = [{"Key": "archive/old", "Size": LARGE, "LastModified": created(200)}]
+
+        result = simulate(
+            snapshot(objects, ARCHIVE_RULES), ARCHIVE_RULES, START_DAY, 10
+        )
+
+        assert result["daily"]["bytes_by_class"] == {"GLACIER": [LARGE] * 10}
+        assert result["transition_requests"] == {"GLACIER": 1}
+
+    def test_early_deletion_is_charged(self):
+        rules = parse_rules(
+            [
+                {
+                    "ID": "expire",
+                    "Status": "Enabled",
+                    "Filter": {"Prefix": "ia/"},
+                    "Expiration": {"Days": 20},
+                }
+            ]
+        )
+        objects = [
+            {
+                "Key": "ia/object",
+                "Size": 1024**3,
+                "LastModified": created(10),
+                "StorageClass": "STANDARD_IA",
+            }
+        ]
+
+        result = simulate(snapshot(objects, rules), rules, START_DAY, 30)
+
+        # Expires on day 11, 20 days after its clock started: 10 days short
+        assert result["early_deletion_cost"] == pytest.approx(0.0125 * 10 / 30)
+
+    def test_chunked_simulation_matches_single_pass(self):
+        rules = parse_rules(load_deployed_rules()) + ARCHIVE_RULES
+        objects = [
+            {
+                "Key": f"{prefix}{i}",
+                "Size": 1000 * i,
+                "LastModified": created(i % 150),
+            }
+            for i in range(300)
+            for prefix in ("work/ab/cd/", "archive/", "cache/")
+        ]
+        loaded = snapshot(objects, rules)
+
+        single = simulate(loaded, rules, START_DAY, 200)
+        chunked = simulate(loaded, rules, START_DAY, 200, chunk_size=7)
+
+        assert chunked["daily"] == single["daily"]
+        assert chunked["transition_requests"] == single["transition_requests"]
+        assert chunked["rule_matches"] == single["rule_matches"]
+        assert chunked["total_cost"] == pytest.approx(single["total_cost"])
@@ -0,0 +1,120 @@
+"""Test columnar listing exports written from the tagger's listing stage."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("pyarrow")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from fusion_tags import FusionTagMatcher  # noqa: E402
+from listing_export import (  # noqa: E402
+    ListingExporter,
+    ListingExportError,
+    iter_listing_export,
+    read_listing_export,
+)
+from tag_existing_log_files import (  # noqa: E402
+    filter_log_objects,
+    iter_work_directory_objects,
+)
+from tests.unit.fake_s3 import FakeS3Client, make_work_keys  # noqa: E402
+
+
+class TestListingExporter:
+    """Test exporting listings while classifying them."""
+
+    @pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+    def test_listing_round_trips_with_classification(self, tmp_path, file_format):
+        client = FakeS3Client(make_work_keys(50))
+        exporter = ListingExporter(
+            tmp_path / "export",
+            "bucket",
+            FusionTagMatcher.from_config().classify,
+            file_format,
+        )
+
+        selected = list(
+            exporter.complete_after(
+                iter_work_directory_objects(client, "bucket", classifier=exporter)
+            )
+        )
+
+        table = read_listing_export(tmp_path / "export")
+        assert len(selected) == table.num_rows == 200
+        assert sorted(table.column("key").to_pylist()) == sorted(client.objects)
+        labels = dict(
+            zip(
+                table.column("key").to_pylist(),
+                table.column("classification").to_pylist(),
+            )
+        )
+        assert labels["work/00/" + "0" * 30 + "/.command.log"] == "metadata"
+        assert labels["work/00/" + "0" * 30 + "/output.bam"] == "temporary"
+
+    def test_unselected_objects_have_no_classification(self, tmp_path):
+        exporter = ListingExporter(tmp_path, "bucket", filter_log_objects)
+        page = [
+            {"Key": "work/00/abc/.command.log", "Size": 1},
+            {"Key": "work/00/abc/output.bam", "Size": 2},
+        ]
+
+        assert exporter(page) == page[:1]
+        exporter.finish()
+
+        assert list(iter_listing_export(tmp_path, prefix="work/00/")) == [
+            {
+                "Key": "work/00/abc/.command.log",
+                "Size": 1,
+                "ETag": None,
+                "LastModified": None,
+                "StorageClass": None,
+                "Classification": "log",
+            },
+            {
+                "Key": "work/00/abc/output.bam",
+                "Size": 2,
+                "ETag": None,
+                "LastModified": None,
+                "StorageClass": None,
+                "Classification": None,
+            },
+        ]
+
+    def test_concurrent_pages_are_all_recorded(self, tmp_path):
+        exporter = ListingExporter(
+            tmp_path, "bucket", filter_log_objects, "arrow", rows_per_file=100
+        )
+        pages = [
+            [{"Key": f"work/{shard:02x}/{i}/out", "Size": i} for i in range(37)]
+            for shard in range(16)
+        ]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(exporter, pages))
+        exporter.finish()
+
+        table = read_listing_export(tmp_path)
+        # Pages of 37 rows fill a part file every third page
+        assert len(list(tmp_path.glob("part-*.arrow"))) == 6
+        assert table.num_rows == exporter.rows == 16 * 37
+        assert sum(table.column("size").to_pylist()) == 16 * sum(range(37))
+
+    def test_incomplete_export_is_refused(self, tmp_path):
+        exporter = ListingExporter(tmp_path, "bucket", filter_log_objects)
+        exporter([{"Key": "work/00/abc/.command.log", "Size": 1}])
+
+        with pytest.raises(ListingExportError, match="incomplete"):
+            read_listing_export(tmp_path)
+
+    def test_non_empty_directory_is_refused(self, tmp_path):
+        (tmp_path / "old.parquet").write_text("")
+
+        with pytest.raises(ListingExportError, match="not empty"):
+            ListingExporter(tmp_path, "bucket", filter_log_objects)
@@ -0,0 +1,151 @@
+"""Test selecting and deleting task directories with the prune script."""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import prune_work_directories as prune  # noqa: E402
+from tag_existing_log_files import iter_sharded_work_directory_objects  # noqa: E402
+from tests.unit.fake_s3 import OLD_OBJECT_TIME, FakeS3Client, make_work_keys  # noqa: E402
+
+NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def list_directories(client):
+    objects = iter_sharded_work_directory_objects(
+        client, "b", max_workers=4, classifier=lambda page: page
+    )
+    return prune.iter_task_directories(objects, now=NOW)
+
+
+class TestTaskDirectoryGrouping:
+    """Test grouping interleaved shard listings into task directories."""
+
+    def test_each_directory_is_yielded_once_with_totals(self):
+        client = FakeS3Client(make_work_keys(600) + ["work/stray.txt"])
+        client.objects["work/00/" + "0" * 30 + "/output.bam"] = 5000
+
+        directories = list(list_directories(client))
+
+        assert len(directories) == 600
+        assert len({d.prefix for d in directories}) == 600
+        first = next(d for d in directories if d.task_id == "00/" + "0" * 30)
+        assert len(first.keys) == 4
+        assert first.size == 5003
+        assert first.newest == OLD_OBJECT_TIME
+
+    def test_early_deletion_charge_for_recent_infrequent_access(self):
+        directory = prune.TaskDirectory("work/00/abc/")
+        directory.add(
+            {
+                "Key": "work/00/abc/x.bam",
+                "Size": prune.GB,
+                "StorageClass": "STANDARD_IA",
+                "LastModified": NOW - timedelta(days=10),
+            },
+            NOW,
+        )
+
+        # 20 of the 30 minimum days remain
+        assert directory.early_deletion_cost == pytest.approx(0.0125 * 20 / 30)
+
+
+class TestPruneSelection:
+    """Test the age, size and keep-list criteria."""
+
+    def directory(self, task_id, size=1, age_days=30):
+        directory = prune.TaskDirectory(f"work/{task_id}/")
+        directory.add(
+            {
+                "Key": f"work/{task_id}/x",
+                "Size": size,
+                "LastModified": NOW - timedelta(days=age_days),
+            },
+            NOW,
+        )
+        return directory
+
+    def test_all_given_criteria_must_hold(self):
+        criteria = prune.PruneCriteria(
+            older_than=timedelta(days=14), min_size=100, now=NOW
+        )
+
+        assert criteria.matches(self.directory("00/a", size=100, age_days=15))
+        assert not criteria.matches(self.directory("00/b", size=99, age_days=15))
+        assert not criteria.matches(self.directory("00/c", size=100, age_days=13))
+
+    def test_recently_written_directories_are_never_selected(self):
+        criteria = prune.PruneCriteria(min_size=0, now=NOW)
+
+        assert not criteria.matches(self.directory("00/a", age_days=0.5))
+
+    def test_keep_list_accepts_paths_and_abbreviated_hashes(self):
+        keep = prune.KeepList(
+            [
+                "# runs to keep",
+                "s3://bucket/work/00/aaaa1111bbbb/",
+                "01/cdef12",
+                "",
+            ]
+        )
+        criteria = prune.PruneCriteria(keep_list=keep, now=NOW)
+
+        assert len(keep) == 2
+        assert not criteria.matches(self.directory("00/aaaa1111bbbb"))
+        assert not criteria.matches(self.directory("01/cdef1234567890"))
+        assert criteria.matches(self.directory("01/cdef99"))
+
+    def test_invalid_keep_list_entry_is_rejected(self):
+        with pytest.raises(ValueError):
+            prune.KeepList(["not-a-hash"])
+
+
+class TestPruneExecution:
+    """Test dry-run reports and batched deletion."""
+
+    def test_dry_run_reports_without_deleting(self):
+        client = FakeS3Client(make_work_keys(300))
+        criteria = prune.PruneCriteria(older_than=timedelta(days=14), now=NOW)
+
+        report = prune.prune_directories(
+            client, "b", list_directories(client), criteria, dry_run=True
+        )
+
+        assert report["directories_selected"] == 300
+        assert report["objects_selected"] == 1200
+        assert report["bytes_by_storage_class"] == {"STANDARD": 1200}
+        assert client.delete_calls == 0
+        assert len(client.objects) == 1200
+
+    def test_delete_uses_full_batches_and_keeps_other_directories(self):
+        client = FakeS3Client(make_work_keys(600))
+        keep = prune.KeepList([f"{i % 256:02x}/{i:030x}" for i in range(100)])
+        criteria = prune.PruneCriteria(keep_list=keep, now=NOW)
+
+        report = prune.prune_directories(
+            client, "b", list_directories(client), criteria, dry_run=False
+        )
+
+        assert report["objects_deleted"] == 2000
+        assert report["delete_requests"] == client.delete_calls == 2
+        assert sorted(client.objects) == sorted(make_work_keys(100))
+
+    def test_per_key_errors_are_reported(self):
+        client = FakeS3Client(make_work_keys(10))
+        client.failing_keys = {"work/03/" + "0" * 29 + "3/.exitcode"}
+        criteria = prune.PruneCriteria(older_than=timedelta(days=1), now=NOW)
+
+        report = prune.prune_directories(
+            client, "b", list_directories(client), criteria, dry_run=False
+        )
+
+        assert report["delete_errors"] == 1
+        assert report["objects_deleted"] == 39
@@ -0,0 +1,186 @@
+"""Test the batched GitHub team → Seqera workspace reconciler."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import add_maintainers_to_workspace  # noqa: E402
+import reconcile_team_participants  # noqa: E402
+from add_maintainers_to_workspace import SeqeraWorkspaceManager  # noqa: E402
+from parse_member_status import parse_member_statuses  # noqa: E402
+from reconcile_team_participants import (  # noqa: E402
+    add_status,
+    fetch_team_roles,
+    load_cached_emails,
+    plan_changes,
+    resolve_emails,
+)
+
+
+class FakeGitHub:
+    """Answers gh api calls from fixed team lists and profiles."""
+
+    def __init__(self, teams, profiles):
+        self.teams = teams
+        self.profiles = profiles
+        self.calls = []
+
+    def __call__(self, path: str, jq: str) -> str:
+        self.calls.append(path)
+        if path.startswith("orgs/nf-core/teams/"):
+            return "\n".join(self.teams[path.split("/")[3]])
+        login = path.rsplit("/", 1)[1]
+        if login not in self.profiles:
+            raise subprocess.CalledProcessError(1, "gh", stderr="HTTP 404")
+        return self.profiles[login] or ""
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+
+    def json(self):
+        return {}
+
+
+class TestReconciler:
+    """Test fetching, resolving and diffing team members."""
+
+    def test_github_calls_grow_linearly_with_members(self):
+        members = [f"user{i}" for i in range(40)]
+        github = FakeGitHub(
+            {"core": members[:5], "maintainers": members},
+            {login: f"{login}@example.com" for login in members},
+        )
+
+        roles = fetch_team_roles(github)
+        resolve_emails(list(roles), {}, github)
+
+        # One paginated call per team plus one profile lookup per member
+        assert len(github.calls) == 2 + 40
+        assert roles["user0"] == "OWNER"
+        assert roles["user39"] == "MAINTAIN"
+
+    def test_public_email_wins_over_cache(self):
+        github = FakeGitHub({}, {"moved": "new@example.com", "private": None})
+        cached = {"moved": "old@example.com", "private": "cached@example.com"}
+
+        emails = resolve_emails(["moved", "private", "gone", "unknown"], cached, github)
+
+        assert emails == {
+            "moved": "new@example.com",
+            "private": "cached@example.com",
+            "gone": None,
+            "unknown": None,
+        }
+
+    def test_only_missing_members_are_added(self):
+        roles = {"alice": "OWNER", "bob": "MAINTAIN", "carol": "MAINTAIN"}
+        emails = {"alice": "Alice@Example.com", "bob": "bob@example.com", "carol": None}
+        participants = [{"email": "alice@example.com", "wspRole": "owner"}]
+
+        plan = plan_changes(roles, emails, participants)
+
+        assert plan == {
+            "add": [("bob", "bob@example.com", "MAINTAIN")],
+            "exists": [("alice", "Alice@Example.com", "OWNER")],
+            "no_email": [("carol", None, "MAINTAIN")],
+        }
+
+    def test_placeholder_emails_are_not_cached(self, tmp_path):
+        path = tmp_path / "unified_team_data.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "seqera_participants": [
+                        {"name": "a@example.com", "github_username": "a"},
+                        {"name": "github:b", "github_username": "b"},
+                    ]
+                }
+            )
+        )
+
+        assert load_cached_emails(str(path)) == {"a": "a@example.com"}
+
+    def test_status_lines_are_parsed_per_member(self, capsys):
+        outputs = {
+            "workspace_participants": {
+                "team_sync": {
+                    "command_id": "team-sync",
+                    "status": "Found 2 members\n"
+                    "STATUS:ADDED:bob@example.com:MAINTAIN:bob\n"
+                    "STATUS:EXISTS:alice@example.com:OWNER:alice\n"
+                    "STATUS:NO_EMAIL:-:MAINTAIN:carol\n",
+                }
+            }
+        }
+
+        statuses = parse_member_statuses(outputs)
+
+        assert [m["username"] for m in statuses["ADDED"]] == ["bob"]
+        assert [m["username"] for m in statuses["EXISTS"]] == ["alice"]
+        assert [m["username"] for m in statuses["NO_EMAIL"]] == ["carol"]
+        assert "Successfully synced: 2/3" in capsys.readouterr().out
+
+    def test_members_without_an_account_are_not_failures(self, monkeypatch):
+        statuses = {"new@example.com": 201, "ghost@example.com": 404}
+        monkeypatch.setattr(
+            add_maintainers_to_workspace.requests,
+            "put",
+            lambda url, json=None, **kwargs: FakeResponse(
+                statuses.get(json["userNameOrEmail"], 500)
+            ),
+        )
+        manager = SeqeraWorkspaceManager("token")
+        emails = ["new@example.com", "ghost@example.com", "broken@example.com"]
+
+        results = {email: manager.add_participant(email) for email in emails}
+
+        assert [add_status(email, results, manager) for email in emails] == [
+            "ADDED",
+            "USER_NOT_FOUND",
+            "FAILED",
+        ]
+
+    def test_unreadable_workspace_stops_the_run(self, monkeypatch, capsys):
+        put_calls = []
+        monkeypatch.setenv("TOWER_ACCESS_TOKEN", "token")
+        monkeypatch.setattr(sys, "argv", ["reconcile_team_participants.py"])
+        monkeypatch.setattr(
+            reconcile_team_participants,
+            "fetch_team_roles",
+            lambda: {"alice": "OWNER"},
+        )
+        monkeypatch.setattr(
+            reconcile_team_participants,
+            "resolve_emails",
+            lambda logins, cached: {"alice": "alice@example.com"},
+        )
+        monkeypatch.setattr(
+            add_maintainers_to_workspace.requests,
+            "get",
+            lambda *args, **kwargs: FakeResponse(500),
+        )
+        monkeypatch.setattr(
+            add_maintainers_to_workspace.requests,
+            "put",
+            lambda *args, **kwargs: put_calls.append(args),
+        )
+
+        with pytest.raises(SystemExit) as exit_info:
+            reconcile_team_participants.main()
+
+        assert exit_info.value.code == 1
+        assert put_calls == []
+        assert "STATUS:" not in capsys.readouterr().out
@@ -0,0 +1,91 @@
+"""Test the S3 client factory used by the multi-threaded bucket scripts."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from s3_clients import (  # noqa: E402
+    PER_THREAD_POOL_CONNECTIONS,
+    S3ClientFactory,
+    ThreadLocalS3Client,
+)
+
+
+@pytest.fixture(autouse=True)
+def aws_environment(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "x")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "x")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def clients_by_thread(s3_client, threads: int):
+    """Resolve the underlying client of a proxy from several threads."""
+    barrier = threading.Barrier(threads)
+    resolved = [None] * threads
+
+    def resolve(i: int):
+        barrier.wait()
+        resolved[i] = s3_client._client()
+        assert s3_client._client() is resolved[i]
+
+    workers = [threading.Thread(target=resolve, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return resolved
+
+
+class TestS3ClientFactory:
+    """Test client configuration and hand-out modes."""
+
+    def test_shared_client_pool_is_sized_to_the_concurrency(self):
+        factory = S3ClientFactory(48)
+
+        client = factory.client()
+
+        config = client.meta.config
+        assert factory.client() is client
+        assert config.max_pool_connections == 48
+        assert config.retries == {"mode": "adaptive", "total_max_attempts": 10}
+        assert config.tcp_keepalive is True
+        assert factory.clients_created == 1
+
+    def test_retry_settings_can_be_overridden(self):
+        factory = S3ClientFactory(8, retry_mode="standard", max_attempts=1)
+
+        retries = factory.client().meta.config.retries
+
+        assert retries == {"mode": "standard", "total_max_attempts": 1}
+
+    def test_per_thread_clients_are_distinct_and_reused(self):
+        factory = S3ClientFactory(32, per_thread=True)
+        s3_client = factory.client()
+
+        resolved = clients_by_thread(s3_client, 6)
+
+        assert isinstance(s3_client, ThreadLocalS3Client)
+        assert len({id(client) for client in resolved}) == 6
+        assert factory.clients_created == 6
+        assert all(
+            client.meta.config.max_pool_connections == PER_THREAD_POOL_CONNECTIONS
+            for client in resolved
+        )
+        assert s3_client.meta.endpoint_url == "https://s3.amazonaws.com"
+
+    def test_hooks_run_on_every_created_client(self):
+        factory = S3ClientFactory(4, per_thread=True)
+        instrumented = []
+        factory.add_client_hook(instrumented.append)
+
+        resolved = clients_by_thread(factory.client(), 3)
+
+        assert sorted(map(id, instrumented)) == sorted(map(id, resolved))
@@ -0,0 +1,158 @@
+"""Test reading S3 Inventory reports from local disk.
+
+A small inventory delivery (manifest.json plus data files) is generated in a
+temporary directory so the reader and the tagger's inventory mode can be
+exercised without S3.
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import tag_existing_log_files as tagger  # noqa: E402
+from s3_inventory import (  # noqa: E402
+    InventoryError,
+    iter_inventory_objects,
+    load_inventory_manifest,
+)
+
+CSV_SCHEMA = "Bucket, Key, Size, LastModifiedDate, ETag, StorageClass"
+
+INVENTORY_ROWS = [
+    ("work/00/abc/.command.log", 120, "STANDARD"),
+    ("work/00/abc/.exitcode", 1, "STANDARD"),
+    ("work/00/abc/sample 1.bam", 5000, "STANDARD"),
+    ("work/01/def/trace.txt", 300, "STANDARD_IA"),
+    ("results/multiqc_report.html", 900, "STANDARD"),
+]
+
+
+def write_csv_inventory(directory: Path, rows=INVENTORY_ROWS, bucket="b") -> Path:
+    """Write a gzipped CSV inventory delivery and return the manifest path."""
+    data_dir = directory / "data"
+    data_dir.mkdir()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    for key, size, storage_class in rows:
+        writer.writerow(
+            [
+                bucket,
+                quote(key),
+                size,
+                "2024-05-01T12:00:00.000Z",
+                f"etag-{size}",
+                storage_class,
+            ]
+        )
+    with gzip.open(data_dir / "part-0.csv.gz", "wt") as f:
+        f.write(buffer.getvalue())
+
+    manifest = {
+        "sourceBucket": bucket,
+        "destinationBucket": "arn:aws:s3:::inventory-bucket",
+        "fileFormat": "CSV",
+        "fileSchema": CSV_SCHEMA,
+        "files": [{"key": f"{bucket}/daily/data/part-0.csv.gz", "size": 0}],
+    }
+    manifest_path = directory / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    return manifest_path
+
+
+class TestInventoryReader:
+    """Test streaming objects out of inventory reports."""
+
+    def test_csv_rows_become_listing_style_objects(self, tmp_path):
+        manifest_path = write_csv_inventory(tmp_path)
+
+        objects = list(iter_inventory_objects(str(manifest_path), prefix="work/"))
+
+        assert [obj["Key"] for obj in objects] == [
+            "work/00/abc/.command.log",
+            "work/00/abc/.exitcode",
+            "work/00/abc/sample 1.bam",
+            "work/01/def/trace.txt",
+        ]
+        assert objects[0]["Size"] == 120
+        assert objects[0]["ETag"] == '"etag-120"'
+        assert objects[0]["LastModified"] == datetime(
+            2024, 5, 1, 12, tzinfo=timezone.utc
+        )
+        assert objects[3]["StorageClass"] == "STANDARD_IA"
+
+    def test_parquet_inventory_is_read_in_batches(self, tmp_path):
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        table = pa.table(
+            {
+                "bucket": ["b", "b", "b"],
+                "key": ["work/00/a/.command.err", "work/00/a/x.fq", "work/00/b/x"],
+                "is_latest": [True, True, False],
+                "size": [1, 2, 3],
+                "e_tag": ["e1", "e2", "e3"],
+            }
+        )
+        pq.write_table(table, tmp_path / "part-0.parquet")
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(
+            json.dumps(
+                {
+                    "sourceBucket": "b",
+                    "fileFormat": "Parquet",
+                    "files": [{"key": "b/daily/data/part-0.parquet"}],
+                }
+            )
+        )
+
+        objects = list(iter_inventory_objects(str(manifest_path), batch_size=1))
+
+        assert [obj["Key"] for obj in objects] == [
+            "work/00/a/.command.err",
+            "work/00/a/x.fq",
+        ]
+
+    def test_orc_inventory_is_rejected(self, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        manifest_path.write_text(
+            json.dumps({"sourceBucket": "b", "fileFormat": "ORC", "files": []})
+        )
+
+        with pytest.raises(InventoryError, match="Unsupported"):
+            load_inventory_manifest(str(manifest_path))
+
+
+class TestInventoryTagging:
+    """Test driving the tagger from an inventory instead of a listing."""
+
+    def test_inventory_log_objects_are_classified(self, tmp_path):
+        manifest_path = write_csv_inventory(tmp_path)
+
+        keys = [
+            obj["Key"]
+            for obj in tagger.iter_inventory_log_objects(str(manifest_path), "b")
+        ]
+
+        assert keys == [
+            "work/00/abc/.command.log",
+            "work/00/abc/.exitcode",
+            "work/01/def/trace.txt",
+        ]
+
+    def test_inventory_for_other_bucket_is_rejected(self, tmp_path):
+        manifest_path = write_csv_inventory(tmp_path, bucket="other")
+
+        with pytest.raises(InventoryError, match="other"):
+            list(tagger.iter_inventory_log_objects(str(manifest_path), "b"))
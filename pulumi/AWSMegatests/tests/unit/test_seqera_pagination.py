@@ -0,0 +1,113 @@
+"""Test the concurrent Seqera API paginator."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from seqera_pagination import SeqeraApiError, iter_paginated  # noqa: E402
+
+
+class FakeCollection:
+    """Pages of numbered items, optionally without totalSize."""
+
+    def __init__(self, size, report_total=True, failing_offset=None, cap=None):
+        self.size = size
+        self.cap = cap
+        self.report_total = report_total
+        self.failing_offset = failing_offset
+        self.offsets = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, offset, max_items):
+        with self.lock:
+            self.offsets.append(offset)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if offset == self.failing_offset:
+                raise SeqeraApiError(500, "boom")
+            if offset:
+                # Let the other page requests start before this one returns
+                threading.Event().wait(0.01)
+            count = min(max_items, self.cap or max_items)
+            body = {"items": list(range(offset, min(offset + count, self.size)))}
+            if self.report_total:
+                body["totalSize"] = self.size
+            return body
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class TestPaginator:
+    """Test completeness, ordering and concurrency of paginated listings."""
+
+    def test_all_pages_are_yielded_in_order(self):
+        collection = FakeCollection(1050)
+        total = {}
+
+        items = list(
+            iter_paginated(collection, "items", page_size=100, total_size=total)
+        )
+
+        assert items == list(range(1050))
+        assert total == {"total": 1050}
+        assert sorted(collection.offsets) == list(range(0, 1050, 100))
+
+    def test_remaining_pages_are_fetched_concurrently(self):
+        collection = FakeCollection(1000)
+
+        list(iter_paginated(collection, "items", page_size=100, max_workers=4))
+
+        assert collection.max_active > 1
+        assert collection.max_active <= 4
+
+    @pytest.mark.parametrize("size", [0, 40, 100, 250])
+    def test_pages_are_followed_without_total_size(self, size):
+        collection = FakeCollection(size, report_total=False)
+
+        items = list(iter_paginated(collection, "items", page_size=100))
+
+        assert items == list(range(size))
+
+    @pytest.mark.parametrize("report_total", [True, False])
+    def test_pages_capped_by_the_server_are_not_skipped(self, report_total):
+        collection = FakeCollection(250, report_total=report_total, cap=30)
+
+        items = list(iter_paginated(collection, "items", page_size=100))
+
+        assert items == list(range(250))
+
+    def test_short_pages_after_the_first_are_completed(self):
+        collection = FakeCollection(250)
+
+        def fetch_page(offset, max_items):
+            # Cut one page short, as a server under load might
+            return collection(offset, 60 if offset == 100 else max_items)
+
+        items = list(iter_paginated(fetch_page, "items", page_size=100))
+
+        assert items == list(range(250))
+        assert sorted(collection.offsets) == [0, 100, 160, 200]
+
+    def test_page_errors_propagate(self):
+        collection = FakeCollection(500, failing_offset=300)
+
+        with pytest.raises(SeqeraApiError, match="HTTP 500"):
+            list(iter_paginated(collection, "items", page_size=100))
+
+    def test_single_page_makes_one_request(self):
+        collection = FakeCollection(60)
+
+        assert list(iter_paginated(collection, "items")) == list(range(60))
+        assert collection.offsets == [0]
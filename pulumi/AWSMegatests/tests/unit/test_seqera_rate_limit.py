@@ -0,0 +1,118 @@
+"""Test rate-limited, concurrent participant additions."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import add_maintainers_to_workspace  # noqa: E402
+from add_maintainers_to_workspace import SeqeraWorkspaceManager  # noqa: E402
+from seqera_rate_limit import TokenBucket, retry_after_seconds  # noqa: E402
+
+
+class FakeClock:
+    """Manual clock whose sleep advances time."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return {}
+
+
+class TestTokenBucket:
+    """Test token bucket pacing and pauses."""
+
+    def test_burst_then_steady_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+
+        for _ in range(25):
+            bucket.acquire()
+
+        # 5 requests in the burst, the other 20 at 10 per second
+        assert clock.now - 100.0 == pytest.approx(2.0)
+
+    def test_pause_blocks_every_caller(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+
+        bucket.pause(3)
+        bucket.acquire()
+
+        assert clock.now - 100.0 == pytest.approx(3.1)
+
+    @pytest.mark.parametrize(
+        "value,seconds",
+        [("7", 7.0), ("-1", 0.0), (None, None), ("soon", None)],
+    )
+    def test_retry_after_header(self, value, seconds):
+        assert retry_after_seconds(value) == seconds
+
+    def test_retry_after_http_date_in_the_past(self):
+        assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestConcurrentBatch:
+    """Test the batch against a fake add endpoint."""
+
+    def test_batch_runs_concurrently_and_retries_429(self, monkeypatch):
+        lock = threading.Lock()
+        attempts = {}
+        active = {"now": 0, "max": 0}
+
+        def fake_put(url, headers=None, json=None, timeout=None):
+            email = json["userNameOrEmail"]
+            with lock:
+                attempts[email] = attempts.get(email, 0) + 1
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            threading.Event().wait(0.02)
+            with lock:
+                active["now"] -= 1
+            if email == "busy@example.com" and attempts[email] == 1:
+                return FakeResponse(429, {"Retry-After": "0"})
+            if email == "broken@example.com":
+                return FakeResponse(503)
+            return FakeResponse(201)
+
+        monkeypatch.setattr(add_maintainers_to_workspace.requests, "put", fake_put)
+        monkeypatch.setattr(add_maintainers_to_workspace.time, "sleep", lambda s: None)
+        manager = SeqeraWorkspaceManager(
+            "token", rate_limiter=TokenBucket(rate=1000, capacity=100), max_attempts=3
+        )
+        maintainers = [
+            {"name": f"user{i}@example.com", "role": "MAINTAIN"} for i in range(20)
+        ] + [
+            {"name": "busy@example.com", "role": "MAINTAIN"},
+            {"name": "broken@example.com", "role": "MAINTAIN"},
+        ]
+
+        results = manager.add_maintainers_batch(maintainers, max_workers=8)
+
+        assert list(results) == [m["name"] for m in maintainers]
+        assert results["busy@example.com"] is True
+        assert results["broken@example.com"] is False
+        assert attempts["busy@example.com"] == 2
+        assert attempts["broken@example.com"] == 3
+        assert active["max"] > 1
@@ -0,0 +1,114 @@
+"""Test the participant cache of SeqeraWorkspaceManager."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import add_maintainers_to_workspace  # noqa: E402
+from add_maintainers_to_workspace import SeqeraWorkspaceManager  # noqa: E402
+from seqera_rate_limit import TokenBucket  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+
+class FakeParticipantsApi:
+    """Serves paginated participants and answers adds of existing ones with 409."""
+
+    def __init__(self, count):
+        self.participants = [
+            {
+                "participantId": i,
+                "email": f"member{i}@example.com",
+                "userName": f"member{i}",
+                "wspRole": "maintain",
+            }
+            for i in range(count)
+        ]
+        self.list_calls = 0
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.list_calls += 1
+        page = self.participants[params["offset"] : params["offset"] + params["max"]]
+        return FakeResponse(
+            200, {"participants": page, "totalSize": len(self.participants)}
+        )
+
+    def put(self, url, headers=None, json=None, timeout=None):
+        email = json["userNameOrEmail"]
+        if any(p["email"] == email for p in self.participants):
+            return FakeResponse(409, {"message": "Already a participant"})
+        participant = {
+            "participantId": len(self.participants),
+            "email": email,
+            "wspRole": "launch",
+        }
+        self.participants.append(participant)
+        return FakeResponse(200, {"participant": dict(participant)})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeParticipantsApi(250)
+    monkeypatch.setattr(add_maintainers_to_workspace.requests, "get", fake.get)
+    monkeypatch.setattr(add_maintainers_to_workspace.requests, "put", fake.put)
+    return fake
+
+
+class TestParticipantCache:
+    """Test loading, indexing and updating the participant cache."""
+
+    def test_all_pages_are_loaded_once(self, api):
+        manager = SeqeraWorkspaceManager("token")
+
+        assert len(manager.get_current_participants()) == 250
+        assert len(manager.get_current_participants()) == 250
+        assert api.list_calls == 3
+
+    def test_existing_members_do_not_refetch_the_list(self, api):
+        manager = SeqeraWorkspaceManager(
+            "token", rate_limiter=TokenBucket(rate=1000, capacity=100)
+        )
+        existing = [
+            {"name": f"member{i}@example.com", "role": "MAINTAIN"} for i in range(50)
+        ]
+
+        results = manager.add_maintainers_batch(existing)
+
+        assert all(results.values())
+        assert api.list_calls == 3
+
+    def test_added_members_are_indexed_in_place(self, api):
+        manager = SeqeraWorkspaceManager("token")
+        manager.get_current_participants()
+
+        assert manager.add_participant("new@example.com")
+
+        assert manager.find_participant("NEW@example.com")["participantId"] == 250
+        assert manager.find_participant("member7")["email"] == "member7@example.com"
+        assert len(manager.get_current_participants()) == 251
+        assert api.list_calls == 3
+
+    def test_invalidation_fetches_the_list_again(self, api):
+        manager = SeqeraWorkspaceManager("token")
+        manager.get_current_participants()
+        api.participants.append({"participantId": 999, "email": "late@example.com"})
+
+        # A 409 for a member missing from the cache reloads it once
+        assert manager.add_participant("late@example.com")
+        assert manager.find_participant("late@example.com")["participantId"] == 999
+        assert api.list_calls == 6
@@ -0,0 +1,522 @@
+"""Test the S3 log file tagging script.
+
+These tests drive the tagger against an in-memory stand-in for the boto3 S3
+client so they never touch a real bucket.
+"""
+
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+import tag_existing_log_files as tagger  # noqa: E402
+from async_tagging import AIMDLimiter, run_async_tagging  # noqa: E402
+from fusion_tags import FusionTagMatcher  # noqa: E402
+from tag_state_cache import TagStateCache  # noqa: E402
+from tagging_checkpoint import CheckpointError  # noqa: E402
+from tagging_watermark import TaggingWatermark, WatermarkError  # noqa: E402
+from tests.unit.fake_s3 import FakeS3Client, make_work_keys  # noqa: E402
+
+
+class TestLogFileClassifier:
+    """Test the combined single-pass log file classifier."""
+
+    KEYS = [
+        "work/00/abc/.command.log",
+        "work/00/abc/.COMMAND.ERR",
+        "work/00/abc/.exitcode",
+        "work/00/abc/.command.trace",
+        "work/00/abc/.command.sh.bak",
+        "work/00/abc/execution_trace.txt",
+        "work/00/abc/pipeline_report.html",
+        "work/00/trace.txt/output.bam",
+        "work/00/abc/sample.bam",
+    ]
+
+    def test_combined_classifier_matches_each_pattern_separately(self):
+        patterns = [re.compile(p, re.IGNORECASE) for p in tagger.LOG_FILE_PATTERNS]
+
+        for key in self.KEYS:
+            filename = key.split("/")[-1]
+            expected = any(p.search(filename) for p in patterns)
+            assert tagger.is_log_file(key) is expected, key
+
+    def test_filter_log_objects_classifies_a_page(self):
+        page = [{"Key": key} for key in self.KEYS]
+
+        assert [obj["Key"] for obj in tagger.filter_log_objects(page)] == [
+            "work/00/abc/.command.log",
+            "work/00/abc/.COMMAND.ERR",
+            "work/00/abc/.exitcode",
+            "work/00/abc/execution_trace.txt",
+            "work/00/abc/pipeline_report.html",
+        ]
+
+
+class TestStreamingTagger:
+    """Test the streaming list-and-tag pipeline."""
+
+    def test_iter_work_directory_objects_yields_only_log_files(self):
+        client = FakeS3Client(make_work_keys(10))
+
+        keys = [obj["Key"] for obj in tagger.iter_work_directory_objects(client, "b")]
+
+        assert len(keys) == 30
+        assert not any(key.endswith("output.bam") for key in keys)
+
+    def test_stream_log_files_tags_every_log_file(self):
+        client = FakeS3Client(make_work_keys(50))
+
+        stats = tagger.stream_log_files(
+            client,
+            "b",
+            tagger.iter_work_directory_objects(client, "b"),
+            max_workers=4,
+            queue_size=8,
+        )
+
+        assert stats == {
+            "processed": 150,
+            "tagged": 150,
+            "already_tagged": 0,
+            "errors": 0,
+        }
+        assert all(
+            tags == tagger.METADATA_TAG
+            for key, tags in client.tags.items()
+            if not key.endswith("output.bam")
+        )
+
+    def test_stream_log_files_propagates_listing_errors(self):
+        client = FakeS3Client(make_work_keys(5))
+
+        def failing_listing():
+            yield {"Key": "work/00/abc/.command.log"}
+            raise RuntimeError("listing failed")
+
+        with pytest.raises(RuntimeError, match="listing failed"):
+            tagger.stream_log_files(client, "b", failing_listing(), max_workers=2)
+
+
+class TestShardedListing:
+    """Test prefix-sharded parallel listing of the work/ directory."""
+
+    def test_discover_work_shards_returns_two_hex_prefixes(self):
+        client = FakeS3Client(make_work_keys(300) + ["work/trace.txt"])
+
+        shards, root_objects = tagger.discover_work_shards(client, "b")
+
+        assert len(shards) == 256
+        assert shards[0] == "work/00/"
+        assert [obj["Key"] for obj in root_objects] == ["work/trace.txt"]
+
+    def test_sharded_listing_matches_sequential_listing(self):
+        client = FakeS3Client(make_work_keys(300))
+
+        sharded = tagger.iter_sharded_work_directory_objects(
+            client, "b", max_workers=8, queue_size=16
+        )
+        sequential = tagger.iter_work_directory_objects(client, "b")
+
+        assert sorted(obj["Key"] for obj in sharded) == [
+            obj["Key"] for obj in sequential
+        ]
+
+
+class TestCheckpointedRuns:
+    """Test resumable runs backed by the SQLite checkpoint."""
+
+    def run_stream(self, client, path, resume):
+        checkpoint = tagger.TaggingCheckpoint(str(path), "b", resume=resume)
+        try:
+            listing = tagger.iter_sharded_work_directory_objects(
+                client, "b", max_workers=4, checkpoint=checkpoint
+            )
+            return tagger.stream_log_files(
+                client, "b", listing, max_workers=4, checkpoint=checkpoint
+            )
+        finally:
+            checkpoint.close()
+
+    def test_resume_only_retries_unfinished_work(self, tmp_path):
+        client = FakeS3Client(make_work_keys(512))
+        failing_key = "work/05/" + f"{5:030x}" + "/.exitcode"
+        client.failing_keys.add(failing_key)
+        path = tmp_path / "checkpoint.db"
+
+        first = self.run_stream(client, path, resume=False)
+        assert first["errors"] == 1
+        assert first["tagged"] == 512 * 3 - 1
+
+        client.failing_keys.clear()
+        client.put_calls = 0
+        second = self.run_stream(client, path, resume=True)
+
+        assert second == {
+            "processed": 1,
+            "tagged": 1,
+            "already_tagged": 0,
+            "errors": 0,
+        }
+        assert client.tags[failing_key] == tagger.METADATA_TAG
+
+        third = self.run_stream(client, path, resume=True)
+        assert third["processed"] == 0
+
+    def test_token_does_not_pass_pages_with_pending_keys(self, tmp_path):
+        checkpoint = tagger.TaggingCheckpoint(str(tmp_path / "c.db"), "b")
+        checkpoint.begin_page("work/00/", "page-2", ["a", "b"])
+        checkpoint.begin_page("work/00/", "page-3", ["c"])
+        checkpoint.mark_done("c", True)
+
+        assert checkpoint.get_continuation_token("work/00/") is None
+
+        checkpoint.mark_done("a", True)
+        checkpoint.mark_done("b", True)
+        checkpoint.finish_listing("work/00/")
+
+        assert checkpoint.is_shard_complete("work/00/")
+        checkpoint.close()
+
+    def test_resume_rejects_checkpoint_for_other_bucket(self, tmp_path):
+        path = str(tmp_path / "c.db")
+        tagger.TaggingCheckpoint(path, "b").close()
+
+        with pytest.raises(CheckpointError):
+            tagger.TaggingCheckpoint(path, "other", resume=True)
+
+
+class TestKnownTagFastPath:
+    """Test skipping GetObjectTagging when the tag set is already known."""
+
+    def test_temporary_tag_does_not_count_as_metadata(self):
+        client = FakeS3Client(["work/00/abc/trace.txt"])
+        client.tags["work/00/abc/trace.txt"] = {"nextflow.io/temporary": "true"}
+
+        success, message = tagger.tag_log_file(client, "b", "work/00/abc/trace.txt")
+
+        assert (success, message) == (True, "Tagged successfully")
+        assert client.tags["work/00/abc/trace.txt"] == {
+            "nextflow.io/temporary": "true",
+            "nextflow.io/metadata": "true",
+        }
+
+    def test_tag_cache_skips_all_calls_on_unchanged_objects(self, tmp_path):
+        client = FakeS3Client(make_work_keys(20))
+        log_objects = tagger.list_work_directory_objects(client, "b")
+        cache = TagStateCache(str(tmp_path / "tags.db"))
+        options = {"tag_cache": cache}
+
+        tagger.process_log_files_batch(client, "b", log_objects, tag_options=options)
+        assert (client.get_calls, client.put_calls) == (60, 60)
+
+        client.get_calls = client.put_calls = 0
+        stats = tagger.process_log_files_batch(
+            client, "b", log_objects, tag_options=options
+        )
+        cache.close()
+
+        assert stats["already_tagged"] == 60
+        assert (client.get_calls, client.put_calls) == (0, 0)
+
+    def test_tag_cache_ignores_entries_for_changed_etag(self, tmp_path):
+        cache = TagStateCache(str(tmp_path / "tags.db"))
+        cache.record("work/00/abc/.exitcode", '"v1"', tagger.METADATA_TAG)
+
+        assert cache.lookup("work/00/abc/.exitcode", '"v1"') == tagger.METADATA_TAG
+        assert cache.lookup("work/00/abc/.exitcode", '"v2"') is None
+        cache.close()
+
+    def test_optimistic_mode_costs_one_call_per_object(self):
+        client = FakeS3Client(make_work_keys(20))
+        log_objects = tagger.list_work_directory_objects(client, "b")
+
+        stats = tagger.process_log_files_batch(
+            client,
+            "b",
+            log_objects,
+            tag_options={"optimistic": True, "sample_fraction": 0.0},
+        )
+
+        assert stats["tagged"] == 60
+        assert (client.get_calls, client.put_calls) == (0, 60)
+
+    def test_sampled_optimistic_write_reports_and_keeps_other_tags(self):
+        client = FakeS3Client(["work/00/abc/.command.log", "work/00/abc/.exitcode"])
+        client.tags["work/00/abc/.exitcode"] = {"owner": "ci"}
+
+        messages = [
+            tagger.tag_object(client, "b", key, optimistic=True, sample_fraction=1.0)
+            for key in ["work/00/abc/.command.log", "work/00/abc/.exitcode"]
+        ]
+
+        assert messages == [
+            f"Tagged successfully {tagger.SAMPLED}",
+            f"Tagged successfully {tagger.SAMPLED_WITH_OTHER_TAGS}",
+        ]
+        assert client.tags["work/00/abc/.exitcode"] == {
+            "owner": "ci",
+            **tagger.METADATA_TAG,
+        }
+        assert (client.get_calls, client.put_calls) == (2, 2)
+
+
+class TestWindowedBatch:
+    """Test bounded in-flight submission in process_log_files_batch."""
+
+    def test_in_flight_operations_never_exceed_window(self, monkeypatch):
+        client = FakeS3Client(make_work_keys(40))
+        log_objects = tagger.list_work_directory_objects(client, "b")
+        submitted = []
+        max_in_flight = 0
+        original_submit = tagger.ThreadPoolExecutor.submit
+
+        def tracking_submit(executor, fn, *args, **kwargs):
+            nonlocal max_in_flight
+            future = original_submit(executor, fn, *args, **kwargs)
+            submitted.append(future)
+            in_flight = sum(1 for f in submitted if not f.done())
+            max_in_flight = max(max_in_flight, in_flight)
+            return future
+
+        monkeypatch.setattr(tagger.ThreadPoolExecutor, "submit", tracking_submit)
+
+        stats = tagger.process_log_files_batch(
+            client, "b", log_objects, max_workers=2, window_size=3
+        )
+
+        assert stats["tagged"] == 120
+        assert max_in_flight <= 3
+
+    def test_format_progress_reports_rate_and_eta(self):
+        assert (
+            tagger._format_progress(100, 300, 10.0)
+            == "Processed 100/300 files (10.0 files/s, ETA 20s)"
+        )
+        assert tagger._format_progress(50, None, 10.0) == (
+            "Processed 50 files (5.0 files/s)"
+        )
+
+
+class TestAsyncTaggingEngine:
+    """Test the asyncio engine and its AIMD concurrency limiter."""
+
+    def test_limiter_backs_off_on_throttle_and_grows_on_success(self):
+        async def exercise():
+            limiter = AIMDLimiter(initial=16, maximum=64, cooldown=0)
+            await limiter.on_throttle()
+            after_throttle = limiter.limit
+            for _ in range(64):
+                await limiter.on_success()
+            return after_throttle, limiter.limit
+
+        after_throttle, after_success = asyncio.run(exercise())
+
+        assert after_throttle == 8
+        assert 13 < after_success < 14
+
+    def test_engine_adapts_to_throttling(self):
+        keys = [f"work/{i % 4:02x}/{i:030x}/.command.log" for i in range(300)]
+        in_flight = 0
+        lock = threading.Lock()
+
+        def tag_fn(obj):
+            nonlocal in_flight
+            with lock:
+                in_flight += 1
+                throttled = in_flight > 8
+            try:
+                if throttled:
+                    raise tagger.ClientError(
+                        {
+                            "Error": {"Code": "SlowDown", "Message": "slow down"},
+                            "ResponseMetadata": {"HTTPStatusCode": 503},
+                        },
+                        "PutObjectTagging",
+                    )
+                time.sleep(0.002)
+                return "Tagged successfully"
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        results = {}
+        stats = run_async_tagging(
+            tag_fn,
+            ({"Key": key} for key in keys),
+            initial_concurrency=32,
+            max_concurrency=32,
+            on_result=lambda key, success, _: results.__setitem__(key, success),
+        )
+
+        assert stats["tagged"] == 300
+        assert stats["errors"] == 0
+        assert stats["throttled"] > 0
+        assert len(results) == 300 and all(results.values())
+
+    def test_async_run_retries_failed_listing_pages(self, monkeypatch, tmp_path):
+        moto = pytest.importorskip("moto")
+        from botocore.awsrequest import AWSResponse
+
+        # main() writes tag_log_files.log to the working directory
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "x")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "x")
+        monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+        listings = []
+
+        def slow_down_once(request, **kwargs):
+            listings.append(request.url)
+            if len(listings) == 1:
+                body = b"<Error><Code>SlowDown</Code><Message>x</Message></Error>"
+                return AWSResponse(request.url, 503, {}, _RawBody(body))
+            return None
+
+        class FlakyListingFactory(tagger.S3ClientFactory):
+            def create_client(self, max_pool_connections=None):
+                client = super().create_client(max_pool_connections)
+                client.meta.events.register_first(
+                    "before-send.s3.ListObjectsV2", slow_down_once
+                )
+                return client
+
+        monkeypatch.setattr(tagger, "S3ClientFactory", FlakyListingFactory)
+        monkeypatch.setattr(sys, "argv", ["tagger", "--bucket", "megatests", "--async"])
+
+        with moto.mock_aws():
+            s3 = tagger.boto3.client("s3")
+            s3.create_bucket(Bucket="megatests")
+            keys = make_work_keys(3)
+            for key in keys:
+                s3.put_object(Bucket="megatests", Key=key, Body=b"")
+
+            tagger.main()
+
+            tagged = [
+                key
+                for key in keys
+                if s3.get_object_tagging(Bucket="megatests", Key=key)["TagSet"]
+            ]
+
+        assert len(listings) == 2
+        assert tagged == [key for key in keys if tagger.is_log_file(key)]
+
+
+class _RawBody:
+    """Stand-in for a urllib3 response body, as botocore reads it."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self, amt=None, decode_content=True):
+        yield self.body
+
+
+class TestIncrementalRuns:
+    """Test skipping objects older than the per-shard LastModified watermark."""
+
+    def run_sharded(self, client, state_path, failing_keys=()):
+        client.failing_keys = set(failing_keys)
+        watermark = TaggingWatermark(str(state_path), "b")
+        log_objects = list(
+            tagger.iter_sharded_work_directory_objects(
+                client, "b", max_workers=4, watermark=watermark
+            )
+        )
+        stats = tagger.process_log_files_batch(
+            client,
+            "b",
+            log_objects,
+            on_result=lambda key, success, _: watermark.mark_done(key, success),
+        )
+        watermark.save()
+        watermark.close()
+        return log_objects, stats, watermark
+
+    def test_second_run_only_tags_new_objects(self, tmp_path):
+        client = FakeS3Client(make_work_keys(20))
+        state_path = tmp_path / "watermarks.json"
+        first, _, _ = self.run_sharded(client, state_path)
+
+        new_key = "work/05/" + "f" * 30 + "/.command.log"
+        client.objects[new_key] = 1
+        client.tags[new_key] = {}
+        client.last_modified[new_key] = datetime.now(timezone.utc)
+        second, stats, watermark = self.run_sharded(client, state_path)
+
+        assert len(first) == 60
+        assert [obj["Key"] for obj in second] == [new_key]
+        assert stats["tagged"] == 1
+        assert watermark.skipped == 80
+
+    def test_failed_shard_keeps_its_old_watermark(self, tmp_path):
+        client = FakeS3Client(make_work_keys(20))
+        state_path = tmp_path / "watermarks.json"
+        failing = "work/03/" + "0" * 29 + "3/.exitcode"
+
+        self.run_sharded(client, state_path, failing_keys=[failing])
+        shards = json.loads(state_path.read_text())["shards"]
+
+        assert "work/03/" not in shards
+        assert "work/04/" in shards
+
+        second, _, _ = self.run_sharded(client, state_path)
+        assert {obj["Key"].split("/")[1] for obj in second} == {"03"}
+
+    def test_state_is_locked_and_bound_to_bucket(self, tmp_path):
+        state_path = str(tmp_path / "watermarks.json")
+        watermark = TaggingWatermark(state_path, "b")
+        with pytest.raises(WatermarkError, match="Another run"):
+            TaggingWatermark(state_path, "b")
+        watermark.save()
+        watermark.close()
+
+        with pytest.raises(WatermarkError, match="bucket"):
+            TaggingWatermark(state_path, "other")
+
+
+class TestFusionTagging:
+    """Test backfilling tags with the Fusion rules."""
+
+    def test_backfill_applies_metadata_and_temporary_split(self):
+        client = FakeS3Client(make_work_keys(4))
+        client.tags["work/00/" + "0" * 30 + "/.command.log"] = {
+            "nextflow.io/temporary": "true",
+            "owner": "ci",
+        }
+        matcher = FusionTagMatcher.from_config()
+
+        log_objects = list(
+            tagger.iter_work_directory_objects(client, "b", classifier=matcher.classify)
+        )
+        stats = tagger.process_log_files_batch(
+            client,
+            "b",
+            log_objects,
+            tag_options={"managed_keys": matcher.tag_keys},
+        )
+
+        assert stats["tagged"] == 16
+        assert client.tags["work/00/" + "0" * 30 + "/.command.log"] == {
+            "owner": "ci",
+            "nextflow.io/metadata": "true",
+        }
+        for key, tags in client.tags.items():
+            expected = (
+                {"nextflow.io/temporary": "true"}
+                if key.endswith("output.bam")
+                else tagger.METADATA_TAG
+            )
+            assert {k: v for k, v in tags.items() if k != "owner"} == expected
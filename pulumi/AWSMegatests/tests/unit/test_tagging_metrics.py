@@ -0,0 +1,188 @@
+"""Test the OpenMetrics instrumentation of the tagging scripts."""
+
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+import boto3  # noqa: E402
+from botocore.awsrequest import AWSResponse  # noqa: E402
+from botocore.config import Config  # noqa: E402
+from botocore.exceptions import ClientError  # noqa: E402
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from tag_existing_log_files import filter_log_objects  # noqa: E402
+from tagging_metrics import (  # noqa: E402
+    CONTENT_TYPE,
+    Counter,
+    Histogram,
+    MetricsFileWriter,
+    MetricsRegistry,
+    TaggingMetrics,
+    serve_metrics,
+)
+
+TAGGING_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Tagging><TagSet><Tag><Key>a</Key><Value>b</Value></Tag></TagSet></Tagging>"""
+SLOW_DOWN_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>"""
+
+
+class FakeRaw:
+    """Raw HTTP body for botocore's AWSResponse."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def stream(self):
+        yield self.body
+
+
+def make_client(status: int, body: bytes):
+    """S3 client whose requests are answered locally with one fixed response."""
+    client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="x",
+        aws_secret_access_key="x",
+        config=Config(retries={"mode": "standard", "total_max_attempts": 1}),
+    )
+
+    def respond(request, **kwargs):
+        return AWSResponse(request.url, status, {}, FakeRaw(body))
+
+    return client, respond
+
+
+class TestMetricsRendering:
+    """Test the OpenMetrics text format."""
+
+    def test_counters_and_histograms_are_rendered(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("jobs", "Jobs done", ["state"]))
+        histogram = registry.register(
+            Histogram("latency_seconds", "Latency", ["op"], buckets=(0.1, 1.0))
+        )
+        counter.inc(state="ok")
+        counter.inc(2, state="ok")
+        histogram.observe(0.05, op="get")
+        histogram.observe(0.1, op="get")
+        histogram.observe(3.0, op="get")
+
+        assert registry.render().splitlines() == [
+            "# TYPE jobs counter",
+            "# HELP jobs Jobs done",
+            'jobs_total{state="ok"} 3',
+            "# TYPE latency_seconds histogram",
+            "# HELP latency_seconds Latency",
+            'latency_seconds_bucket{op="get",le="0.1"} 2',
+            'latency_seconds_bucket{op="get",le="1.0"} 2',
+            'latency_seconds_bucket{op="get",le="+Inf"} 3',
+            'latency_seconds_count{op="get"} 3',
+            'latency_seconds_sum{op="get"} 3.15',
+            "# EOF",
+        ]
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("c", "C", ["key"]))
+        counter.inc(key='a"b\\c')
+
+        assert 'c_total{key="a\\"b\\\\c"} 1' in registry.render()
+
+
+class TestTaggingMetrics:
+    """Test the tagger's object counters and S3 request hooks."""
+
+    def test_classifier_wrapper_counts_listed_and_selected(self):
+        metrics = TaggingMetrics()
+        classify = metrics.count_classified(filter_log_objects)
+
+        classify([{"Key": "work/00/a/.command.log"}, {"Key": "work/00/a/out.bam"}])
+
+        assert metrics.objects_listed.value() == 2
+        assert metrics.objects_classified.value() == 1
+
+    @pytest.mark.parametrize(
+        "success,message,result",
+        [
+            (True, "Tagged successfully", "tagged"),
+            (True, "Already tagged", "already_tagged"),
+            (True, "Would tag with: {}", "dry_run"),
+            (False, "Error: denied", "error"),
+        ],
+    )
+    def test_results_are_counted(self, success, message, result):
+        metrics = TaggingMetrics()
+
+        metrics.record_result("key", success, message)
+
+        assert metrics.objects_processed.value(result=result) == 1
+
+    def test_successful_requests_are_timed(self):
+        metrics = TaggingMetrics()
+        client, respond = make_client(200, TAGGING_XML)
+        metrics.instrument_client(client)
+        client.meta.events.register("before-send.s3.*", respond)
+
+        response = client.get_object_tagging(Bucket="bucket", Key="key")
+
+        assert response["TagSet"] == [{"Key": "a", "Value": "b"}]
+        assert metrics.request_duration.count(operation="GetObjectTagging") == 1
+        assert metrics.requests_in_flight.value(operation="GetObjectTagging") == 0
+        assert metrics.requests_throttled.value(operation="GetObjectTagging") == 0
+
+    def test_throttled_requests_are_counted(self):
+        metrics = TaggingMetrics()
+        client, respond = make_client(503, SLOW_DOWN_XML)
+        metrics.instrument_client(client)
+        client.meta.events.register("before-send.s3.*", respond)
+
+        with pytest.raises(ClientError):
+            client.put_object_tagging(
+                Bucket="bucket", Key="key", Tagging={"TagSet": []}
+            )
+
+        assert metrics.requests_throttled.value(operation="PutObjectTagging") == 1
+        assert metrics.requests_failed.value(operation="PutObjectTagging") == 0
+        assert metrics.requests_in_flight.value(operation="PutObjectTagging") == 0
+
+
+class TestMetricsExport:
+    """Test writing and serving the metrics."""
+
+    def test_file_writer_replaces_the_file(self, tmp_path):
+        metrics = TaggingMetrics()
+        path = tmp_path / "tagger.prom"
+        writer = MetricsFileWriter(metrics.registry, str(path), interval=60)
+
+        writer.start()
+        metrics.objects_listed.inc(5)
+        writer.stop()
+
+        text = path.read_text()
+        assert "tagger_objects_listed_total 5" in text
+        assert text.endswith("# EOF\n")
+        assert [p.name for p in tmp_path.iterdir()] == ["tagger.prom"]
+
+    def test_http_endpoint_serves_openmetrics(self):
+        metrics = TaggingMetrics()
+        metrics.objects_classified.inc(3)
+        server = serve_metrics(metrics.registry, 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert content_type == CONTENT_TYPE
+        assert "tagger_objects_classified_total 3" in body
@@ -0,0 +1,152 @@
+"""Test task-directory-level tagging and its directory state."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from tag_existing_log_files import (  # noqa: E402
+    METADATA_TAG,
+    filter_log_objects,
+    iter_sharded_work_directory_objects,
+    iter_work_directory_objects,
+    tag_task_directories,
+)
+from task_directories import (  # noqa: E402
+    DirectoryStateError,
+    TaskDirectoryState,
+    directory_digest,
+    group_task_directories,
+    task_directory,
+)
+from tests.unit.fake_s3 import FakeS3Client, make_work_keys  # noqa: E402
+
+
+def run_by_directory(client, state=None, **kwargs):
+    """List, group and tag the fake bucket the way --by-directory does."""
+    classifier = filter_log_objects
+    if state is not None:
+        classifier = state.skip_completed(classifier)
+    directories = group_task_directories(
+        iter_work_directory_objects(
+            client, "bucket", log_progress=False, classifier=classifier
+        )
+    )
+    return tag_task_directories(
+        client,
+        "bucket",
+        directories,
+        max_workers=4,
+        on_directory_complete=state.mark_complete if state is not None else None,
+        **kwargs,
+    )
+
+
+class TestGrouping:
+    """Test grouping streamed objects by task directory."""
+
+    def test_task_directory_of_keys(self):
+        assert task_directory("work/ab/" + "c" * 30 + "/.command.log") == (
+            "work/ab/" + "c" * 30 + "/"
+        )
+        assert task_directory("work/ab/cd/sub/dir/file") == "work/ab/cd/"
+        assert task_directory("work/ab/file") is None
+        assert task_directory("other/ab/cd/file") is None
+
+    def test_nextflow_task_hash_is_the_digest(self):
+        task_hash = "0123456789abcdef0123456789abcd"
+
+        assert directory_digest(f"work/ab/{task_hash}/") == bytes.fromhex(
+            "ab" + task_hash
+        )
+        assert len(directory_digest("work/xx/not-a-hash/")) == 16
+
+    def test_interleaved_shards_are_grouped(self):
+        client = FakeS3Client(make_work_keys(40))
+        objects = list(
+            iter_sharded_work_directory_objects(client, "bucket", max_workers=8)
+        )
+
+        directories = list(group_task_directories(objects))
+
+        assert len(directories) == 40
+        assert sorted(
+            obj["Key"] for directory in directories for obj in directory.objects
+        ) == sorted(obj["Key"] for obj in objects)
+        for directory in directories:
+            assert len(directory.objects) == 3
+            assert directory.finished
+            assert all(
+                obj["Key"].startswith(directory.prefix) for obj in directory.objects
+            )
+
+
+class TestDirectoryTagging:
+    """Test tagging and resuming by task directory."""
+
+    def test_every_log_file_is_tagged(self, tmp_path):
+        client = FakeS3Client(make_work_keys(20))
+        state = TaskDirectoryState(str(tmp_path / "dirs.db"), "bucket")
+
+        stats = run_by_directory(client, state)
+
+        assert stats["directories"] == 20
+        assert stats["tagged"] == 60
+        assert state.recorded == 20
+        assert all(
+            client.tags[key] == (METADATA_TAG if not key.endswith(".bam") else {})
+            for key in client.objects
+        )
+
+    def test_completed_directories_are_skipped_on_the_next_run(self, tmp_path):
+        path = str(tmp_path / "dirs.db")
+        client = FakeS3Client(make_work_keys(20))
+        client.failing_keys = {"work/03/" + f"{3:030x}" + "/.command.log"}
+        state = TaskDirectoryState(path, "bucket")
+        first = run_by_directory(client, state)
+        state.close()
+
+        client.failing_keys = set()
+        client.get_calls = 0
+        state = TaskDirectoryState(path, "bucket")
+        second = run_by_directory(client, state)
+
+        assert first["errors"] == 1
+        assert state.completed == 20
+        # Only the directory with the failed key is tagged again
+        assert second["directories"] == 1
+        assert second["processed"] == 3
+        assert client.get_calls == 3
+        assert state.skipped_objects == 19 * 4
+
+    def test_unfinished_tasks_are_not_recorded(self, tmp_path):
+        keys = [k for k in make_work_keys(4) if not k.endswith(".exitcode")]
+        client = FakeS3Client(keys)
+        state = TaskDirectoryState(str(tmp_path / "dirs.db"), "bucket")
+
+        stats = run_by_directory(client, state)
+
+        assert stats["tagged"] == 8
+        assert state.recorded == 0
+
+    def test_dry_run_records_nothing(self, tmp_path):
+        client = FakeS3Client(make_work_keys(4))
+        state = TaskDirectoryState(str(tmp_path / "dirs.db"), "bucket")
+
+        run_by_directory(client, state, dry_run=True)
+
+        assert state.recorded == 0
+        assert client.put_calls == 0
+
+    def test_state_is_bound_to_bucket(self, tmp_path):
+        path = str(tmp_path / "dirs.db")
+        TaskDirectoryState(path, "bucket").close()
+
+        with pytest.raises(DirectoryStateError, match="belongs to bucket"):
+            TaskDirectoryState(path, "other-bucket")
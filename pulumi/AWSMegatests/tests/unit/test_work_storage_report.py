@@ -0,0 +1,83 @@
+"""Test the work/ storage analytics report."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+
+# Add scripts directory to path for imports
+scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(scripts_dir))
+
+from fusion_tags import FusionTagMatcher  # noqa: E402
+from work_storage_report import StorageAggregator  # noqa: E402
+
+BIG_TASK = "work/ab/" + "c" * 30 + "/"
+
+
+def make_objects():
+    objects = [
+        {"Key": f"work/{i:02x}/{i:030x}/{name}", "Size": size}
+        for i in range(10)
+        for name, size in ((".command.log", 10), ("out.bam", 1000))
+    ]
+    objects += [
+        {"Key": BIG_TASK + ".exitcode", "Size": 1},
+        {"Key": BIG_TASK + "huge.bam", "Size": 10**9, "StorageClass": "STANDARD_IA"},
+        {"Key": "work/stray.txt", "Size": 5},
+    ]
+    return objects
+
+
+class TestStorageAggregator:
+    """Test per-directory, storage class and tag class aggregation."""
+
+    @pytest.fixture
+    def report(self):
+        aggregator = StorageAggregator(FusionTagMatcher.from_config())
+        aggregator.add_objects(make_objects())
+        return aggregator.report(top=3)
+
+    def test_totals_by_storage_and_tag_class(self, report):
+        assert report["total_objects"] == 23
+        assert report["task_directories"] == 11
+        assert report["outside_task_directories"] == {"objects": 1, "bytes": 5}
+        assert report["by_storage_class"]["STANDARD_IA"] == {
+            "objects": 1,
+            "bytes": 10**9,
+        }
+        assert report["by_tag_class"] == {
+            "metadata": {"objects": 11, "bytes": 101},
+            "temporary": {"objects": 12, "bytes": 10**9 + 10005},
+        }
+
+    def test_top_directories_are_named_by_task_hash(self, report):
+        top = report["top_directories_by_bytes"]
+
+        assert len(top) == 3
+        assert top[0] == {"directory": BIG_TASK, "bytes": 10**9 + 1, "objects": 2}
+        assert top[1]["bytes"] == 1010
+
+    def test_histogram_buckets_cover_every_directory(self, report):
+        assert report["directory_size_histogram"] == [
+            {"min_bytes": 512, "max_bytes": 1023, "directories": 10, "bytes": 10100},
+            {
+                "min_bytes": 2**29,
+                "max_bytes": 2**30 - 1,
+                "directories": 1,
+                "bytes": 10**9 + 1,
+            },
+        ]
+
+    def test_non_hex_directories_keep_their_name(self):
+        aggregator = StorageAggregator()
+        aggregator.add_objects([{"Key": "work/tmp/scratch/file", "Size": 3}])
+
+        top = aggregator.top_directories(1)
+
+        assert top == [{"directory": "work/tmp/scratch/", "bytes": 3, "objects": 1}]
+        assert aggregator.report()["by_tag_class"] == {
+            "untagged": {"objects": 1, "bytes": 3}
+        }
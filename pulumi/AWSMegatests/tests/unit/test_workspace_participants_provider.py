@@ -0,0 +1,198 @@
+"""Test the workspace participants dynamic provider against a fake Seqera API."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.integrations import workspace_participants_provider as provider_module  # noqa: E402
+from src.integrations.workspace_participants_provider import (  # noqa: E402
+    WorkspaceParticipantsProvider,
+    plan_participant_changes,
+)
+
+BASE_URL = "https://seqera.test/orgs/1/workspaces/2/participants"
+
+PROPS = {"api_url": "https://seqera.test", "org_id": 1, "workspace_id": 2, "token": "t"}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = str(body)
+        self.content = b"" if body is None else json.dumps(body).encode()
+
+    def json(self):
+        if not self.content:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+        return self.body
+
+
+class FakeSeqeraApi:
+    """In-memory participants endpoints recording every request."""
+
+    def __init__(self, participants):
+        self.participants = {
+            i: {"participantId": i, "email": email, "wspRole": role}
+            for i, (email, role) in enumerate(participants.items(), 1)
+        }
+        self.requests = []
+        self.headers = {}
+        self.add_status = 200
+
+    def request(self, method, url, params=None, json=None, timeout=None):
+        self.requests.append((method, url.replace(BASE_URL, "")))
+        if method == "GET":
+            rows = list(self.participants.values())
+            page = rows[params["offset"] : params["offset"] + params["max"]]
+            return FakeResponse(200, {"participants": page, "totalSize": len(rows)})
+        if url.endswith("/add"):
+            participant_id = max(self.participants, default=0) + 1
+            participant = {
+                "participantId": participant_id,
+                "email": json["userNameOrEmail"],
+                "wspRole": "launch",
+            }
+            self.participants[participant_id] = participant
+            if self.add_status == 204:
+                return FakeResponse(204)
+            return FakeResponse(200, {"participant": dict(participant)})
+        participant_id = int(url.rsplit("/participants/", 1)[1].split("/")[0])
+        if method == "DELETE":
+            del self.participants[participant_id]
+        else:
+            self.participants[participant_id]["wspRole"] = json["role"]
+        return FakeResponse(204)
+
+    def roles(self):
+        return {p["email"]: p["wspRole"] for p in self.participants.values()}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeSeqeraApi({"owner@example.com": "owner", "outsider@example.com": "view"})
+    monkeypatch.setattr(provider_module.requests, "Session", lambda: fake)
+    monkeypatch.setattr(provider_module, "_participant_cache", {})
+    return fake
+
+
+class TestPlan:
+    """Test planning participant changes."""
+
+    def test_only_managed_participants_are_removed(self):
+        plan = plan_participant_changes(
+            desired={"a@x": "maintain", "b@x": "owner"},
+            live={"b@x": "maintain", "c@x": "view", "d@x": "view"},
+            managed=["c@x"],
+        )
+
+        assert plan == {"add": ["a@x"], "set_role": ["b@x"], "remove": ["c@x"]}
+
+
+class TestProvider:
+    """Test the provider's calls against the fake API."""
+
+    def test_preview_and_create_share_one_list_call(self, api):
+        provider = WorkspaceParticipantsProvider()
+        news = {
+            **PROPS,
+            "participants": {
+                "Owner@Example.com": "OWNER",
+                "new@example.com": "MAINTAIN",
+            },
+        }
+
+        provider.diff("id", {**PROPS, "participants": {}}, news)
+        result = provider.create(news)
+
+        assert [r for r in api.requests if r[0] == "GET"] == [("GET", "")]
+        assert api.roles() == {
+            "owner@example.com": "owner",
+            "outsider@example.com": "view",
+            "new@example.com": "maintain",
+        }
+        assert set(result.outs["participant_ids"]) == {
+            "owner@example.com",
+            "new@example.com",
+        }
+
+    def test_add_without_a_response_body(self, api):
+        api.add_status = 204
+        provider = WorkspaceParticipantsProvider()
+
+        result = provider.create({**PROPS, "participants": {"new@example.com": "VIEW"}})
+
+        assert api.roles()["new@example.com"] == "view"
+        assert result.outs["participant_ids"] == {"new@example.com": 3}
+        assert result.outs["created"] == ["new@example.com"]
+
+    def test_diff_reports_drift_from_the_workspace(self, api):
+        provider = WorkspaceParticipantsProvider()
+        state = {**PROPS, "participants": {"owner@example.com": "owner"}}
+
+        assert not provider.diff("id", state, state).changes
+
+        api.participants[1]["wspRole"] = "view"
+        provider.read("id", state)
+
+        assert provider.diff("id", state, state).changes
+
+    def test_update_removes_dropped_members_only(self, api):
+        provider = WorkspaceParticipantsProvider()
+        olds = {
+            **PROPS,
+            "participants": {"owner@example.com": "owner"},
+            "created": ["owner@example.com"],
+        }
+        news = {**PROPS, "participants": {}}
+
+        result = provider.update("id", olds, news)
+
+        assert api.roles() == {"outsider@example.com": "view"}
+        assert result.outs["created"] == []
+
+    def test_adopted_participants_survive_delete(self, api):
+        provider = WorkspaceParticipantsProvider()
+        news = {
+            **PROPS,
+            "participants": {
+                "owner@example.com": "OWNER",
+                "new@example.com": "MAINTAIN",
+            },
+        }
+
+        outs = provider.create(news).outs
+        provider.delete("id", outs)
+
+        assert outs["created"] == ["new@example.com"]
+        assert api.roles() == {
+            "owner@example.com": "owner",
+            "outsider@example.com": "view",
+        }
+
+    def test_dropping_an_adopted_participant_leaves_it_in_place(self, api):
+        provider = WorkspaceParticipantsProvider()
+        olds = provider.create(
+            {**PROPS, "participants": {"owner@example.com": "OWNER"}}
+        ).outs
+        news = {**PROPS, "participants": {}}
+
+        assert provider.diff("id", olds, news).changes
+        provider.update("id", olds, news)
+
+        assert "owner@example.com" in api.roles()
+
+    def test_changing_the_workspace_replaces_the_resource(self, api):
+        provider = WorkspaceParticipantsProvider()
+        olds = {**PROPS, "participants": {}}
+
+        result = provider.diff("id", olds, {**olds, "workspace_id": 3})
+
+        assert result.replaces == ["workspace_id"]
+        assert api.requests == []